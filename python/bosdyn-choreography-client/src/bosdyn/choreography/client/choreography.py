@@ -474,6 +474,21 @@ class ChoreographyClient(BaseClient):
             copy_request=False,
             **kwargs)
 
+    def download_robot_state_log_async(self, log_type, progress_cb=None, **kwargs):
+        """Async version of download_robot_state_log().
+
+        The streamed chunks are reassembled as they arrive, and progress_cb, if given, is called
+        with (bytes received, total bytes) after each one.  Cancelling the returned future
+        cancels the download.
+        """
+        request = choreography_sequence_pb2.DownloadRobotStateLogRequest(log_type=log_type)
+        return self.call_async_streaming(
+            self._stub.DownloadRobotStateLog, request,
+            value_from_response=_get_choreography_state_log_from_data,
+            error_from_response=_download_robot_state_log_stream_errors,
+            chunk_from_response=lambda response: response.chunk, progress_cb=progress_cb,
+            copy_request=False, **kwargs)
+
     def build_execute_choreography_request(self, choreography_name, client_start_time,
                                            choreography_starting_slice, lease=None):
         """Generate the ExecuteChoreographyRequest rpc with the timestamp converted into robot time."""
@@ -734,6 +749,19 @@ def _get_streamed_choreography_state_log(response):
     return (initial_status, choreography_log)
 
 
+def _get_choreography_state_log_from_data(response, data):
+    """Parses a ChoreographyStateLog from the data reassembled from a streamed response.
+
+    Returns:
+        A tuple containing the status of the first response and the ChoreographyStateLog.
+    """
+    choreography_log = choreography_sequence_pb2.ChoreographyStateLog()
+    if response is None:
+        return (None, choreography_log)
+    choreography_log.ParseFromString(data)
+    return (response.status, choreography_log)
+
+
 def load_choreography_sequence_from_binary_file(file_path):
     """Read a choreography sequence file into a protobuf ChoreographySequence message."""
     if not os.path.exists(file_path):
@@ -7,10 +7,10 @@
 """The client library package.
 Sets up some convenience imports for commonly used classes.
 """
-# yapf: enable
-from .auth import (AuthClient, ExpiredApplicationTokenError, InvalidApplicationTokenError,
-                   InvalidLoginError, InvalidTokenError)
-from .common import BaseClient
+import functools
+import importlib
+import pkgutil
+
 # yapf: disable
 from .exceptions import (ClientCancelledOperationError, Error, InternalServerError,
                          InvalidAppTokenError, InvalidClientCertificateError, InvalidRequestError,
@@ -20,5 +20,43 @@ from .exceptions import (ClientCancelledOperationError, Error, InternalServerErr
                          ServiceFailedDuringExecutionError, ServiceUnavailableError, TimedOutError,
                          TooManyRequestsError, UnableToConnectToRobotError, UnauthenticatedError,
                          UnimplementedError, UnknownDnsNameError, UnsetStatusError)
-from .robot import Robot
-from .sdk import BOSDYN_RESOURCE_ROOT, Sdk, create_standard_sdk
+# yapf: enable
+
+# Convenience imports which need grpc and the service protos, by the submodule they are in.
+# They are imported on first access, so that importing a lightweight submodule such as
+# bosdyn.client.math_helpers does not import them.
+_LAZY_IMPORTS = {
+    'AuthClient': '.auth',
+    'ExpiredApplicationTokenError': '.auth',
+    'InvalidApplicationTokenError': '.auth',
+    'InvalidLoginError': '.auth',
+    'InvalidTokenError': '.auth',
+    'BaseClient': '.common',
+    'Robot': '.robot',
+    'BOSDYN_RESOURCE_ROOT': '.sdk',
+    'Sdk': '.sdk',
+    'create_standard_sdk': '.sdk',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _submodule_names():
+    """Names of the submodules and subpackages of this package, found without importing them."""
+    return frozenset(module_info.name for module_info in pkgutil.iter_modules(__path__))
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is not None:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+        globals()[name] = value
+        return value
+    # Submodules used to be imported along with the package, so keep them accessible as
+    # attributes after a plain "import bosdyn.client".
+    if name in _submodule_names():
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
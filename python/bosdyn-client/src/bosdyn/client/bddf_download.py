@@ -6,12 +6,17 @@
 
 """Code for downloading robot data in bddf format."""
 import logging
+import os
 import re
 import ssl
 import sys
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+import numpy as np
+
+from bosdyn.bddf import StreamDataReader
+from bosdyn.bddf.common import POD_TYPE_TO_NUMPY_DTYPE
 from bosdyn.client.time_sync import (NotEstablishedError, TimeSyncClient, TimeSyncEndpoint,
                                      robot_time_range_from_nanoseconds, timespec_to_robot_timespan)
 from bosdyn.util import TIME_FORMAT_DESC
@@ -64,26 +69,10 @@ def _request_timespan_from_nanoseconds(start_nsec, end_nsec, time_sync_endpoint)
         robot_time_range_from_nanoseconds(start_nsec, end_nsec, time_sync_endpoint))
 
 
-def download_data(  # pylint: disable=too-many-arguments,too-many-locals
-        robot, hostname, start_nsec=None, end_nsec=None, timespan_spec=None, output_filename=None,
-        robot_time=False, channel=None, message_type=None, grpc_service=None, show_progress=False):
-    """
-    Download data from robot in bddf format
-
-    Args:
-      robot:          API robot object
-      hostname:       hostname/ip-address of robot
-      start_nsec:     start time of log
-      end_nsec:       end time of log
-      timespan_spec:  if start_time, end_time are None, string representing the timespan to download
-      robot_time:     if True, timespan is in robot_clock, if False, in host clock
-      channel:        if set, limit data to download to a specific channel
-      message_type:   if set, limit data by specified message-type
-      grpc_service:   if set, limit GRPC log data by name of service
-
-    Returns:
-      output filename, or None on error
-    """
+def _make_request(  # pylint: disable=too-many-arguments
+        robot, hostname, start_nsec, end_nsec, timespan_spec, robot_time, channel, message_type,
+        grpc_service):
+    """Return the url, query parameters and Request for downloading bddf data."""
     time_sync_endpoint = None
     if not robot_time:
         # Establish time sync with robot to obtain skew.
@@ -108,9 +97,34 @@ def download_data(  # pylint: disable=too-many-arguments,too-many-locals
     if grpc_service:
         get_params['grpc_service'] = grpc_service
 
-    # Request the data.
     url = _bddf_url(hostname) + '?{}'.format(urlencode(get_params))
-    request = Request(url, headers=_http_headers(robot))
+    return url, get_params, Request(url, headers=_http_headers(robot))
+
+
+def download_data(  # pylint: disable=too-many-arguments,too-many-locals
+        robot, hostname, start_nsec=None, end_nsec=None, timespan_spec=None, output_filename=None,
+        robot_time=False, channel=None, message_type=None, grpc_service=None, show_progress=False):
+    """
+    Download data from robot in bddf format
+
+    Args:
+      robot:          API robot object
+      hostname:       hostname/ip-address of robot
+      start_nsec:     start time of log
+      end_nsec:       end time of log
+      timespan_spec:  if start_time, end_time are None, string representing the timespan to download
+      robot_time:     if True, timespan is in robot_clock, if False, in host clock
+      channel:        if set, limit data to download to a specific channel
+      message_type:   if set, limit data by specified message-type
+      grpc_service:   if set, limit GRPC log data by name of service
+
+    Returns:
+      output filename, or None on error
+    """
+    url, get_params, request = _make_request(robot, hostname, start_nsec, end_nsec, timespan_spec,
+                                             robot_time, channel, message_type, grpc_service)
+
+    # Request the data.
     context = ssl._create_unverified_context()  # pylint: disable=protected-access
     with urlopen(request, context=context, timeout=REQUEST_TIMEOUT) as resp:
         if resp.status != 200:
@@ -132,6 +146,164 @@ def download_data(  # pylint: disable=too-many-arguments,too-many-locals
     return outfile
 
 
+class _ResponseStream:
+    """Binary file-like object for parsing bddf data as it arrives in an http response.
+
+    Data from a partial earlier download (prefix) is read before the response body.
+    Everything read from the response is also written to tee_file, if specified.
+    """
+
+    def __init__(self, response, prefix=None, tee_file=None):
+        self._response = response
+        self._prefix = prefix
+        self._tee_file = tee_file
+        self._offset = 0
+
+    def tell(self):
+        """Return the number of bytes read so far."""
+        return self._offset
+
+    def read(self, nbytes):
+        """Read nbytes, or fewer if the end of the data is reached."""
+        chunks = []
+        remaining = nbytes
+        if self._prefix is not None:
+            chunk = self._prefix.read(remaining)
+            if len(chunk) < remaining:
+                self._prefix.close()
+                self._prefix = None
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        while remaining > 0:
+            chunk = self._response.read(remaining)
+            if not chunk:
+                break
+            if self._tee_file is not None:
+                self._tee_file.write(chunk)
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        data = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+        self._offset += len(data)
+        return data
+
+    def drain(self):
+        """Read the rest of the response, so all of it is written to tee_file."""
+        while self.read(REQUEST_CHUNK_SIZE):
+            pass
+
+    def close(self):
+        """Close the partial download file.  The response and tee_file are owned by the caller."""
+        if self._prefix is not None:
+            self._prefix.close()
+            self._prefix = None
+
+
+def _decode_block(series_descriptor, data, type_name_to_class):
+    """Return protobuf (if its class is known), POD samples (as a numpy array) or bytes."""
+    data_type = series_descriptor.WhichOneof("DataType")
+    if data_type == 'pod_type':
+        pod_type = series_descriptor.pod_type
+        samples = np.frombuffer(data, dtype=POD_TYPE_TO_NUMPY_DTYPE[pod_type.pod_type])
+        return samples.reshape((-1,) + tuple(pod_type.dimension))
+    if data_type == 'message_type':
+        protobuf_class = type_name_to_class.get(series_descriptor.message_type.type_name)
+        if protobuf_class is not None:
+            protobuf = protobuf_class()
+            protobuf.ParseFromString(data)
+            return protobuf
+    return data
+
+
+def stream_data(  # pylint: disable=too-many-arguments,too-many-locals
+        robot, hostname, start_nsec=None, end_nsec=None, timespan_spec=None, robot_time=False,
+        channel=None, message_type=None, grpc_service=None, output_filename=None, resume=False,
+        protobuf_classes=None, channels=None, message_types=None):
+    """
+    Download data from robot in bddf format, yielding the data blocks as they are received.
+
+    This is a generator.  The http response is parsed as it arrives, so processing can start
+    before the download completes, and the data does not need to be written to disk first.
+
+    Args:
+      robot:            API robot object
+      hostname:         hostname/ip-address of robot
+      start_nsec:       start time of log
+      end_nsec:         end time of log
+      timespan_spec:    if start_time, end_time are None, string representing the timespan
+      robot_time:       if True, timespan is in robot_clock, if False, in host clock
+      channel:          if set, limit data to download to a specific channel
+      message_type:     if set, limit data by specified message-type
+      grpc_service:     if set, limit GRPC log data by name of service
+      output_filename:  if set, also write the downloaded data to this file
+      resume:           if True and output_filename holds a partial earlier download, request
+                         only the rest of the data (using an http byte range), and parse the
+                         partial file before the newly received data
+      protobuf_classes: protobuf classes used to deserialize messages, by type name
+      channels:         if set, only yield data from series with these 'bosdyn:channel' names
+      message_types:    if set, only yield messages with these type names
+
+    Yields:
+      timestamp_nsec (int), SeriesDescriptor, data which is a deserialized protobuf if its class
+      is in protobuf_classes, POD samples as a numpy array of shape (num_samples,) + dimension
+      for POD series, or else bytes.
+
+    Raises:
+      urllib.error.HTTPError if the http request fails,
+      EOFError if the response ends before the end of the bddf data,
+      bosdyn.bddf.ParseError if the data has the wrong format.
+    """
+    type_name_to_class = {
+        protobuf_class.DESCRIPTOR.full_name: protobuf_class
+        for protobuf_class in (protobuf_classes or [])
+    }
+    channels = set(channels) if channels is not None else None
+    message_types = set(message_types) if message_types is not None else None
+    _url, _get_params, request = _make_request(robot, hostname, start_nsec, end_nsec,
+                                               timespan_spec, robot_time, channel, message_type,
+                                               grpc_service)
+    resume_offset = 0
+    if resume and output_filename and os.path.exists(output_filename):
+        resume_offset = os.path.getsize(output_filename)
+    if resume_offset:
+        request.add_header('Range', 'bytes={}-'.format(resume_offset))
+
+    context = ssl._create_unverified_context()  # pylint: disable=protected-access
+    with urlopen(request, context=context, timeout=REQUEST_TIMEOUT) as resp:
+        prefix = None
+        if resume_offset and resp.status == 206:
+            LOGGER.debug("Resuming download of %s at byte %d", output_filename, resume_offset)
+            prefix = open(output_filename, 'rb')
+            tee_file = open(output_filename, 'ab')
+        elif output_filename:
+            tee_file = open(output_filename, 'wb')
+        else:
+            tee_file = None
+        stream = _ResponseStream(resp, prefix, tee_file)
+        try:
+            reader = StreamDataReader(stream)
+            while True:
+                try:
+                    desc, series_descriptor, data = reader.read_data_block()
+                except EOFError:
+                    if reader.checksum is None:
+                        raise  # The data ended before the end of the bddf file.
+                    stream.drain()  # Read the end of the file after the checksum.
+                    return
+                if channels is not None and (series_descriptor.series_identifier.spec.get(
+                        'bosdyn:channel') not in channels):
+                    continue
+                if message_types is not None and (
+                        series_descriptor.WhichOneof("DataType") != 'message_type' or
+                        series_descriptor.message_type.type_name not in message_types):
+                    continue
+                yield (desc.timestamp.ToNanoseconds(), series_descriptor,
+                       _decode_block(series_descriptor, data, type_name_to_class))
+        finally:
+            stream.close()
+            if tee_file is not None:
+                tee_file.close()
+
+
 def _output_filename(response):
     """Get output filename either from http response, or default value."""
     content = response.headers['Content-Disposition']
@@ -8,6 +8,7 @@ import logging
 import warnings
 
 import grpc
+import grpc.aio
 
 from .exceptions import (ClientCancelledOperationError, InvalidAppTokenError,
                          InvalidClientCertificateError, NonexistentAuthorityError, NotFoundError,
@@ -66,7 +67,7 @@ def create_secure_channel_creds(cert, token_cb, add_app_token=None):
     return grpc.composite_channel_credentials(transport_creds, auth_creds)
 
 
-def create_secure_channel(address, port, creds, authority, options=[]):
+def create_secure_channel(address, port, creds, authority, options=[], aio=False):
     """Create a secure channel to given host:port.
 
     Args:
@@ -75,6 +76,7 @@ def create_secure_channel(address, port, creds, authority, options=[]):
         creds: A ChannelCredentials instance.
         authority: Authority option for the channel.
         options: A list of additional parameters for the GRPC channel.
+        aio: If True, create a grpc.aio channel for use with asyncio.
 
     Returns:
         A secure channel.
@@ -83,10 +85,12 @@ def create_secure_channel(address, port, creds, authority, options=[]):
     socket = '{}:{}'.format(address, port)
     complete_options = [('grpc.ssl_target_name_override', authority)]
     complete_options.extend(options)
+    if aio:
+        return grpc.aio.secure_channel(socket, creds, complete_options)
     return grpc.secure_channel(socket, creds, complete_options)
 
 
-def create_insecure_channel(address, port, authority=None, options=[]):
+def create_insecure_channel(address, port, authority=None, options=[], aio=False):
     """Create an insecure channel to given host and port.
 
     This method is only used for testing purposes. Applications must use secure channels to
@@ -97,6 +101,7 @@ def create_insecure_channel(address, port, authority=None, options=[]):
         port: Connection port.
         authority: Authority option for the channel.
         options: A list of additional parameters for the GRPC channel.
+        aio: If True, create a grpc.aio channel for use with asyncio.
 
     Returns:
         An insecure channel.
@@ -108,6 +113,8 @@ def create_insecure_channel(address, port, authority=None, options=[]):
         complete_options.extend([('grpc.ssl_target_name_override', authority)])
     if options:
         complete_options.extend(options)
+    if aio:
+        return grpc.aio.insecure_channel(socket, options=complete_options)
     return grpc.insecure_channel(socket, options=complete_options)
 
 
@@ -5,19 +5,27 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Contains elements common to all service clients."""
+import asyncio
+import concurrent.futures
+import contextlib
 import copy
 import functools
 import logging
 import math
 import socket
+import threading
+import time
 import types
 
 import grpc
+import grpc.aio
 import six
 
 from .channel import TransportError, translate_exception
+from .deadline import limit_timeout
 from .exceptions import (Error, InternalServerError, InvalidRequestError, LeaseUseError,
                          LicenseError, UnsetStatusError)
+from .rpc_stats import RpcStats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,6 +33,9 @@ from bosdyn.api import data_chunk_pb2, license_pb2
 
 DEFAULT_RPC_TIMEOUT = 30  # seconds
 
+# Bytes fields longer than this are replaced by a description of their size when logged.
+MAX_LOGGED_BYTES_FIELD_SIZE = 1024
+
 
 def common_header_errors(response):
     """Return an exception based on common response header. None if no error."""
@@ -240,6 +251,223 @@ def process_kwargs(func):
     return processor
 
 
+def _is_repeated(field):
+    try:
+        return field.is_repeated
+    except AttributeError:
+        return field.label == field.LABEL_REPEATED
+
+
+def _bytes_placeholder(data):
+    return '<{} bytes>'.format(len(data)).encode()
+
+
+def _trim_bytes_fields(message, max_size, trim):
+    """Find bytes fields of message longer than max_size, recursively.
+
+    If trim is True, the large fields are replaced by a placeholder.  Returns True if any large
+    bytes field was found.
+    """
+    found = False
+    for field, value in message.ListFields():
+        if field.type == field.TYPE_BYTES:
+            if _is_repeated(field):
+                for idx, data in enumerate(value):
+                    if len(data) > max_size:
+                        found = True
+                        if not trim:
+                            return True
+                        value[idx] = _bytes_placeholder(data)
+            elif len(value) > max_size:
+                found = True
+                if not trim:
+                    return True
+                setattr(message, field.name, _bytes_placeholder(value))
+        elif field.type == field.TYPE_MESSAGE:
+            if field.message_type.GetOptions().map_entry:
+                value_field = field.message_type.fields_by_name['value']
+                if value_field.type == value_field.TYPE_MESSAGE:
+                    submessages = value.values()
+                elif value_field.type == value_field.TYPE_BYTES:
+                    for key in list(value.keys()):
+                        if len(value[key]) > max_size:
+                            found = True
+                            if not trim:
+                                return True
+                            value[key] = _bytes_placeholder(value[key])
+                    continue
+                else:
+                    continue
+            elif _is_repeated(field):
+                submessages = value
+            else:
+                submessages = [value]
+            for submessage in submessages:
+                if _trim_bytes_fields(submessage, max_size, trim):
+                    found = True
+                    if not trim:
+                        return True
+    return found
+
+
+def trim_large_bytes_fields(message, max_size=MAX_LOGGED_BYTES_FIELD_SIZE):
+    """Return message with any bytes field longer than max_size replaced by its size.
+
+    The message itself is never modified.  If it has large bytes fields, a trimmed copy is
+    returned; otherwise the message is returned as is.  Objects which are not protobuf messages
+    are returned unchanged.
+    """
+    if not hasattr(message, 'ListFields') or not _trim_bytes_fields(message, max_size, False):
+        return message
+    trimmed = type(message)()
+    trimmed.CopyFrom(message)
+    _trim_bytes_fields(trimmed, max_size, True)
+    return trimmed
+
+
+def _mutated_fields(processors):
+    """Return the names of the request fields which processors may change.
+
+    Returns None if any processor does not declare the fields it changes (mutated_fields).
+    """
+    field_names = set()
+    for proc in processors:
+        proc_fields = getattr(proc, 'mutated_fields', None)
+        if proc_fields is None:
+            return None
+        field_names.update(proc_fields)
+    return field_names
+
+
+def _save_fields(message, field_names):
+    """Return (names, saved) where saved is a message holding copies of the named fields."""
+    fields_by_name = message.DESCRIPTOR.fields_by_name
+    names = [name for name in field_names if name in fields_by_name]
+    saved = type(message)()
+    for name in names:
+        field = fields_by_name[name]
+        if _is_repeated(field):
+            getattr(saved, name).MergeFrom(getattr(message, name))
+        elif field.type == field.TYPE_MESSAGE:
+            if message.HasField(name):
+                getattr(saved, name).CopyFrom(getattr(message, name))
+        else:
+            setattr(saved, name, getattr(message, name))
+    return names, saved
+
+
+def _restore_fields(message, names, saved):
+    """Restore the fields of message saved by _save_fields()."""
+    for name in names:
+        message.ClearField(name)
+    message.MergeFrom(saved)
+
+
+class _LazyLogArg(object):  # pylint: disable=too-few-public-methods
+    """Log argument which formats a message only if the log record is emitted."""
+
+    __slots__ = ('_format_func', '_message')
+
+    def __init__(self, format_func, message):
+        self._format_func = format_func
+        self._message = message
+
+    def __str__(self):
+        return str(self._format_func(self._message))
+
+
+def _method_name(rpc_method):
+    """Return the full name of the rpc method of a grpc multi-callable, or None."""
+    method = getattr(rpc_method, '_method', None)
+    if isinstance(method, bytes):
+        return method.decode()
+    return method
+
+
+class _RpcStatsRecorder(object):
+    """Measures the RpcStats of one rpc and reports them to the rpc_stats_sinks of a client.
+
+    Used as a context manager around the request and response processors, to measure their time.
+    """
+
+    def __init__(self, sinks, rpc_method):
+        self._sinks = sinks
+        self._method = _method_name(rpc_method)
+        self._start = time.perf_counter()
+        self._processor_start = None
+        self._processor_time = 0.0
+        self._request_bytes = 0
+        self._response_bytes = 0
+
+    def __enter__(self):
+        self._processor_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._processor_time += time.perf_counter() - self._processor_start
+
+    def add_request(self, request):
+        if request is not None:
+            self._request_bytes += request.ByteSize()
+
+    def add_response(self, response):
+        if response is not None:
+            self._response_bytes += response.ByteSize()
+
+    def finish(self, error=None):
+        """Report the stats of the rpc, which failed if error is not None."""
+        if isinstance(error, TransportError):
+            error = translate_exception(error)
+        stats = RpcStats(self._method,
+                         time.perf_counter() - self._start, self._processor_time,
+                         self._request_bytes, self._response_bytes,
+                         None if error is None else type(error).__name__)
+        for sink in self._sinks:
+            try:
+                sink.record(stats)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Error recording rpc stats.')
+
+    def finish_with_response(self, response, error_from_response):
+        """Report the stats of the rpc, with the error error_from_response finds in response."""
+        self.finish(None if error_from_response is None else error_from_response(response))
+
+    def finish_future(self, future):
+        """Report the stats of the rpc which completed future."""
+        if future.cancelled():
+            self.finish(concurrent.futures.CancelledError())
+        else:
+            self.finish(future.exception())
+
+
+class _NoRpcStatsRecorder(object):
+    """Stands in for _RpcStatsRecorder when a client has no rpc_stats_sinks."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def add_request(self, request):
+        pass
+
+    def add_response(self, response):
+        pass
+
+    def finish(self, error=None):
+        pass
+
+    def finish_with_response(self, response, error_from_response):
+        pass
+
+    def finish_future(self, future):
+        pass
+
+
+_NO_RPC_STATS = _NoRpcStatsRecorder()
+
+
 class BaseClient(object):
     """Helper base class for all clients to Boston Dynamics services."""
 
@@ -251,6 +479,7 @@ class BaseClient(object):
                                            'BaseClient').split(BaseClient._SPLIT_SERVICE)[-1]
 
         self._channel = None
+        self._is_aio = False
         self._logger = None
         self._name = name
         self._stub = None
@@ -259,16 +488,40 @@ class BaseClient(object):
         self.logger = logging.getLogger(self._name or 'bosdyn.{}'.format(self._service_type_short))
         self.request_processors = []
         self.response_processors = []
+        # RpcStatsSinks which receive the RpcStats of each rpc, see bosdyn.client.rpc_stats.
+        self.rpc_stats_sinks = []
+        # AdaptiveTimeouts choosing the timeout of rpcs made without an explicit timeout.
+        self.adaptive_timeouts = None
+        # ResponseCache sharing the responses of idempotent rpcs, see bosdyn.client.response_cache.
+        self.response_cache = None
+        # If True, requests are not deep-copied when every request processor declares the fields
+        # it mutates.  See call().
+        self.restore_request_fields = False
         self.lease_wallet = None
         self.client_name = None
 
     @staticmethod
     def request_trim_for_log(req):
-        return '\n{}\n'.format(req)
+        """Format a request for the debug log, omitting the contents of large bytes fields.
+
+        Clients may override this to customize what is logged for their requests.
+        """
+        return '\n{}\n'.format(trim_large_bytes_fields(req))
 
     @staticmethod
     def response_trim_for_log(resp):
-        return '\n{}\n'.format(resp)
+        """Format a response for the debug log, omitting the contents of large bytes fields.
+
+        Clients may override this to customize what is logged for their responses.
+        """
+        return '\n{}\n'.format(trim_large_bytes_fields(resp))
+
+    def _request_log_arg(self, request):
+        # Formatting large messages is expensive, so only do it if the record is emitted.
+        return _LazyLogArg(self.request_trim_for_log, request)
+
+    def _response_log_arg(self, response):
+        return _LazyLogArg(self.response_trim_for_log, response)
 
     @property
     def channel(self):
@@ -279,38 +532,60 @@ class BaseClient(object):
     @channel.setter
     def channel(self, channel):
         self._channel = channel
+        self._is_aio = isinstance(channel, grpc.aio.Channel)
         self._stub = self._stub_creation_func(channel)
 
+    @property
+    def is_aio(self):
+        """True if the client uses a grpc.aio channel.
+
+        The rpc methods of an aio client return awaitables instead of results or futures: every
+        method which returns the result of call() or call_async() becomes a coroutine.  Methods
+        of streaming rpcs return an AioStreamingResponse.
+        """
+        return self._is_aio
+
     def update_from(self, other):
         """Adopt key objects like processors, logger, and wallet from other."""
         self.request_processors = other.request_processors + self.request_processors
         self.response_processors = other.response_processors + self.response_processors
+        self.rpc_stats_sinks = other.rpc_stats_sinks + self.rpc_stats_sinks
+        if self.adaptive_timeouts is None:
+            self.adaptive_timeouts = other.adaptive_timeouts
+        if self.response_cache is None:
+            self.response_cache = other.response_cache
         self.logger = other.logger.getChild(self._name or self._service_type_short)
         self.lease_wallet = other.lease_wallet
         self.client_name = other.client_name
 
     def update_request_iterator(self, request_iterator, logger, rpc_method, is_blocking,
-                                copy_request=True):
+                                copy_request=True, rpc_stats=_NO_RPC_STATS):
         for request in request_iterator:
-            request = self._apply_request_processors(request, copy_request=copy_request)
-            if is_blocking:
-                logger.debug('blocking request: %s %s', rpc_method._method,
-                             self.request_trim_for_log(request))
-            else:
-                logger.debug('async request: %s %s', rpc_method._method,
-                             self.request_trim_for_log(request))
-            yield request
+            # The request is serialized before the next one is requested from this generator,
+            # so its fields can be restored once it has been yielded.
+            with self._processed_request(request, copy_request, rpc_stats) as request:
+                if is_blocking:
+                    logger.debug('blocking request: %s %s', rpc_method._method,
+                                 self._request_log_arg(request))
+                else:
+                    logger.debug('async request: %s %s', rpc_method._method,
+                                 self._request_log_arg(request))
+                yield request
 
-    def update_response_iterator(self, response_iterator, logger, rpc_method, is_blocking):
+    def update_response_iterator(self, response_iterator, logger, rpc_method, is_blocking,
+                                 rpc_stats=_NO_RPC_STATS):
         try:
             for response in response_iterator:
-                response = self._apply_response_processors(copy.deepcopy(response))
+                # Each streamed response is a new message, so it is not copied.
+                with rpc_stats:
+                    response = self._apply_response_processors(response)
+                rpc_stats.add_response(response)
                 if is_blocking:
                     logger.debug('blocking response: %s %s', rpc_method._method,
-                                 self.request_trim_for_log(response))
+                                 self._response_log_arg(response))
                 else:
                     logger.debug('async response: %s %s', rpc_method._method,
-                                 self.request_trim_for_log(response))
+                                 self._response_log_arg(response))
                 yield response
         except TransportError as e:
             # Iterating through the response_iterator is the point that transport exceptions will
@@ -329,21 +604,63 @@ class BaseClient(object):
         value_from_response and error_from_response should not raise their own exceptions!
         Additionally, value_from_response and error_from_response that are not common handlers
         must accept streaming responses if it is a grpc streaming response.
+
+        If the client uses a grpc.aio channel, returns an awaitable for the result instead.
+
+        Responses of unary rpcs may come from the client's response_cache, see ResponseCache.
+
+        With copy_request=True, the request processors are applied to a copy of the request, and
+        the caller's request is never modified.  Copying a large request can be avoided by setting
+        restore_request_fields on the client: when every request processor declares the fields it
+        mutates, those fields are then changed in the caller's request itself and restored once it
+        is serialized.  Only do so if requests are not shared with other threads, since they may
+        see another call's header or lease in the meantime.
         """
+        if self._is_aio:
+            return self._call_aio(rpc_method, request, value_from_response, error_from_response,
+                                  copy_request, **kwargs)
+        cache = self.response_cache
+        if cache is not None and isinstance(rpc_method, grpc.UnaryUnaryMultiCallable):
+            method = _method_name(rpc_method)
+            if cache.ttl(method) is not None:
+                response = cache.get(
+                    self.channel, method, request,
+                    functools.partial(self._call_with_stats, rpc_method, request, None,
+                                      error_from_response, copy_request, **kwargs))
+                return self.handle_response(response, None, value_from_response)
+        return self._call_with_stats(rpc_method, request, value_from_response,
+                                     error_from_response, copy_request, **kwargs)
+
+    def _call_with_stats(self, rpc_method, request, value_from_response, error_from_response,
+                         copy_request, **kwargs):
+        rpc_stats = self._rpc_stats(rpc_method)
+        try:
+            result = self._call(rpc_method, request, value_from_response, error_from_response,
+                                copy_request, rpc_stats, **kwargs)
+        except Exception as exc:
+            rpc_stats.finish(exc)
+            raise
+        rpc_stats.finish()
+        return result
+
+    def _call(self, rpc_method, request, value_from_response, error_from_response, copy_request,
+              rpc_stats, **kwargs):
         logger = self._get_logger(rpc_method)
-        if isinstance(rpc_method, grpc.StreamUnaryMultiCallable) or isinstance(
-                rpc_method, grpc.StreamStreamMultiCallable):
-            # The incoming request is a streaming request.
-            request = self.update_request_iterator(request, logger, rpc_method, is_blocking=True,
-                                                   copy_request=copy_request)
-        else:
-            request = self._apply_request_processors(request, copy_request=copy_request)
-            logger.debug('blocking request: %s %s', rpc_method._method,
-                         self.request_trim_for_log(request))
-
+        timeout = self._rpc_timeout(rpc_method, kwargs)
         try:
-            timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
-            response = rpc_method(request, timeout=timeout, **kwargs)
+            if isinstance(rpc_method, grpc.StreamUnaryMultiCallable) or isinstance(
+                    rpc_method, grpc.StreamStreamMultiCallable):
+                # The incoming request is a streaming request.
+                request = self.update_request_iterator(request, logger, rpc_method,
+                                                       is_blocking=True, copy_request=copy_request,
+                                                       rpc_stats=rpc_stats)
+                response = rpc_method(request, timeout=timeout, **kwargs)
+            else:
+                # The request is serialized before rpc_method returns.
+                with self._processed_request(request, copy_request, rpc_stats) as request:
+                    logger.debug('blocking request: %s %s', rpc_method._method,
+                                 self._request_log_arg(request))
+                    response = rpc_method(request, timeout=timeout, **kwargs)
         except TransportError as e:
             # Use the "raise from None" pattern to reset the exception's context, which produces
             # confusing stack traces.
@@ -352,13 +669,15 @@ class BaseClient(object):
         if isinstance(rpc_method, grpc.UnaryStreamMultiCallable) or isinstance(
                 rpc_method, grpc.StreamStreamMultiCallable):
             # The outgoing response is a streaming response.
-            response = self.update_response_iterator(response, logger, rpc_method, is_blocking=True)
+            response = self.update_response_iterator(response, logger, rpc_method, is_blocking=True,
+                                                     rpc_stats=rpc_stats)
             return self.handle_response_streaming(list(response), error_from_response,
                                                   value_from_response)
         else:
-            response = self._apply_response_processors(response)
-            logger.debug('response: %s %s', rpc_method._method,
-                         self.response_trim_for_log(response))
+            with rpc_stats:
+                response = self._apply_response_processors(response)
+            rpc_stats.add_response(response)
+            logger.debug('response: %s %s', rpc_method._method, self._response_log_arg(response))
             return self.handle_response(response, error_from_response, value_from_response)
 
     def handle_response(self, response, error_from_response, value_from_response):
@@ -391,26 +710,44 @@ class BaseClient(object):
         value_from_response and error_from_response should not raise their own exceptions!
 
         Asynchronous calls cannot be done with streaming rpcs right now.
+
+        If the client uses a grpc.aio channel, returns an asyncio.Future instead.
         """
-        request = self._apply_request_processors(request, copy_request=copy_request)
+        if self._is_aio:
+            return asyncio.ensure_future(
+                self._call_aio(rpc_method, request, value_from_response, error_from_response,
+                               copy_request, **kwargs))
         logger = self._get_logger(rpc_method)
-        logger.debug('async request: %s %s', rpc_method._method, self.request_trim_for_log(request))
-        timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
-        response_future = rpc_method.future(request, timeout=timeout, **kwargs)
+        timeout = self._rpc_timeout(rpc_method, kwargs)
+        rpc_stats = self._rpc_stats(rpc_method)
+        # The request is serialized before future() returns.
+        try:
+            with self._processed_request(request, copy_request, rpc_stats) as request:
+                logger.debug('async request: %s %s', rpc_method._method,
+                             self._request_log_arg(request))
+                response_future = rpc_method.future(request, timeout=timeout, **kwargs)
+        except Exception as exc:
+            rpc_stats.finish(exc)
+            raise
 
         def on_finish(fut):
             try:
                 result = fut.result()
             except Exception as exc:  # pylint: disable=broad-except
                 logger.debug('async exception: %s\n%s\n', rpc_method._method, exc)
+                rpc_stats.finish(exc)
             else:
                 try:
-                    self._apply_response_processors(result)
-                except Exception:  # pylint: disable=broad-except
+                    with rpc_stats:
+                        self._apply_response_processors(result)
+                except Exception as exc:  # pylint: disable=broad-except
                     logger.exception("Error applying response processors.")
+                    rpc_stats.finish(exc)
                 else:
                     logger.debug('async response: %s %s', rpc_method._method,
-                                 self.response_trim_for_log(result))
+                                 self._response_log_arg(result))
+                    rpc_stats.add_response(result)
+                    rpc_stats.finish_with_response(result, error_from_response)
 
         response_future.add_done_callback(on_finish)
         return FutureWrapper(response_future, value_from_response, error_from_response)
@@ -424,6 +761,167 @@ class BaseClient(object):
             proc.mutate(request)
         return request
 
+    def call_async_streaming(self, rpc_method, request, value_from_response=None,
+                             error_from_response=None, chunk_from_response=None,
+                             progress_cb=None, copy_request=True, **kwargs):
+        """Returns a StreamingFuture for a response-streaming rpc_method(request, kwargs).
+
+        The responses are handled as they arrive, on a background daemon thread of the rpc:
+        response processors are applied to each response, then error_from_response is called
+        with a list of that single response.  The first error found completes the future.
+
+        If chunk_from_response is given, it must return the DataChunk of a response.  The data
+        of the chunks is reassembled into a buffer preallocated from DataChunk.total_size, and
+        only the first response is kept.  value_from_response is then called with
+        (first response, data as a bytearray).  Otherwise, value_from_response is called with
+        the list of responses, as in call().
+
+        Args:
+            progress_cb: Optional function called after each response with (number of bytes
+                received, total number of bytes) if chunk_from_response is given, or else with
+                (number of responses received, None).  The total is None if unknown.
+
+        Cancelling the future cancels the rpc.
+
+        If the client uses a grpc.aio channel, returns an asyncio.Future instead.
+        """
+        handler = _StreamingResponseHandler(value_from_response, error_from_response,
+                                            chunk_from_response, progress_cb)
+        if self._is_aio:
+            responses = self._call_aio(rpc_method, request, None, None, copy_request, **kwargs)
+            return asyncio.ensure_future(handler.handle_aio(responses))
+
+        logger = self._get_logger(rpc_method)
+        rpc_stats = self._rpc_stats(rpc_method)
+        try:
+            with self._processed_request(request, copy_request, rpc_stats) as request:
+                logger.debug('async request: %s %s', rpc_method._method,
+                             self._request_log_arg(request))
+                timeout = self._rpc_timeout(rpc_method, kwargs)
+                try:
+                    response_iterator = rpc_method(request, timeout=timeout, **kwargs)
+                except TransportError as e:
+                    six.raise_from(translate_exception(e), None)
+        except Exception as exc:
+            rpc_stats.finish(exc)
+            raise
+        future = StreamingFuture(response_iterator)
+        future.add_done_callback(rpc_stats.finish_future)
+        responses = self.update_response_iterator(response_iterator, logger, rpc_method,
+                                                  is_blocking=False, rpc_stats=rpc_stats)
+        # One thread per stream, so a long stream never delays the responses of another.
+        thread = threading.Thread(target=handler.handle, args=(responses, future),
+                                  name='bosdyn-streaming')
+        thread.daemon = True
+        thread.start()
+        return future
+
+    def _call_aio(self, rpc_method, request, value_from_response, error_from_response,
+                  copy_request, **kwargs):
+        # Requests are copied even with restore_request_fields, because a grpc.aio call serializes
+        # its request later, while other coroutines may use the same request.
+        logger = self._get_logger(rpc_method)
+        kwargs['timeout'] = self._rpc_timeout(rpc_method, kwargs)
+        # Streaming rpcs of aio clients are not reported to the rpc_stats_sinks.
+        rpc_stats = _NO_RPC_STATS
+        if isinstance(rpc_method,
+                      (grpc.aio.StreamUnaryMultiCallable, grpc.aio.StreamStreamMultiCallable)):
+            request = self._aio_request_iterator(request, logger, rpc_method, copy_request)
+        else:
+            if isinstance(rpc_method, grpc.aio.UnaryUnaryMultiCallable):
+                rpc_stats = self._rpc_stats(rpc_method)
+            with rpc_stats:
+                request = self._apply_request_processors(request, copy_request=copy_request)
+            rpc_stats.add_request(request)
+            logger.debug('aio request: %s %s', rpc_method._method, self._request_log_arg(request))
+        if isinstance(rpc_method,
+                      (grpc.aio.UnaryStreamMultiCallable, grpc.aio.StreamStreamMultiCallable)):
+            return AioStreamingResponse(self, rpc_method, request, value_from_response,
+                                        error_from_response, logger, **kwargs)
+        return self._call_aio_unary(rpc_method, request, value_from_response, error_from_response,
+                                    logger, rpc_stats, **kwargs)
+
+    async def _call_aio_unary(self, rpc_method, request, value_from_response,
+                              error_from_response, logger, rpc_stats, **kwargs):
+        try:
+            try:
+                response = await rpc_method(request, **kwargs)
+            except TransportError as e:
+                six.raise_from(translate_exception(e), None)
+            with rpc_stats:
+                response = self._apply_response_processors(response)
+            rpc_stats.add_response(response)
+            logger.debug('aio response: %s %s', rpc_method._method,
+                         self._response_log_arg(response))
+            result = self.handle_response(response, error_from_response, value_from_response)
+        except BaseException as exc:
+            rpc_stats.finish(exc)
+            raise
+        rpc_stats.finish()
+        return result
+
+    async def _aio_request_iterator(self, request_iterator, logger, rpc_method, copy_request):
+        """Apply request processors to a stream of requests, which may be an async iterable."""
+        if not hasattr(request_iterator, '__aiter__'):
+            request_iterator = _as_async_iterator(request_iterator)
+        async for request in request_iterator:
+            request = self._apply_request_processors(request, copy_request=copy_request)
+            logger.debug('aio request: %s %s', rpc_method._method, self._request_log_arg(request))
+            yield request
+
+    @contextlib.contextmanager
+    def _processed_request(self, request, copy_request=True, rpc_stats=_NO_RPC_STATS):
+        """Context manager providing the request with the request processors applied.
+
+        If copy_request is True, the caller's request is unchanged once the context exits.  It is
+        deep-copied, unless restore_request_fields is set and every request processor declares
+        the request fields it may change (mutated_fields): then only those fields are saved,
+        changed in place and restored on exit.
+        """
+        field_names = None
+        if copy_request and self.restore_request_fields and request is not None:
+            field_names = _mutated_fields(self.request_processors)
+        if field_names is None:
+            with rpc_stats:
+                request = self._apply_request_processors(request, copy_request=copy_request)
+            rpc_stats.add_request(request)
+            yield request
+            return
+        with rpc_stats:
+            names, saved = _save_fields(request, field_names)
+        try:
+            with rpc_stats:
+                processed = self._apply_request_processors(request, copy_request=False)
+            rpc_stats.add_request(processed)
+            yield processed
+        finally:
+            with rpc_stats:
+                _restore_fields(request, names, saved)
+
+    def _rpc_stats(self, rpc_method):
+        """Returns the recorder for the RpcStats of an rpc, which does nothing without sinks."""
+        sinks = self.rpc_stats_sinks
+        if self.adaptive_timeouts is not None:
+            sinks = sinks + [self.adaptive_timeouts]
+        if not sinks:
+            return _NO_RPC_STATS
+        return _RpcStatsRecorder(sinks, rpc_method)
+
+    def _rpc_timeout(self, rpc_method, kwargs):
+        """Pop the timeout of an rpc from kwargs, limited by the Deadline of the current context.
+
+        Without an explicit timeout, the timeout is the one chosen by adaptive_timeouts for the
+        rpc method, if set, or else DEFAULT_RPC_TIMEOUT.
+        """
+        if 'timeout' in kwargs:
+            timeout = kwargs.pop('timeout')
+        elif self.adaptive_timeouts is not None:
+            timeout = self.adaptive_timeouts.timeout(_method_name(rpc_method),
+                                                     DEFAULT_RPC_TIMEOUT)
+        else:
+            timeout = DEFAULT_RPC_TIMEOUT
+        return limit_timeout(timeout)
+
     def _apply_response_processors(self, response):
         if response is None:
             return
@@ -456,6 +954,205 @@ class BaseClient(object):
             yield chunk
 
 
+async def _as_async_iterator(iterable):
+    for item in iterable:
+        yield item
+
+
+class AioStreamingResponse(object):
+    """The responses of a streaming rpc called through a grpc.aio channel.
+
+    Iterate over it with "async for" to receive each response as it arrives, or await it to get
+    the result of the client's value_from_response for the list of all responses.  The rpc is
+    started on first use, and the responses can only be received once.
+    """
+
+    def __init__(self, client, rpc_method, request, value_from_response, error_from_response,
+                 logger, **kwargs):
+        self._client = client
+        self._rpc_method = rpc_method
+        self._request = request
+        self._value_from_response = value_from_response
+        self._error_from_response = error_from_response
+        self._logger = logger
+        self._kwargs = kwargs
+        self._started = False
+
+    def __aiter__(self):
+        return self._responses()
+
+    def __await__(self):
+        return self._result().__await__()
+
+    async def _responses(self):
+        if self._started:
+            raise RuntimeError('The responses of a streaming rpc can only be received once.')
+        self._started = True
+        try:
+            async for response in self._rpc_method(self._request, **self._kwargs):
+                response = self._client._apply_response_processors(response)
+                self._logger.debug('aio response: %s %s', self._rpc_method._method,
+                                   self._client._response_log_arg(response))
+                yield response
+        except TransportError as e:
+            six.raise_from(translate_exception(e), None)
+
+    async def _result(self):
+        responses = [response async for response in self._responses()]
+        return self._client.handle_response_streaming(responses, self._error_from_response,
+                                                      self._value_from_response)
+
+
+class DataChunkAssembler(object):
+    """Reassembles data split into DataChunks (see BaseClient.chunk_message).
+
+    The data is copied into one buffer, preallocated from the total_size of the first chunk.
+    """
+
+    def __init__(self):
+        self._buffer = None
+        self._num_bytes = 0
+        self.total_size = None
+
+    @property
+    def num_bytes(self):
+        """Number of bytes of data received so far."""
+        return self._num_bytes
+
+    @property
+    def data(self):
+        """The data received so far, as a bytearray."""
+        if self._buffer is None:
+            return bytearray()
+        if self._num_bytes < len(self._buffer):
+            return self._buffer[:self._num_bytes]
+        return self._buffer
+
+    def add(self, chunk):
+        """Add the data of the next DataChunk."""
+        if self._buffer is None:
+            self.total_size = chunk.total_size or None
+            self._buffer = bytearray(chunk.total_size)
+        end = self._num_bytes + len(chunk.data)
+        if end > len(self._buffer):
+            # More data than total_size said.
+            self._buffer.extend(bytes(end - len(self._buffer)))
+        self._buffer[self._num_bytes:end] = chunk.data
+        self._num_bytes = end
+
+
+class _StreamingResponseHandler(object):
+    """Handles the responses of a streaming rpc one at a time, for call_async_streaming()."""
+
+    def __init__(self, value_from_response, error_from_response, chunk_from_response,
+                 progress_cb):
+        self._value_from_response = value_from_response
+        self._error_from_response = error_from_response
+        self._chunk_from_response = chunk_from_response
+        self._progress_cb = progress_cb
+        self._responses = []
+        self._assembler = DataChunkAssembler() if chunk_from_response else None
+
+    def add(self, response):
+        """Handle the next response.  Raises its error, if any."""
+        if self._error_from_response is not None:
+            exc = self._error_from_response([response])
+            if exc is not None:
+                raise exc  # pylint: disable=raising-bad-type
+        if self._assembler is None:
+            self._responses.append(response)
+            progress = (len(self._responses), None)
+        else:
+            if not self._responses:
+                self._responses.append(response)
+            self._assembler.add(self._chunk_from_response(response))
+            progress = (self._assembler.num_bytes, self._assembler.total_size)
+        if self._progress_cb is not None:
+            self._progress_cb(*progress)
+
+    def result(self):
+        """Returns the value for all the responses handled."""
+        if self._assembler is None:
+            if self._value_from_response is None:
+                return self._responses
+            return self._value_from_response(self._responses)
+        first_response = self._responses[0] if self._responses else None
+        if self._value_from_response is None:
+            return first_response, self._assembler.data
+        return self._value_from_response(first_response, self._assembler.data)
+
+    def handle(self, response_iterator, future):
+        """Handle all responses from response_iterator, then complete future."""
+        try:
+            for response in response_iterator:
+                if future.cancelled():
+                    return
+                self.add(response)
+            result = self.result()
+        except Exception as exc:  # pylint: disable=broad-except
+            future._set_exception(exc)
+        else:
+            future._set_result(result)
+
+    async def handle_aio(self, responses):
+        """Handle all responses from an AioStreamingResponse and return the result."""
+        async for response in responses:
+            self.add(response)
+        return self.result()
+
+
+class StreamingFuture(object):
+    """Future for the result of a streaming rpc started by BaseClient.call_async_streaming()."""
+
+    def __init__(self, call):
+        self._call = call
+        self._future = concurrent.futures.Future()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return self._future.__repr__()
+
+    def cancel(self):
+        """Cancel the rpc.  Returns False if it already completed with a result or error."""
+        with self._lock:
+            if not self._future.cancel():
+                return False
+        self._call.cancel()
+        return True
+
+    def cancelled(self):
+        return self._future.cancelled()
+
+    def running(self):
+        return not self._future.done()
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Wait for and return the result, or raise the error of the rpc."""
+        return self._future.result(timeout=timeout)
+
+    def exception(self, timeout=None):
+        return self._future.exception(timeout=timeout)
+
+    def add_done_callback(self, cb):
+        """Call cb(self) when the rpc completes or is cancelled."""
+        self._future.add_done_callback(lambda _future: cb(self))
+
+    def _set_result(self, result):
+        with self._lock:
+            if not self._future.cancelled():
+                self._future.set_result(result)
+
+    def _set_exception(self, exc):
+        with self._lock:
+            if not self._future.cancelled():
+                self._future.set_exception(exc)
+        # Stop receiving the rest of the responses.
+        self._call.cancel()
+
+
 class FutureWrapper():
     """Wraps a Future to aid more complicated clients' async calls."""
 
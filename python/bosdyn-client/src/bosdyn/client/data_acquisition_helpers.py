@@ -23,6 +23,7 @@ from google.protobuf.struct_pb2 import Struct
 import bosdyn.client
 import bosdyn.client.util
 from bosdyn.api import data_acquisition_pb2, data_acquisition_store_pb2
+from bosdyn.client.deadline import current_deadline
 from bosdyn.client.exceptions import ResponseError
 
 # Logger for all the debug information from the tests.
@@ -77,7 +78,8 @@ def acquire_and_process_request(data_acquisition_client, acquisition_requests, g
         group_name(string): Group name for the acquisitions.
         action_name(string): Action name for the acquisitions.
         metadata(data_acquisition_pb2.Metadata): Metadata to include in the request message.
-        block_until_complete(Boolean): If true, don't return until the GetStatus completes.
+        block_until_complete(Boolean): If true, don't return until the GetStatus completes, or
+            the Deadline of the current context passes.
         data_timestamp: Timestamp to use for the acquisitions. If None the timestamp will be
             generated by the data acquisition client.
 
@@ -99,7 +101,11 @@ def acquire_and_process_request(data_acquisition_client, acquisition_requests, g
 
     # Monitor the status of the data acquisition.
     print("Waiting for acquisition (id: %s) to complete." % str(request_id))
+    deadline = current_deadline()
     while True:
+        if deadline is not None and deadline.expired:
+            print("Deadline exceeded waiting for acquisition (id: %s)." % str(request_id))
+            return False
         get_status_response = None
         try:
             get_status_response = data_acquisition_client.get_status(request_id)
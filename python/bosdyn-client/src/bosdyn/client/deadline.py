@@ -0,0 +1,87 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Overall deadlines for the rpcs made by service clients within a context.
+
+    with Deadline(5.0):
+        blocking_stand(command_client)
+        state = state_client.get_robot_state()
+
+Every rpc made within the context times out at the deadline, if not earlier because of its own
+timeout, and fails with a TimedOutError once the deadline has passed.  Deadlines are stored in
+a context variable, so they apply to the current thread or asyncio task only.  Nested deadlines
+can only make the current deadline earlier.
+"""
+import contextvars
+import time
+
+_CURRENT_DEADLINE = contextvars.ContextVar('bosdyn_client_deadline', default=None)
+
+
+class Deadline(object):
+    """A point in time by which all rpcs made within the context must complete.
+
+    Args:
+        timeout: Seconds from now until the deadline.
+    """
+
+    def __init__(self, timeout):
+        self._end_time = time.monotonic() + timeout
+        self._tokens = []
+
+    @property
+    def end_time(self):
+        """Time of the deadline, in the time.monotonic() clock."""
+        return self._end_time
+
+    @property
+    def remaining(self):
+        """Seconds until the deadline, negative once it has passed."""
+        return self._end_time - time.monotonic()
+
+    @property
+    def expired(self):
+        """True if the deadline has passed."""
+        return self.remaining <= 0
+
+    def limit_timeout(self, timeout):
+        """Return the smaller of timeout and the remaining time, at least 0.
+
+        Args:
+            timeout: Timeout in seconds, or None for no timeout.
+        """
+        remaining = max(0, self.remaining)
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def __enter__(self):
+        current = _CURRENT_DEADLINE.get()
+        if current is not None and current.end_time < self._end_time:
+            self._tokens.append(_CURRENT_DEADLINE.set(current))
+        else:
+            self._tokens.append(_CURRENT_DEADLINE.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _CURRENT_DEADLINE.reset(self._tokens.pop())
+
+
+def current_deadline():
+    """Return the Deadline of the current context, or None."""
+    return _CURRENT_DEADLINE.get()
+
+
+def limit_timeout(timeout):
+    """Return timeout limited by the Deadline of the current context, if any.
+
+    Args:
+        timeout: Timeout in seconds, or None for no timeout.
+    """
+    deadline = _CURRENT_DEADLINE.get()
+    if deadline is None:
+        return timeout
+    return deadline.limit_timeout(timeout)
@@ -99,8 +99,8 @@ class EstopClient(BaseClient):
             kwargs: Passed to underlying RPC. Example: timeout=5 to cancel the RPC after 5 seconds.
         """
         req = self._build_deregister_request(target_config_id, endpoint)
-        self.call(self._stub.DeregisterEstopEndpoint, req, None,
-                  _deregister_endpoint_error_from_response, copy_request=False, **kwargs)
+        return self.call(self._stub.DeregisterEstopEndpoint, req, None,
+                         _deregister_endpoint_error_from_response, copy_request=False, **kwargs)
 
     def deregister_async(self, target_config_id, endpoint, **kwargs):
         """Async version of deregister()"""
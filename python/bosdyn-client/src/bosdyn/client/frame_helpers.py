@@ -4,6 +4,8 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import numpy
+
 from bosdyn.api import geometry_pb2
 
 from . import math_helpers
@@ -64,40 +66,193 @@ def validate_frame_tree_snapshot(frame_tree_snapshot):
     if not frame_tree_snapshot:
         raise ValueError('No frame_tree_snapshot')
 
-    # For every entry in the map, see if we can walk to the root without
-    # cycles. The root should also be identical for each node
+    _find_frame_roots(frame_tree_snapshot.child_to_parent_edge_map)
+    return True
 
-    def _walk_up_tree(frame_name):
-        cur_frame_name = frame_name
-        visited_frames = set()
-        visited_frames.add(cur_frame_name)
-        while True:
-            edge = frame_tree_snapshot.child_to_parent_edge_map.get(cur_frame_name)
-            if not edge:
-                raise ValidateFrameTreeUnknownFrameError()
-            if not edge.parent_frame_name:
-                # At the root of the tree
-                break
-            if edge.parent_frame_name in visited_frames:
-                raise ValidateFrameTreeCycleError()
-            visited_frames.add(edge.parent_frame_name)
-            cur_frame_name = edge.parent_frame_name
-        return cur_frame_name
 
-    root = None
-    if not frame_tree_snapshot.child_to_parent_edge_map:
+def _find_frame_roots(child_to_parent_edge_map):
+    """Returns a dict of each child frame name to the name of the root of its tree.
+
+    Every frame is walked up the tree only until it reaches a frame whose root is already known,
+    so this is linear in the number of frames.
+
+    Raises:
+        ValidateFrameTreeError in the cases described by validate_frame_tree_snapshot().
+    """
+    if not child_to_parent_edge_map:
         raise ValidateFrameTreeError("Empty edges in FrameTreeSnapshot")
-    for frame_name in frame_tree_snapshot.child_to_parent_edge_map:
+    root_by_frame = {}
+    for frame_name in child_to_parent_edge_map:
         if not frame_name:
             raise ValidateFrameTreeError("Empty child frame name")
-        cur_root = _walk_up_tree(frame_name)
-        if not root:
-            root = cur_root
-        else:
-            if not cur_root == root:
-                raise ValidateFrameTreeDisjointError()
+        path = []
+        visited_frames = set()
+        cur_frame_name = frame_name
+        while cur_frame_name not in root_by_frame:
+            if cur_frame_name not in child_to_parent_edge_map:
+                raise ValidateFrameTreeUnknownFrameError()
+            if cur_frame_name in visited_frames:
+                raise ValidateFrameTreeCycleError()
+            path.append(cur_frame_name)
+            visited_frames.add(cur_frame_name)
+            parent_frame_name = child_to_parent_edge_map[cur_frame_name].parent_frame_name
+            if not parent_frame_name:
+                # At the root of the tree
+                root_by_frame[cur_frame_name] = cur_frame_name
+            else:
+                cur_frame_name = parent_frame_name
+        root = root_by_frame[cur_frame_name]
+        for path_frame_name in path:
+            root_by_frame[path_frame_name] = root
 
-    return True
+    if len(set(root_by_frame.values())) > 1:
+        raise ValidateFrameTreeDisjointError()
+    return root_by_frame
+
+
+def _read_only(matrix):
+    matrix.flags.writeable = False
+    return matrix
+
+
+def _inverse_tform_matrix(a_tform_b):
+    """Returns the inverse of a 4x4 rigid transform matrix."""
+    b_tform_a = numpy.eye(4)
+    b_rot_a = a_tform_b[0:3, 0:3].T
+    b_tform_a[0:3, 0:3] = b_rot_a
+    b_tform_a[0:3, 3] = -numpy.dot(b_rot_a, a_tform_b[0:3, 3])
+    return b_tform_a
+
+
+class FrameTree(object):
+    """A FrameTreeSnapshot prepared for answering many transform queries.
+
+    The snapshot is validated once, when the FrameTree is created.  The transform from the root
+    of the tree to each frame is computed on first use and cached as a 4x4 matrix, as are the
+    transforms between the pairs of frames queried, so create one FrameTree per snapshot and use
+    it for all the transforms needed from that snapshot:
+
+        frame_tree = FrameTree(robot_state.kinematic_state.transforms_snapshot)
+        odom_tform_body = frame_tree.a_tform_b(ODOM_FRAME_NAME, BODY_FRAME_NAME)
+        vision_tform_body = frame_tree.a_tform_b(VISION_FRAME_NAME, BODY_FRAME_NAME)
+
+    A FrameTree may also be passed to get_a_tform_b() and the other functions of this module in
+    place of its snapshot.  The snapshot must not be modified while the FrameTree is in use.
+
+    Args:
+        frame_tree_snapshot (geometry_pb2.FrameTreeSnapshot): The snapshot.
+
+    Raises:
+        ValueError: frame_tree_snapshot is empty.
+        ValidateFrameTreeError: The snapshot is not a valid tree; see
+            validate_frame_tree_snapshot().
+    """
+
+    def __init__(self, frame_tree_snapshot):
+        if not frame_tree_snapshot:
+            raise ValueError('No frame_tree_snapshot')
+        self._edges = frame_tree_snapshot.child_to_parent_edge_map
+        self._root_by_frame = _find_frame_roots(self._edges)
+        self._root_frame_name = next(iter(self._root_by_frame.values()))
+        self._root_tform = {self._root_frame_name: _read_only(numpy.eye(4))}
+        self._tform_root = {self._root_frame_name: self._root_tform[self._root_frame_name]}
+        self._a_tform_b = {}
+        self._poses = {}
+
+    def __contains__(self, frame_name):
+        return frame_name in self._root_by_frame
+
+    @property
+    def root_frame_name(self):
+        """Name of the root frame of the tree."""
+        return self._root_frame_name
+
+    @property
+    def frame_names(self):
+        """List of the names of all the frames in the tree."""
+        return list(self._root_by_frame)
+
+    def a_tform_b(self, frame_a, frame_b):
+        """Get the math_helpers.SE3Pose transforming geometry from frame_b to frame_a.
+
+        Returns:
+            math_helpers.SE3Pose between frame_a and frame_b if they exist in the tree. None
+            otherwise.
+        """
+        pose = self._poses.get((frame_a, frame_b))
+        if pose is None:
+            a_tform_b = self.a_tform_b_matrix(frame_a, frame_b)
+            if a_tform_b is None:
+                return None
+            se3_pose = math_helpers.SE3Pose.from_matrix(a_tform_b)
+            pose = tuple(se3_pose)
+            self._poses[(frame_a, frame_b)] = pose
+        x, y, z, qw, qx, qy, qz = pose
+        return math_helpers.SE3Pose(x, y, z, math_helpers.Quat(qw, qx, qy, qz))
+
+    def a_tform_b_matrix(self, frame_a, frame_b):
+        """Get the 4x4 matrix transforming geometry from frame_b to frame_a.
+
+        Returns:
+            Read-only 4x4 numpy array if both frames exist in the tree. None otherwise.
+        """
+        a_tform_b = self._a_tform_b.get((frame_a, frame_b))
+        if a_tform_b is None:
+            if frame_a not in self._root_by_frame or frame_b not in self._root_by_frame:
+                return None
+            a_tform_b = _read_only(
+                numpy.dot(self._frame_tform_root(frame_a), self._root_tform_frame(frame_b)))
+            self._a_tform_b[(frame_a, frame_b)] = a_tform_b
+        return a_tform_b
+
+    def transforms_to(self, frame_a, frame_names):
+        """Get the transforms from many frames to frame_a at once.
+
+        Args:
+            frame_a (string): The frame to transform to.
+            frame_names (list of strings): The frames to transform from.
+
+        Returns:
+            Nx4x4 numpy array of the matrices transforming geometry from each of frame_names to
+            frame_a.
+
+        Raises:
+            ValidateFrameTreeUnknownFrameError: One of the frames is not in the tree.
+        """
+        for frame_name in [frame_a] + list(frame_names):
+            if frame_name not in self._root_by_frame:
+                raise ValidateFrameTreeUnknownFrameError(frame_name)
+        if not frame_names:
+            return numpy.empty((0, 4, 4))
+        root_tform_frames = numpy.stack(
+            [self._root_tform_frame(frame_name) for frame_name in frame_names])
+        return numpy.matmul(self._frame_tform_root(frame_a), root_tform_frames)
+
+    def _root_tform_frame(self, frame_name):
+        root_tform_frame = self._root_tform.get(frame_name)
+        if root_tform_frame is not None:
+            return root_tform_frame
+        # Walk up to the nearest frame with a known transform, then cache the transforms of the
+        # frames on the way back down.
+        path = []
+        while root_tform_frame is None:
+            path.append(frame_name)
+            frame_name = self._edges[frame_name].parent_frame_name
+            root_tform_frame = self._root_tform.get(frame_name)
+        for child_frame_name in reversed(path):
+            parent_tform_child = math_helpers.SE3Pose.from_proto(
+                self._edges[child_frame_name].parent_tform_child).to_matrix()
+            root_tform_frame = _read_only(numpy.dot(root_tform_frame, parent_tform_child))
+            self._root_tform[child_frame_name] = root_tform_frame
+        return root_tform_frame
+
+    def _frame_tform_root(self, frame_name):
+        frame_tform_root = self._tform_root.get(frame_name)
+        if frame_tform_root is None:
+            frame_tform_root = _read_only(
+                _inverse_tform_matrix(self._root_tform_frame(frame_name)))
+            self._tform_root[frame_name] = frame_tform_root
+        return frame_tform_root
 
 
 def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
@@ -107,7 +262,8 @@ def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     frame_a's representation to frame_b's.
 
     Args:
-        frame_tree_snapshot (dict) dictionary representing the child_to_parent_edge_map
+        frame_tree_snapshot (dict) dictionary representing the child_to_parent_edge_map, or a
+            FrameTree, which is already validated and caches its transforms
         frame_a (string)
         frame_b (string)
         validate (bool) if the FrameTreeSnapshot should be checked for a valid tree structure
@@ -115,6 +271,9 @@ def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     Returns:
         math_helpers.SE3Pose between frame_a and frame_b if they exist in the tree. None otherwise.
     """
+    if isinstance(frame_tree_snapshot, FrameTree):
+        return frame_tree_snapshot.a_tform_b(frame_a, frame_b)
+
     if validate:
         validate_frame_tree_snapshot(frame_tree_snapshot)
 
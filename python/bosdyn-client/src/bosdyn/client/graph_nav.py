@@ -444,7 +444,7 @@ class GraphNavClient(BaseClient):
         """
         lease = lease or lease_pb2.Lease()
         serialized = waypoint_snapshot.SerializeToString()
-        self.call(
+        return self.call(
             self._stub.UploadWaypointSnapshot,
             GraphNavClient._data_chunk_iterator_upload_waypoint_snapshot(
                 serialized, lease, self._data_chunk_size), value_from_response=None,
@@ -464,7 +464,7 @@ class GraphNavClient(BaseClient):
         """
         lease = lease or lease_pb2.Lease()
         serialized = edge_snapshot.SerializeToString()
-        self.call(
+        return self.call(
             self._stub.UploadEdgeSnapshot,
             GraphNavClient._data_chunk_iterator_upload_edge_snapshot(serialized, lease,
                                                                      self._data_chunk_size),
@@ -517,6 +517,24 @@ class GraphNavClient(BaseClient):
                          error_from_response=_download_waypoint_snapshot_stream_errors,
                          copy_request=False, **kwargs)
 
+    def download_waypoint_snapshot_async(self, waypoint_snapshot_id, download_images=False,
+                                         do_not_download_point_cloud=False, progress_cb=None,
+                                         **kwargs):
+        """Async version of download_waypoint_snapshot().
+
+        The streamed chunks are reassembled as they arrive, and progress_cb, if given, is called
+        with (bytes received, total bytes) after each one.  Cancelling the returned future
+        cancels the download.
+        """
+        request = self._build_download_waypoint_snapshot_request(waypoint_snapshot_id,
+                                                                 download_images,
+                                                                 do_not_download_point_cloud)
+        return self.call_async_streaming(
+            self._stub.DownloadWaypointSnapshot, request,
+            value_from_response=_get_waypoint_snapshot_from_data,
+            error_from_response=_download_waypoint_snapshot_stream_errors,
+            chunk_from_response=lambda response: response.chunk, progress_cb=progress_cb,
+            copy_request=False, **kwargs)
 
     def download_edge_snapshot(self, edge_snapshot_id, **kwargs):
         """Downloads a specific edge snapshot with streaming from the server.
@@ -535,6 +553,19 @@ class GraphNavClient(BaseClient):
                          error_from_response=_download_edge_snapshot_stream_errors,
                          copy_request=False, **kwargs)
 
+    def download_edge_snapshot_async(self, edge_snapshot_id, progress_cb=None, **kwargs):
+        """Async version of download_edge_snapshot().
+
+        See download_waypoint_snapshot_async() for progress_cb and cancellation.
+        """
+        request = self._build_download_edge_snapshot_request(edge_snapshot_id)
+        return self.call_async_streaming(
+            self._stub.DownloadEdgeSnapshot, request,
+            value_from_response=_get_edge_snapshot_from_data,
+            error_from_response=_download_edge_snapshot_stream_errors,
+            chunk_from_response=lambda response: response.chunk, progress_cb=progress_cb,
+            copy_request=False, **kwargs)
+
     def _write_bytes(self, filepath, filename, data):
         """Write data to a file."""
         os.makedirs(filepath, exist_ok=True)
@@ -970,6 +1001,20 @@ def _get_streamed_edge_snapshot(response):
     return edge_snapshot
 
 
+def _get_waypoint_snapshot_from_data(response, data):
+    """Parses a waypoint snapshot from the data reassembled from a streamed response."""
+    waypoint_snapshot = map_pb2.WaypointSnapshot()
+    waypoint_snapshot.ParseFromString(data)
+    return waypoint_snapshot
+
+
+def _get_edge_snapshot_from_data(response, data):
+    """Parses an edge snapshot from the data reassembled from a streamed response."""
+    edge_snapshot = map_pb2.EdgeSnapshot()
+    edge_snapshot.ParseFromString(data)
+    return edge_snapshot
+
+
 _UPLOAD_GRAPH_STATUS_TO_ERROR = collections.defaultdict(lambda: (ResponseError, None))
 _UPLOAD_GRAPH_STATUS_TO_ERROR.update({
     graph_nav_pb2.UploadGraphResponse.STATUS_OK: (None, None),
@@ -6,6 +6,7 @@
 
 """For clients to use the image service."""
 import collections
+import functools
 import os
 
 import numpy as np
@@ -14,6 +15,7 @@ from bosdyn.api import image_pb2, image_service_pb2_grpc
 from bosdyn.client.common import (BaseClient, common_header_errors, error_factory, error_pair,
                                   handle_common_header_errors)
 from bosdyn.client.exceptions import ResponseError, UnsetStatusError
+from bosdyn.client.frame_helpers import FrameTree
 
 
 class ImageResponseError(ResponseError):
@@ -393,6 +395,172 @@ def _depth_image_data_to_numpy(image_response):
     return depth_array
 
 
+def _check_depth_image_response(image_response):
+    """Raises ValueError if the image_response is not a pinhole depth image in
+    PIXEL_FORMAT_DEPTH_U16."""
+    if image_response.source.image_type != image_pb2.ImageSource.IMAGE_TYPE_DEPTH:
+        raise ValueError('requires an image_type of IMAGE_TYPE_DEPTH.')
+
+    if image_response.shot.image.pixel_format != image_pb2.Image.PIXEL_FORMAT_DEPTH_U16:
+        raise ValueError(
+            'IMAGE_TYPE_DEPTH with an unsupported format, requires PIXEL_FORMAT_DEPTH_U16.')
+
+    if not image_response.source.HasField('pinhole'):
+        raise ValueError('Requires a pinhole camera_model.')
+
+
+class DepthProjector(object):
+    """Converts depth images from one camera into point clouds, reusing work between images.
+
+    The ray of each pixel, ((col - cx) / fx, (row - cy) / fy, 1) scaled by 1 / depth_scale,
+    depends only on the camera intrinsics and resolution.  The projector computes the rays once,
+    so converting an image is a gather of the rays of its valid pixels and a multiplication by
+    their raw depth values.  Use DepthProjector.from_image_source() to share one projector
+    between all the images of a camera.
+
+    Args:
+        rows (int): Number of rows of the depth images.
+        cols (int): Number of columns of the depth images.
+        focal_length (tuple): The (fx, fy) focal lengths of the camera, in pixels.
+        principal_point (tuple): The (cx, cy) principal point of the camera, in pixels.
+        depth_scale (double): The raw depth value of one meter.
+        dtype (numpy dtype): The dtype of the points, np.float64 or np.float32.
+        decimation (int): Only every decimation-th row and column of the images are converted.
+        roi (tuple): (row_start, row_stop, col_start, col_stop) region of the images to convert,
+            with stops excluded.  None converts the whole image.
+    """
+
+    def __init__(self, rows, cols, focal_length, principal_point, depth_scale, dtype=np.float64,
+                 decimation=1, roi=None):
+        if decimation < 1:
+            raise ValueError('decimation must be at least 1, not {}'.format(decimation))
+        if depth_scale <= 0:
+            raise ValueError('depth_scale must be positive, not {}'.format(depth_scale))
+        self.rows = rows
+        self.cols = cols
+        self.depth_scale = depth_scale
+        self.dtype = np.dtype(dtype)
+        if roi is None:
+            roi = (0, rows, 0, cols)
+        row_start, row_stop, col_start, col_stop = roi
+        self._pixel_slices = (slice(row_start, row_stop, decimation),
+                              slice(col_start, col_stop, decimation))
+
+        fx, fy = focal_length
+        cx, cy = principal_point
+        pixel_rows = np.arange(rows)[self._pixel_slices[0]]
+        pixel_cols = np.arange(cols)[self._pixel_slices[1]]
+        rays = np.empty((len(pixel_rows), len(pixel_cols), 3))
+        rays[:, :, 0] = (pixel_cols - cx) / fx
+        rays[:, :, 1] = ((pixel_rows - cy) / fy)[:, np.newaxis]
+        rays[:, :, 2] = 1.0
+        rays /= depth_scale
+        self._rays = rays.reshape(-1, 3).astype(self.dtype)
+        self._rays.flags.writeable = False
+        # The rays rotated by the last rotation used, as (rotation bytes, rotated rays).
+        self._rotated_rays = (None, None)
+
+    @staticmethod
+    def from_image_source(image_source, dtype=np.float64, decimation=1, roi=None):
+        """Get the DepthProjector for an image_pb2.ImageSource with a pinhole camera model.
+
+        Projectors are cached by intrinsics, resolution and options, so all the images of a
+        camera share one.
+        """
+        if not image_source.HasField('pinhole'):
+            raise ValueError('Requires a pinhole camera_model.')
+        intrinsics = image_source.pinhole.intrinsics
+        return _cached_depth_projector(
+            image_source.rows, image_source.cols,
+            (intrinsics.focal_length.x, intrinsics.focal_length.y),
+            (intrinsics.principal_point.x, intrinsics.principal_point.y),
+            image_source.depth_scale, np.dtype(dtype), decimation,
+            None if roi is None else tuple(roi))
+
+    @property
+    def max_points(self):
+        """The largest number of points in a cloud, for sizing output buffers."""
+        return self._rays.shape[0]
+
+    def project(self, depth_array, min_dist=0, max_dist=1000, tform=None, out=None):
+        """Converts a depth image into a point cloud, like depth_image_to_pointcloud().
+
+        Args:
+            depth_array (numpy array): The rows x cols uint16 raw depth values.
+            min_dist (double): All points in the returned point cloud will be greater than
+                min_dist from the image plane [meters].
+            max_dist (double): All points in the returned point cloud will be less than max_dist
+                from the image plane [meters].
+            tform (math_helpers.SE3Pose or 4x4 numpy array): If set, the transform
+                target_tform_sensor applied to the points in the same pass, so they are expressed
+                in the target frame.
+            out (numpy array): If set, an (M, 3) C-contiguous array of the projector's dtype, with
+                M at least the number of valid points, to write the points into instead of
+                allocating a new array.
+
+        Returns:
+            An (N, 3) numpy array of (x,y,z) values, a view into out if it was given.
+        """
+        if depth_array.shape != (self.rows, self.cols):
+            raise ValueError('Expected a depth image of shape {}, not {}'.format(
+                (self.rows, self.cols), depth_array.shape))
+        depth = depth_array[self._pixel_slices].reshape(-1)
+        valid_inds = np.flatnonzero(
+            _depth_image_get_valid_indices(depth, np.rint(min_dist * self.depth_scale),
+                                           np.rint(max_dist * self.depth_scale)))
+        num_points = len(valid_inds)
+
+        if out is None:
+            out = np.empty((num_points, 3), dtype=self.dtype)
+        else:
+            if out.dtype != self.dtype or out.ndim != 2 or out.shape[1] != 3 or \
+                    not out.flags.c_contiguous:
+                raise ValueError('out must be a C-contiguous (M, 3) array of {}'.format(
+                    self.dtype))
+            if out.shape[0] < num_points:
+                raise ValueError('out has room for {} points, but the image has {}'.format(
+                    out.shape[0], num_points))
+            out = out[:num_points]
+
+        if tform is None:
+            np.take(self._rays, valid_inds, axis=0, out=out, mode='clip')
+            out *= depth[valid_inds, np.newaxis]
+        else:
+            if not isinstance(tform, np.ndarray):
+                tform = tform.to_matrix()
+            np.take(self._get_rotated_rays(tform[0:3, 0:3]), valid_inds, axis=0, out=out,
+                    mode='clip')
+            out *= depth[valid_inds, np.newaxis]
+            out += tform[0:3, 3].astype(self.dtype)
+        return out
+
+    def project_response(self, image_response, min_dist=0, max_dist=1000, tform=None, out=None):
+        """Converts the depth image of an image_pb2.ImageResponse into a point cloud.
+
+        See project() for the arguments.
+        """
+        _check_depth_image_response(image_response)
+        return self.project(_depth_image_data_to_numpy(image_response), min_dist, max_dist,
+                            tform, out)
+
+    def _get_rotated_rays(self, rotation):
+        """Returns the rays rotated by the 3x3 rotation, reusing them while it is unchanged."""
+        rotation = np.ascontiguousarray(rotation, dtype=self.dtype)
+        key = rotation.tobytes()
+        rotated_rays = self._rotated_rays
+        if rotated_rays[0] != key:
+            rotated_rays = (key, np.dot(self._rays, rotation.T))
+            self._rotated_rays = rotated_rays
+        return rotated_rays[1]
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_depth_projector(rows, cols, focal_length, principal_point, depth_scale, dtype,
+                            decimation, roi):
+    return DepthProjector(rows, cols, focal_length, principal_point, depth_scale, dtype,
+                          decimation, roi)
+
+
 def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     """Converts a depth image into a point cloud using the camera intrinsics. The point
     cloud is represented as a numpy array of (x,y,z) values.  Requests can optionally filter
@@ -404,6 +572,9 @@ def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     value that casts to >= 2^16 will be assigned a value of 2^16 - 1 (the maximum
     representational distance).
 
+    The conversion uses the cached DepthProjector of the image source, see
+    DepthProjector.from_image_source() for float32 output, decimation and transforms.
+
     Args:
         image_response (image_pb2.ImageResponse): An ImageResponse containing a depth image.
         min_dist (double): All points in the returned point cloud will be greater than min_dist from the image plane [meters].
@@ -412,40 +583,94 @@ def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     Returns:
         A numpy stack of (x,y,z) values representing depth image as a point cloud expressed in the sensor frame.
     """
+    _check_depth_image_response(image_response)
+    projector = DepthProjector.from_image_source(image_response.source)
+    return projector.project(_depth_image_data_to_numpy(image_response), min_dist, max_dist)
 
-    if image_response.source.image_type != image_pb2.ImageSource.IMAGE_TYPE_DEPTH:
-        raise ValueError('requires an image_type of IMAGE_TYPE_DEPTH.')
 
-    if image_response.shot.image.pixel_format != image_pb2.Image.PIXEL_FORMAT_DEPTH_U16:
-        raise ValueError(
-            'IMAGE_TYPE_DEPTH with an unsupported format, requires PIXEL_FORMAT_DEPTH_U16.')
+def depth_images_to_pointcloud(image_responses, frame_name, min_dist=0, max_dist=1000,
+                               dtype=np.float32, decimation=1, voxel_size=None, max_points=None):
+    """Converts the depth images of several cameras into a single point cloud in one frame.
 
-    if not image_response.source.HasField('pinhole'):
-        raise ValueError('Requires a pinhole camera_model.')
+    Each image is converted by the cached DepthProjector of its source, transformed into
+    frame_name using the transforms_snapshot of the image, and written directly into a shared
+    output array, so the clouds of the cameras are never copied.
+
+    Args:
+        image_responses (list of image_pb2.ImageResponse): ImageResponses containing depth images,
+            such as the return value of ImageClient.get_image_from_sources().
+        frame_name (string): Name of the frame to express the points in, which must be in the
+            transforms_snapshot of every image.
+        min_dist (double): Only points greater than min_dist from their image plane are kept
+            [meters].
+        max_dist (double): Only points less than max_dist from their image plane are kept
+            [meters].
+        dtype (numpy dtype): The dtype of the points, np.float32 or np.float64.
+        decimation (int): Only every decimation-th row and column of the images are converted.
+        voxel_size (double): If set, the points are downsampled to the centroid of the points in
+            each cube of this size [meters], see voxel_downsample_pointcloud().
+        max_points (int): If set, at most this many points are returned, evenly subsampled from
+            the fused cloud.
+
+    Returns:
+        An (N, 3) numpy array of (x,y,z) values expressed in frame_name.
+    """
+    projections = []
+    for image_response in image_responses:
+        _check_depth_image_response(image_response)
+        sensor_frame_name = image_response.shot.frame_name_image_sensor
+        frame_tform_sensor = FrameTree(
+            image_response.shot.transforms_snapshot).a_tform_b_matrix(frame_name,
+                                                                      sensor_frame_name)
+        if frame_tform_sensor is None:
+            raise ValueError('No transform from {} to {} in the image from {}.'.format(
+                sensor_frame_name, frame_name, image_response.source.name))
+        projector = DepthProjector.from_image_source(image_response.source, dtype, decimation)
+        projections.append((projector, image_response, frame_tform_sensor))
+
+    points = np.empty((sum(projector.max_points for projector, _, _ in projections), 3),
+                      dtype=dtype)
+    num_points = 0
+    for projector, image_response, frame_tform_sensor in projections:
+        cloud = projector.project_response(image_response, min_dist, max_dist, frame_tform_sensor,
+                                           out=points[num_points:])
+        num_points += len(cloud)
+    points = points[:num_points]
+
+    if voxel_size is not None:
+        points = voxel_downsample_pointcloud(points, voxel_size)
+    if max_points is not None and len(points) > max_points:
+        points = points[np.linspace(0, len(points) - 1, max_points).astype(np.intp)]
+    return points
+
+
+def voxel_downsample_pointcloud(points, voxel_size):
+    """Downsamples a point cloud to the centroid of the points in each occupied voxel.
+
+    Args:
+        points (numpy array): The (N, 3) points.
+        voxel_size (double): The edge length of the cubic voxels, in the units of the points.
 
-    source_rows = image_response.source.rows
-    source_cols = image_response.source.cols
-    fx = image_response.source.pinhole.intrinsics.focal_length.x
-    fy = image_response.source.pinhole.intrinsics.focal_length.y
-    cx = image_response.source.pinhole.intrinsics.principal_point.x
-    cy = image_response.source.pinhole.intrinsics.principal_point.y
-    depth_scale = image_response.source.depth_scale
-
-    # Convert the proto representation into a numpy array.
-    depth_array = _depth_image_data_to_numpy(image_response)
-
-    # Determine which indices have valid data in the user requested range.
-    valid_inds = _depth_image_get_valid_indices(depth_array, np.rint(min_dist * depth_scale),
-                                                np.rint(max_dist * depth_scale))
-
-    # Compute the valid data.
-    rows, cols = np.mgrid[0:source_rows, 0:source_cols]
-    depth_array = depth_array[valid_inds]
-    rows = rows[valid_inds]
-    cols = cols[valid_inds]
-
-    # Convert the valid distance data to (x,y,z) values expressed in the sensor frame.
-    z = depth_array / depth_scale
-    x = np.multiply(z, (cols - cx)) / fx
-    y = np.multiply(z, (rows - cy)) / fy
-    return np.vstack((x, y, z)).T
+    Returns:
+        An (M, 3) numpy array of the dtype of points, with one point per occupied voxel.
+    """
+    if voxel_size <= 0:
+        raise ValueError('voxel_size must be positive, not {}'.format(voxel_size))
+    if len(points) == 0:
+        return points
+    voxels = np.floor(points / voxel_size).astype(np.int64)
+    voxels -= voxels.min(axis=0)
+    spans = voxels.max(axis=0) + 1
+    if float(spans[0]) * float(spans[1]) * float(spans[2]) < 2.0**62:
+        # Number the voxels so a single 1-D sort groups the points.
+        keys = (voxels[:, 0] * spans[1] + voxels[:, 1]) * spans[2] + voxels[:, 2]
+        _, voxel_inds, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    else:
+        _, voxel_inds, counts = np.unique(voxels, axis=0, return_inverse=True,
+                                          return_counts=True)
+    voxel_inds = voxel_inds.reshape(-1)
+    centroids = np.empty((len(counts), 3), dtype=points.dtype)
+    for axis in range(3):
+        centroids[:, axis] = np.bincount(voxel_inds, weights=points[:, axis],
+                                         minlength=len(counts)) / counts
+    return centroids
@@ -734,6 +734,9 @@ class LeaseWalletRequestProcessor(object):
                         to use the default resource.
     """
 
+    # Request fields changed by mutate().
+    mutated_fields = ('lease', 'leases')
+
     def __init__(self, lease_wallet, resource_list=None):
         self.lease_wallet = lease_wallet
         if resource_list is None:
@@ -255,6 +255,21 @@ class SE2Pose(object):
         s = math.sin(self.angle)
         return SE2Pose(-self.x * c - self.y * s, self.x * s - self.y * c, -self.angle)
 
+    def inverse_inplace(self):
+        """
+        Invert the math_helpers.SE2Pose in place, without allocating a new pose.
+
+        Returns:
+            The current math_helpers.SE2Pose, now representing its inverse.
+        """
+        c = math.cos(self.angle)
+        s = math.sin(self.angle)
+        x = self.x
+        self.x = -x * c - self.y * s
+        self.y = x * s - self.y * c
+        self.angle = -self.angle
+        return self
+
     def mult(self, se2pose):
         """
         Computes the multiplication between the current math_helpers.SE2Pose and the input se2pose.
@@ -268,23 +283,39 @@ class SE2Pose(object):
         Returns:
             math_helpers.se2pose representing the multiplication of two SE(2) poses.
         """
-        rotation_matrix = self.to_rot_matrix()
-        rotated_pos = rotation_matrix.dot((se2pose.x, se2pose.y))
-        return SE2Pose(self.x + rotated_pos[0], self.y + rotated_pos[1],
-                       recenter_angle_mod(self.angle + se2pose.angle, 0.0))
+        (x, y) = self._transform_xy(se2pose.x, se2pose.y)
+        return SE2Pose(x, y, recenter_angle_mod(self.angle + se2pose.angle, 0.0))
+
+    def mult_into(self, se2pose, out):
+        """
+        Computes the multiplication like mult(), storing the result in the math_helpers.SE2Pose
+        'out' instead of allocating a new pose. 'out' may be self or se2pose.
+
+        Returns:
+            out, now representing the multiplication of two SE(2) poses.
+        """
+        (x, y) = self._transform_xy(se2pose.x, se2pose.y)
+        out.angle = recenter_angle_mod(self.angle + se2pose.angle, 0.0)
+        out.x = x
+        out.y = y
+        return out
+
+    def _transform_xy(self, x, y):
+        """Returns the (x, y) point transformed by the current SE(2) pose."""
+        c = math.cos(self.angle)
+        s = math.sin(self.angle)
+        return (self.x + c * x - s * y, self.y + s * x + c * y)
 
     def __mul__(self, other):
         """Overrides the '*' symbol to compute the multiplication between two SE(2) poses,
         or between an SE(2) pose and a Vec2"""
         if isinstance(other, Vec2):
-            rotation_matrix = self.to_rot_matrix()
-            rotated_pos = rotation_matrix.dot((other.x, other.y))
-            return Vec2(self.x + rotated_pos[0], self.y + rotated_pos[1])
+            (x, y) = self._transform_xy(other.x, other.y)
+            return Vec2(x, y)
         if isinstance(other, SE2Pose):
-            rotation_matrix = self.to_rot_matrix()
-            rotated_pos = rotation_matrix.dot((other.x, other.y))
-            return SE2Pose(self.x + rotated_pos[0], self.y + rotated_pos[1],
-                           recenter_angle_mod(self.angle + other.angle, 0.0))
+            return self.mult(other)
+        if isinstance(other, SE2PoseArray):
+            return SE2PoseArray.from_poses([self]).mult(other)
         else:
             raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
@@ -521,6 +552,10 @@ class SE3Velocity(object):
 class SE3Pose(object):
     """Class representing an SE3Pose with position and rotation."""
 
+    # Class defaults, for instances unpickled from versions of this module without the cache.
+    _matrix = None
+    _matrix_key = None
+
     def __init__(self, x, y, z, rot):
         self.x = x
         self.y = y
@@ -530,6 +565,9 @@ class SE3Pose(object):
         if type(rot) == geometry_pb2.Quaternion:
             rot = Quat.from_proto(rot)
         self.rot = rot
+        # The 4x4 matrix of the pose, and the (x, y, z, w, qx, qy, qz) values it was computed from.
+        self._matrix = None
+        self._matrix_key = None
 
     def __str__(self):
         return 'position -- X: %0.3f Y: %0.3f Z: %0.3f rotation -- %s' % (self.x, self.y, self.z,
@@ -584,6 +622,23 @@ class SE3Pose(object):
         (x, y, z) = inv_rot.transform_point(self.x, self.y, self.z)
         return SE3Pose(-x, -y, -z, inv_rot)
 
+    def inverse_inplace(self):
+        """
+        Invert the math_helpers.SE3Pose in place, without allocating a new pose.
+
+        The rotation is inverted in place as well, so any other pose sharing the same
+        math_helpers.Quat will see the change.
+
+        Returns:
+            The current math_helpers.SE3Pose, now representing its inverse.
+        """
+        inv_rot = self.rot.inverse_inplace()
+        (x, y, z) = inv_rot.transform_point(self.x, self.y, self.z)
+        self.x = -x
+        self.y = -y
+        self.z = -z
+        return self
+
     def transform_point(self, x, y, z):
         """
         Compute the transformation (translation and rotation) of a (x,y,z) vector using the
@@ -617,7 +672,7 @@ class SE3Pose(object):
         Returns:
             Nx3 numpy matrix of the points after they are transformed with the current math_helpers.SE3Pose.
         """
-        return SE3Pose.transform_cloud_from_matrix(self.to_matrix(), points)
+        return SE3Pose.transform_cloud_from_matrix(self._transform_matrix(), points)
 
     @staticmethod
     def transform_cloud_from_matrix(transform, points):
@@ -638,10 +693,22 @@ class SE3Pose(object):
 
     def to_matrix(self):
         """Returns the 4x4 matrix to transform a 3D point (in generalized coordinates)."""
-        ret = numpy.eye(4)
-        ret[0:3, 0:3] = self.rot.to_matrix()
-        ret[0:3, 3] = [self.x, self.y, self.z]
-        return ret
+        return self._transform_matrix().copy()
+
+    def _transform_matrix(self):
+        """Returns the cached 4x4 matrix of the pose, recomputing it if the pose has changed.
+
+        The array is shared between calls and must not be modified.
+        """
+        rot = self.rot
+        key = (self.x, self.y, self.z, rot.w, rot.x, rot.y, rot.z)
+        if key != self._matrix_key:
+            ret = numpy.eye(4)
+            ret[0:3, 0:3] = rot._rotation_matrix()
+            ret[0:3, 3] = key[0:3]
+            self._matrix = ret
+            self._matrix_key = key
+        return self._matrix
 
     def mult(self, se3pose):
         """
@@ -659,6 +726,27 @@ class SE3Pose(object):
         (x, y, z) = self.rot.transform_point(se3pose.x, se3pose.y, se3pose.z)
         return SE3Pose(self.x + x, self.y + y, self.z + z, self.rot.mult(se3pose.rot))
 
+    def mult_into(self, se3pose, out):
+        """
+        Computes the multiplication like mult(), storing the result in the math_helpers.SE3Pose
+        'out' instead of allocating a new pose. 'out' may be self or se3pose.
+
+        The rotation of 'out' is updated in place, so any other pose sharing the same
+        math_helpers.Quat will see the change.
+
+        Returns:
+            out, now representing the multiplication of two SE(3) poses.
+        """
+        (x, y, z) = self.rot.transform_point(se3pose.x, se3pose.y, se3pose.z)
+        x += self.x
+        y += self.y
+        z += self.z
+        self.rot.mult_into(se3pose.rot, out.rot)
+        out.x = x
+        out.y = y
+        out.z = z
+        return out
+
     def __mul__(self, other):
         """Overrides the '*' symbol to compute the multiplication between two SE(3) poses,
         or between an SE(3) pose and a Vec3."""
@@ -666,8 +754,9 @@ class SE3Pose(object):
             (x, y, z) = self.transform_point(other.x, other.y, other.z)
             return Vec3(x, y, z)
         if isinstance(other, SE3Pose):
-            (x, y, z) = self.rot.transform_point(other.x, other.y, other.z)
-            return SE3Pose(self.x + x, self.y + y, self.z + z, self.rot.mult(other.rot))
+            return self.mult(other)
+        if isinstance(other, SE3PoseArray):
+            return SE3PoseArray.from_poses([self]).mult(other)
         else:
             raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
@@ -711,7 +800,7 @@ class SE3Pose(object):
         Returns:
             a_adjoint_b (Numpy 6x6 matrix) representing the adjoint matrix for the SE3Pose.
         """
-        a_R_b = self.rot.to_matrix()
+        a_R_b = self.rot._rotation_matrix()
         position_skew_mat = skew_matrix_3d(self.position)
         mat = numpy.matmul(position_skew_mat, a_R_b)
         a_adjoint_b = numpy.block([[a_R_b, mat], [numpy.zeros((3, 3)), a_R_b]])
@@ -746,11 +835,18 @@ class SE3Pose(object):
 class Quat(object):
     """Class representing a Quaternion."""
 
+    # Class defaults, for instances unpickled from versions of this module without the cache.
+    _matrix = None
+    _matrix_key = None
+
     def __init__(self, w=1, x=0, y=0, z=0):
         self.w = w
         self.x = x
         self.y = y
         self.z = z
+        # The 3x3 rotation matrix, and the (w, x, y, z) values it was computed from.
+        self._matrix = None
+        self._matrix_key = None
 
     def __repr__(self):
         return 'W: %0.4f X: %0.4f Y: %0.4f Z: %0.4f' % (self.w, self.x, self.y, self.z)
@@ -759,14 +855,24 @@ class Quat(object):
         """Computes the inverse of the current math_helpers.Quat."""
         return Quat(self.w, -self.x, -self.y, -self.z)
 
+    def inverse_inplace(self):
+        """Inverts the current math_helpers.Quat in place, and returns it."""
+        self.x = -self.x
+        self.y = -self.y
+        self.z = -self.z
+        return self
+
     def transform_point(self, x, y, z):
         """Computes the transformation (rotation by the quaternion) of a single (x,y,z)
             point using the current math_helpers.Quat."""
-        inv = self.inverse()
-        q = Quat(0, x, y, z)
-        q = q.mult(inv)
-        q = self.mult(q)
-        return (q.x, q.y, q.z)
+        # Expands q * (0, x, y, z) * q^-1 without building the intermediate quaternions.
+        w, qx, qy, qz = self.w, self.x, self.y, self.z
+        scale = w * w - qx * qx - qy * qy - qz * qz
+        dot2 = 2.0 * (qx * x + qy * y + qz * z)
+        w2 = 2.0 * w
+        return (scale * x + dot2 * qx + w2 * (qy * z - qz * y),
+                scale * y + dot2 * qy + w2 * (qz * x - qx * z),
+                scale * z + dot2 * qz + w2 * (qx * y - qy * x))
 
     def transform_vec3(self, vec3):
         """Computes the transformation (rotation by the quaternion) of a Vec3
@@ -776,20 +882,26 @@ class Quat(object):
 
     def to_matrix(self):
         """Creates the 3x3 numpy rotation matrix from the current math_helpers.Quat"""
-        ret = numpy.eye(3)
-        ret[0, 0] = 1.0 - 2.0 * self.y * self.y - 2.0 * self.z * self.z
-        ret[0, 1] = 2.0 * self.x * self.y - 2.0 * self.z * self.w
-        ret[0, 2] = 2.0 * self.x * self.z + 2.0 * self.y * self.w
-
-        ret[1, 0] = 2.0 * self.x * self.y + 2.0 * self.z * self.w
-        ret[1, 1] = 1.0 - 2.0 * self.x * self.x - 2.0 * self.z * self.z
-        ret[1, 2] = 2.0 * self.y * self.z - 2.0 * self.x * self.w
+        return self._rotation_matrix().copy()
 
-        ret[2, 0] = 2.0 * self.x * self.z - 2.0 * self.y * self.w
-        ret[2, 1] = 2.0 * self.y * self.z + 2.0 * self.x * self.w
-        ret[2, 2] = 1.0 - 2.0 * self.x * self.x - 2.0 * self.y * self.y
+    def _rotation_matrix(self):
+        """Returns the cached 3x3 rotation matrix, recomputing it if the quaternion has changed.
 
-        return ret
+        The array is shared between calls and must not be modified.
+        """
+        key = (self.w, self.x, self.y, self.z)
+        if key != self._matrix_key:
+            w, x, y, z = key
+            self._matrix = numpy.array([
+                [1.0 - 2.0 * y * y - 2.0 * z * z, 2.0 * x * y - 2.0 * z * w,
+                 2.0 * x * z + 2.0 * y * w],
+                [2.0 * x * y + 2.0 * z * w, 1.0 - 2.0 * x * x - 2.0 * z * z,
+                 2.0 * y * z - 2.0 * x * w],
+                [2.0 * x * z - 2.0 * y * w, 2.0 * y * z + 2.0 * x * w,
+                 1.0 - 2.0 * x * x - 2.0 * y * y],
+            ], dtype=float)
+            self._matrix_key = key
+        return self._matrix
 
     @staticmethod
     def from_matrix(rot):
@@ -929,6 +1041,22 @@ class Quat(object):
             self.w * other_quat.z + self.x * other_quat.y - self.y * other_quat.x +
             self.z * other_quat.w)
 
+    def mult_into(self, other_quat, out):
+        """Computes the multiplication of two math_helpers.Quats like mult(), storing the result
+        in the math_helpers.Quat 'out' instead of allocating a new one. 'out' may be self or
+        other_quat.
+
+        Returns:
+            out
+        """
+        w, x, y, z = self.w, self.x, self.y, self.z
+        ow, ox, oy, oz = other_quat.w, other_quat.x, other_quat.y, other_quat.z
+        out.w = w * ow - x * ox - y * oy - z * oz
+        out.x = w * ox + x * ow + y * oz - z * oy
+        out.y = w * oy - x * oz + y * ow + z * ox
+        out.z = w * oz + x * oy - y * ox + z * ow
+        return out
+
     def __mul__(self, other):
         """Overrides the '*' symbol to compute the multiplication between two math_helpers.Quats
         or between a Quat and a Vec3."""
@@ -937,6 +1065,8 @@ class Quat(object):
             return Vec3(x, y, z)
         if isinstance(other, Quat):
             return self.mult(other)
+        if isinstance(other, QuatArray):
+            return QuatArray.from_quats([self]).mult(other)
         raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
     def normalize(self):
@@ -997,6 +1127,563 @@ class Quat(object):
         return Quat(result[0], result[1], result[2], result[3])
 
 
+def _as_float_array(values, width, name):
+    """Returns values as a float (N, width) array, reshaping a single row to (1, width)."""
+    array = numpy.asarray(values, dtype=float)
+    if array.ndim == 1:
+        array = array.reshape(1, -1)
+    if array.ndim != 2 or array.shape[1] != width:
+        raise ValueError('%s must have shape (N, %d), not %s' % (name, width, array.shape))
+    return array
+
+
+def _recenter_angles(angles, center=0.0):
+    """Vectorized recenter_angle_mod(): wraps angles into [center - pi, center + pi)."""
+    return numpy.mod(angles - center + math.pi, 2 * math.pi) - math.pi + center
+
+
+def _quat_mult(a_wxyz, b_wxyz):
+    """Hamilton product of (N, 4) arrays of quaternions, broadcasting rows."""
+    a_w, a_x, a_y, a_z = a_wxyz[:, 0], a_wxyz[:, 1], a_wxyz[:, 2], a_wxyz[:, 3]
+    b_w, b_x, b_y, b_z = b_wxyz[:, 0], b_wxyz[:, 1], b_wxyz[:, 2], b_wxyz[:, 3]
+    return numpy.stack([
+        a_w * b_w - a_x * b_x - a_y * b_y - a_z * b_z,
+        a_w * b_x + a_x * b_w + a_y * b_z - a_z * b_y,
+        a_w * b_y - a_x * b_z + a_y * b_w + a_z * b_x,
+        a_w * b_z + a_x * b_y - a_y * b_x + a_z * b_w,
+    ], axis=1)
+
+
+def _quat_rotate(wxyz, points):
+    """Rotates (N, 3) points by (N, 4) quaternions, broadcasting rows.
+
+    Computes q * p * q^-1 like Quat.transform_point(), without building the product quaternions.
+    """
+    w = wxyz[:, 0:1]
+    axis = wxyz[:, 1:4]
+    return ((w * w - numpy.sum(axis * axis, axis=1, keepdims=True)) * points +
+            2.0 * numpy.sum(axis * points, axis=1, keepdims=True) * axis +
+            2.0 * w * numpy.cross(axis, points))
+
+
+class QuatArray(object):
+    """Class representing N quaternions, stored as an (N, 4) numpy array of (w, x, y, z) rows.
+
+    Operations mirror those of math_helpers.Quat, computed for all the quaternions at once.
+    Operations between two arrays broadcast an array of length 1, or a single Quat, against
+    the other.
+    """
+
+    def __init__(self, wxyz):
+        self.wxyz = _as_float_array(wxyz, 4, 'wxyz')
+
+    def __repr__(self):
+        return 'QuatArray(%s)' % self.wxyz
+
+    def __len__(self):
+        return self.wxyz.shape[0]
+
+    def __getitem__(self, idx):
+        """Returns a Quat for an integer index, and a QuatArray for a slice or index array."""
+        if isinstance(idx, numbers.Integral):
+            return Quat(*self.wxyz[idx].tolist())
+        return QuatArray(self.wxyz[idx])
+
+    def __iter__(self):
+        return (Quat(*row) for row in self.wxyz.tolist())
+
+    @property
+    def w(self):
+        return self.wxyz[:, 0]
+
+    @property
+    def x(self):
+        return self.wxyz[:, 1]
+
+    @property
+    def y(self):
+        return self.wxyz[:, 2]
+
+    @property
+    def z(self):
+        return self.wxyz[:, 3]
+
+    @staticmethod
+    def from_identity(count):
+        """Create a math_helpers.QuatArray of count identity quaternions."""
+        wxyz = numpy.zeros((count, 4))
+        wxyz[:, 0] = 1.0
+        return QuatArray(wxyz)
+
+    @staticmethod
+    def from_quats(quats):
+        """Create a math_helpers.QuatArray from an iterable of math_helpers.Quat."""
+        return QuatArray(numpy.array([(q.w, q.x, q.y, q.z) for q in quats]).reshape(-1, 4))
+
+    @staticmethod
+    def from_proto(protos):
+        """Create a math_helpers.QuatArray from repeated geometry_pb2.Quaternion protos."""
+        return QuatArray(numpy.array([(q.w, q.x, q.y, q.z) for q in protos]).reshape(-1, 4))
+
+    def to_proto(self):
+        """Converts the quaternions into a list of geometry_pb2.Quaternion protos."""
+        return [geometry_pb2.Quaternion(w=w, x=x, y=y, z=z) for w, x, y, z in self.wxyz.tolist()]
+
+    def inverse(self):
+        """Computes the inverses of the quaternions."""
+        return QuatArray(self.wxyz * [1.0, -1.0, -1.0, -1.0])
+
+    def mult(self, other_quat):
+        """Computes the multiplication with a math_helpers.Quat or QuatArray."""
+        return QuatArray(_quat_mult(self.wxyz, _quat_rows(other_quat)))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the multiplication with a math_helpers.Quat or
+        QuatArray."""
+        if isinstance(other, (Quat, QuatArray)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def transform_points(self, points):
+        """Rotates points by the quaternions.
+
+        Inputs:
+            points (Nx3 numpy array) one point per quaternion, or a single point for all.
+
+        Returns:
+            Nx3 numpy array of the rotated points.
+        """
+        return _quat_rotate(self.wxyz, _as_float_array(points, 3, 'points'))
+
+    def to_matrix(self):
+        """Creates the Nx3x3 numpy array of the rotation matrices of the quaternions."""
+        w, x, y, z = self.w, self.x, self.y, self.z
+        ret = numpy.empty((len(self), 3, 3))
+        ret[:, 0, 0] = 1.0 - 2.0 * y * y - 2.0 * z * z
+        ret[:, 0, 1] = 2.0 * x * y - 2.0 * z * w
+        ret[:, 0, 2] = 2.0 * x * z + 2.0 * y * w
+        ret[:, 1, 0] = 2.0 * x * y + 2.0 * z * w
+        ret[:, 1, 1] = 1.0 - 2.0 * x * x - 2.0 * z * z
+        ret[:, 1, 2] = 2.0 * y * z - 2.0 * x * w
+        ret[:, 2, 0] = 2.0 * x * z - 2.0 * y * w
+        ret[:, 2, 1] = 2.0 * y * z + 2.0 * x * w
+        ret[:, 2, 2] = 1.0 - 2.0 * x * x - 2.0 * y * y
+        return ret
+
+    @staticmethod
+    def from_matrix(rots):
+        """Creates a math_helpers.QuatArray from an Nx3x3 numpy array of rotation matrices.
+
+        Like Quat.from_matrix(), the w-axis conversion is used whenever it is well conditioned,
+        so the quaternions are consistently signed.
+        """
+        rots = numpy.asarray(rots, dtype=float).reshape(-1, 3, 3)
+        r00, r11, r22 = rots[:, 0, 0], rots[:, 1, 1], rots[:, 2, 2]
+        traces = numpy.stack(
+            [1 + r00 + r11 + r22, 1 + r00 - r11 - r22, 1 - r00 + r11 - r22, 1 - r00 - r11 + r22],
+            axis=1)
+        axes = numpy.where(traces[:, 0] > 0.1, 0, numpy.argmax(traces, axis=1))
+        if numpy.any(traces[numpy.arange(len(rots)), axes] < 1e-6):
+            raise ArithmeticError('Matrix cannot be converged to quaternion.  Are you sure these'
+                                  ' are valid rotation matrices?')
+        # For each axis, the differences and sums of the off-diagonal terms which give the other
+        # components, divided by 4 times the axis component.
+        diff_21_12 = rots[:, 2, 1] - rots[:, 1, 2]
+        diff_02_20 = rots[:, 0, 2] - rots[:, 2, 0]
+        diff_10_01 = rots[:, 1, 0] - rots[:, 0, 1]
+        sum_01_10 = rots[:, 0, 1] + rots[:, 1, 0]
+        sum_02_20 = rots[:, 0, 2] + rots[:, 2, 0]
+        sum_12_21 = rots[:, 1, 2] + rots[:, 2, 1]
+        numerators = numpy.stack([
+            numpy.stack([diff_21_12, diff_02_20, diff_10_01], axis=1),
+            numpy.stack([diff_21_12, sum_01_10, sum_02_20], axis=1),
+            numpy.stack([diff_02_20, sum_01_10, sum_12_21], axis=1),
+            numpy.stack([diff_10_01, sum_02_20, sum_12_21], axis=1),
+        ])
+        # The components other than the axis component, in (w, x, y, z) order, for each axis.
+        others = numpy.array([[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]])
+        rows = numpy.arange(len(rots))
+        axis_values = numpy.sqrt(numpy.maximum(traces[rows, axes], 0.0)) * 0.5
+        wxyz = numpy.empty((len(rots), 4))
+        wxyz[rows, axes] = axis_values
+        wxyz[rows[:, None], others[axes]] = numerators[axes, rows] / (4.0 * axis_values[:, None])
+        return QuatArray(wxyz)
+
+    def to_yaw(self):
+        """Computes the Euler angles yaw of the quaternions, like Quat.to_yaw()."""
+        w, x, y, z = self.w, self.x, self.y, self.z
+        # Quat.closest_yaw_only_quaternion() rotates 180 degrees about the y-axis if ill posed.
+        ill_posed = (w * w + z * z) <= 0
+        yaw = 2 * numpy.arctan2(numpy.where(ill_posed, -x, z), numpy.where(ill_posed, -y, w))
+        return _recenter_angles(yaw)
+
+    def normalize(self):
+        """Normalizes the quaternions in place."""
+        norms = numpy.linalg.norm(self.wxyz, axis=1)
+        degenerate = norms < 1e-15
+        self.wxyz[~degenerate] /= norms[~degenerate, None]
+        self.wxyz[degenerate] = [1.0, 0.0, 0.0, 0.0]
+        return self
+
+    @staticmethod
+    def slerp(a, b, fraction):
+        """Spherical linear interpolation between quaternions, like Quat.slerp().
+
+        Args:
+            a(Quat or QuatArray): Lower blend input.
+            b(Quat or QuatArray): Upper blend input.
+            fraction(float or numpy array of N floats): The blending factors.
+        Returns:
+            QuatArray
+        """
+        v0 = _quat_rows(a)
+        v1 = _quat_rows(b)
+        v0, v1 = numpy.broadcast_arrays(v0, v1)
+        fraction = numpy.asarray(fraction, dtype=float).reshape(-1, 1)
+        dot = numpy.sum(v0 * v1, axis=1, keepdims=True)
+        # Take the shorter path by reversing one quaternion when the dot product is negative.
+        v0 = numpy.where(dot < 0.0, -v0, v0)
+        dot = numpy.abs(dot)
+
+        DOT_THRESHOLD = 1.0 - 1e-4
+        close = dot > DOT_THRESHOLD
+        # Linearly interpolate and normalize quaternions too close for comfort.
+        lerp = v0 + fraction * (v1 - v0)
+        lerp /= numpy.linalg.norm(lerp, axis=1, keepdims=True)
+        theta_0 = numpy.arccos(numpy.where(close, 0.0, dot))
+        theta = theta_0 * fraction
+        sin_theta_0 = numpy.where(close, 1.0, numpy.sin(theta_0))
+        s1 = numpy.sin(theta) / sin_theta_0
+        s0 = numpy.cos(theta) - dot * s1
+        return QuatArray(numpy.where(close, lerp, s0 * v0 + s1 * v1))
+
+
+def _quat_rows(quat):
+    """Returns the (N, 4) wxyz array of a QuatArray, or a (1, 4) array for a Quat."""
+    if isinstance(quat, QuatArray):
+        return quat.wxyz
+    if isinstance(quat, Quat):
+        return numpy.array([[quat.w, quat.x, quat.y, quat.z]], dtype=float)
+    raise TypeError('Expected a Quat or QuatArray, not %s' % type(quat))
+
+
+class SE3PoseArray(object):
+    """Class representing N SE(3) poses, stored as an (N, 3) numpy array of positions and a
+    math_helpers.QuatArray of rotations.
+
+    Operations mirror those of math_helpers.SE3Pose, computed for all the poses at once.
+    Operations between two arrays broadcast an array of length 1, or a single SE3Pose, against
+    the other.
+    """
+
+    def __init__(self, positions, rot):
+        self.positions = _as_float_array(positions, 3, 'positions')
+        if not isinstance(rot, QuatArray):
+            rot = QuatArray(rot)
+        if len(rot) != len(self.positions):
+            raise ValueError('Got %d positions and %d rotations' % (len(self.positions), len(rot)))
+        self.rot = rot
+
+    def __repr__(self):
+        return 'SE3PoseArray(%s, %s)' % (self.positions, self.rot.wxyz)
+
+    def __len__(self):
+        return self.positions.shape[0]
+
+    def __getitem__(self, idx):
+        """Returns an SE3Pose for an integer index, and an SE3PoseArray for a slice or index
+        array."""
+        if isinstance(idx, numbers.Integral):
+            x, y, z = self.positions[idx].tolist()
+            return SE3Pose(x, y, z, self.rot[idx])
+        return SE3PoseArray(self.positions[idx], self.rot.wxyz[idx])
+
+    def __iter__(self):
+        for (x, y, z), rot in zip(self.positions.tolist(), self.rot):
+            yield SE3Pose(x, y, z, rot)
+
+    @property
+    def x(self):
+        return self.positions[:, 0]
+
+    @property
+    def y(self):
+        return self.positions[:, 1]
+
+    @property
+    def z(self):
+        return self.positions[:, 2]
+
+    @property
+    def rotation(self):
+        """The rotations of the poses, like SE3Pose.rotation."""
+        return self.rot
+
+    @staticmethod
+    def from_identity(count):
+        """Create a math_helpers.SE3PoseArray of count identity SE(3) poses."""
+        return SE3PoseArray(numpy.zeros((count, 3)), QuatArray.from_identity(count))
+
+    @staticmethod
+    def from_poses(poses):
+        """Create a math_helpers.SE3PoseArray from an iterable of math_helpers.SE3Pose."""
+        values = numpy.array([tuple(pose) for pose in poses], dtype=float).reshape(-1, 7)
+        return SE3PoseArray(values[:, 0:3], values[:, 3:7])
+
+    @staticmethod
+    def from_proto(protos):
+        """Create a math_helpers.SE3PoseArray from repeated geometry_pb2.SE3Pose protos.
+
+        Like SE3Pose.from_proto(), poses without a rotation get the identity rotation.
+        """
+        values = numpy.array([
+            (p.position.x, p.position.y, p.position.z, p.rotation.w, p.rotation.x, p.rotation.y,
+             p.rotation.z) if p.HasField('rotation') else
+            (p.position.x, p.position.y, p.position.z, 1.0, 0.0, 0.0, 0.0) for p in protos
+        ], dtype=float).reshape(-1, 7)
+        return SE3PoseArray(values[:, 0:3], values[:, 3:7])
+
+    def to_proto(self):
+        """Converts the poses into a list of geometry_pb2.SE3Pose protos."""
+        return [
+            geometry_pb2.SE3Pose(position=geometry_pb2.Vec3(x=x, y=y, z=z),
+                                 rotation=geometry_pb2.Quaternion(w=qw, x=qx, y=qy, z=qz))
+            for (x, y, z), (qw, qx, qy, qz) in zip(self.positions.tolist(),
+                                                   self.rot.wxyz.tolist())
+        ]
+
+    def inverse(self):
+        """Compute the inverses of the poses.
+
+        For example, if the poses represent a_tform_b, then the inverse poses are b_tform_a.
+        """
+        inv_rot = self.rot.inverse()
+        return SE3PoseArray(-inv_rot.transform_points(self.positions), inv_rot)
+
+    def mult(self, se3pose):
+        """Computes the multiplication with a math_helpers.SE3Pose or SE3PoseArray.
+
+        For example, if the poses represent a_tform_b and the input represents b_tform_c, then
+        the output will represent a_tform_c.
+        """
+        other_positions, other_wxyz = _se3_rows(se3pose)
+        positions = self.positions + _quat_rotate(self.rot.wxyz, other_positions)
+        return SE3PoseArray(positions, _quat_mult(self.rot.wxyz, other_wxyz))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the multiplication with a math_helpers.SE3Pose or
+        SE3PoseArray."""
+        if isinstance(other, (SE3Pose, SE3PoseArray)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def transform_points(self, points):
+        """
+        Compute the transformation (translation and rotation) of points by the poses.
+
+        Inputs:
+            points (Nx3 numpy array) one point per pose, or a single point for all.
+
+        Returns:
+            Nx3 numpy array of the transformed points.
+        """
+        return self.rot.transform_points(points) + self.positions
+
+    def to_matrix(self):
+        """Returns the Nx4x4 numpy array of the matrices of the poses."""
+        ret = numpy.zeros((len(self), 4, 4))
+        ret[:, 0:3, 0:3] = self.rot.to_matrix()
+        ret[:, 0:3, 3] = self.positions
+        ret[:, 3, 3] = 1.0
+        return ret
+
+    @staticmethod
+    def from_matrix(mats):
+        """Extract a math_helpers.SE3PoseArray from an Nx4x4 numpy array of matrices."""
+        mats = numpy.asarray(mats, dtype=float).reshape(-1, 4, 4)
+        return SE3PoseArray(mats[:, 0:3, 3], QuatArray.from_matrix(mats[:, 0:3, 0:3]))
+
+    def get_closest_se2_transform(self):
+        """Compute the closest math_helpers.SE2PoseArray of the poses."""
+        return SE2PoseArray.flatten(self)
+
+    @staticmethod
+    def interp(a, b, fraction):
+        """
+        Performs a blend of SE3Poses.  Out = a * (1 - fraction) + b * fraction
+
+        Args:
+            a(SE3Pose or SE3PoseArray): Lower blend input.
+            b(SE3Pose or SE3PoseArray): Upper blend input.
+            fraction(float or numpy array of N floats): The blending factors, inside [0, 1].
+        Returns:
+            SE3PoseArray
+        """
+        a_positions, a_wxyz = _se3_rows(a)
+        b_positions, b_wxyz = _se3_rows(b)
+        fraction = numpy.asarray(fraction, dtype=float).reshape(-1, 1)
+        positions = a_positions * (1.0 - fraction) + b_positions * fraction
+        rot = QuatArray.slerp(QuatArray(a_wxyz), QuatArray(b_wxyz), fraction)
+        positions = numpy.array(numpy.broadcast_to(positions, (len(rot), 3)))
+        return SE3PoseArray(positions, rot)
+
+
+def _se3_rows(pose):
+    """Returns the (N, 3) positions and (N, 4) wxyz arrays of an SE3PoseArray, or (1, 3) and
+    (1, 4) arrays for an SE3Pose."""
+    if isinstance(pose, SE3PoseArray):
+        return pose.positions, pose.rot.wxyz
+    if isinstance(pose, SE3Pose):
+        return (numpy.array([[pose.x, pose.y, pose.z]], dtype=float), _quat_rows(pose.rot))
+    raise TypeError('Expected an SE3Pose or SE3PoseArray, not %s' % type(pose))
+
+
+class SE2PoseArray(object):
+    """Class representing N SE(2) poses, stored as an (N, 2) numpy array of positions and an
+    (N,) numpy array of angles.
+
+    Operations mirror those of math_helpers.SE2Pose, computed for all the poses at once.
+    Operations between two arrays broadcast an array of length 1, or a single SE2Pose, against
+    the other.
+    """
+
+    def __init__(self, positions, angles):
+        self.positions = _as_float_array(positions, 2, 'positions')
+        self.angles = numpy.asarray(angles, dtype=float).reshape(-1)
+        if len(self.angles) != len(self.positions):
+            raise ValueError('Got %d positions and %d angles' %
+                             (len(self.positions), len(self.angles)))
+
+    def __repr__(self):
+        return 'SE2PoseArray(%s, %s)' % (self.positions, self.angles)
+
+    def __len__(self):
+        return self.positions.shape[0]
+
+    def __getitem__(self, idx):
+        """Returns an SE2Pose for an integer index, and an SE2PoseArray for a slice or index
+        array."""
+        if isinstance(idx, numbers.Integral):
+            x, y = self.positions[idx].tolist()
+            return SE2Pose(x, y, float(self.angles[idx]))
+        return SE2PoseArray(self.positions[idx], self.angles[idx])
+
+    def __iter__(self):
+        for (x, y), angle in zip(self.positions.tolist(), self.angles.tolist()):
+            yield SE2Pose(x, y, angle)
+
+    @property
+    def x(self):
+        return self.positions[:, 0]
+
+    @property
+    def y(self):
+        return self.positions[:, 1]
+
+    @property
+    def angle(self):
+        """The angles of the poses, like SE2Pose.angle."""
+        return self.angles
+
+    @staticmethod
+    def flatten(se3poses):
+        """
+        Flatten SE3Poses to SE2Poses, like SE2Pose.flatten().
+
+        Inputs:
+            se3poses (math_helpers.SE3PoseArray)
+
+        Returns:
+            math_helpers.SE2PoseArray representing the flattened poses.
+        """
+        return SE2PoseArray(se3poses.positions[:, 0:2], se3poses.rot.to_yaw())
+
+    @staticmethod
+    def from_poses(poses):
+        """Create a math_helpers.SE2PoseArray from an iterable of math_helpers.SE2Pose."""
+        values = numpy.array([(pose.x, pose.y, pose.angle) for pose in poses],
+                             dtype=float).reshape(-1, 3)
+        return SE2PoseArray(values[:, 0:2], values[:, 2])
+
+    @staticmethod
+    def from_proto(protos):
+        """Create a math_helpers.SE2PoseArray from repeated geometry_pb2.SE2Pose protos."""
+        values = numpy.array([(p.position.x, p.position.y, p.angle) for p in protos],
+                             dtype=float).reshape(-1, 3)
+        return SE2PoseArray(values[:, 0:2], values[:, 2])
+
+    def to_proto(self):
+        """Converts the poses into a list of geometry_pb2.SE2Pose protos."""
+        return [
+            geometry_pb2.SE2Pose(position=geometry_pb2.Vec2(x=x, y=y), angle=angle)
+            for (x, y), angle in zip(self.positions.tolist(), self.angles.tolist())
+        ]
+
+    def inverse(self):
+        """Compute the inverses of the poses."""
+        c = numpy.cos(self.angles)
+        s = numpy.sin(self.angles)
+        x, y = self.x, self.y
+        return SE2PoseArray(numpy.stack([-x * c - y * s, x * s - y * c], axis=1), -self.angles)
+
+    def mult(self, se2pose):
+        """Computes the multiplication with a math_helpers.SE2Pose or SE2PoseArray."""
+        other_positions, other_angles = _se2_rows(se2pose)
+        c = numpy.cos(self.angles)
+        s = numpy.sin(self.angles)
+        other_x, other_y = other_positions[:, 0], other_positions[:, 1]
+        positions = self.positions + numpy.stack(
+            [c * other_x - s * other_y, s * other_x + c * other_y], axis=1)
+        return SE2PoseArray(positions, _recenter_angles(self.angles + other_angles))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the multiplication with a math_helpers.SE2Pose or
+        SE2PoseArray."""
+        if isinstance(other, (SE2Pose, SE2PoseArray)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def to_matrix(self):
+        """Returns the Nx3x3 numpy array of the matrices of the poses."""
+        c = numpy.cos(self.angles)
+        s = numpy.sin(self.angles)
+        ret = numpy.zeros((len(self), 3, 3))
+        ret[:, 0, 0] = c
+        ret[:, 0, 1] = -s
+        ret[:, 1, 0] = s
+        ret[:, 1, 1] = c
+        ret[:, 0:2, 2] = self.positions
+        ret[:, 2, 2] = 1.0
+        return ret
+
+    @staticmethod
+    def from_matrix(mats):
+        """Extract a math_helpers.SE2PoseArray from an Nx3x3 numpy array of matrices."""
+        mats = numpy.asarray(mats, dtype=float).reshape(-1, 3, 3)
+        return SE2PoseArray(mats[:, 0:2, 2], numpy.arctan2(mats[:, 1, 0], mats[:, 0, 0]))
+
+    def get_closest_se3_transform(self, height_z=0.0):
+        """Compute the closest math_helpers.SE3PoseArray of the poses."""
+        half_angles = self.angles / 2.0
+        wxyz = numpy.zeros((len(self), 4))
+        wxyz[:, 0] = numpy.cos(half_angles)
+        wxyz[:, 3] = numpy.sin(half_angles)
+        positions = numpy.empty((len(self), 3))
+        positions[:, 0:2] = self.positions
+        positions[:, 2] = height_z
+        return SE3PoseArray(positions, wxyz)
+
+
+def _se2_rows(pose):
+    """Returns the (N, 2) positions and (N,) angles of an SE2PoseArray, or (1, 2) and (1,)
+    arrays for an SE2Pose."""
+    if isinstance(pose, SE2PoseArray):
+        return pose.positions, pose.angles
+    if isinstance(pose, SE2Pose):
+        return numpy.array([[pose.x, pose.y]], dtype=float), numpy.array([pose.angle], dtype=float)
+    raise TypeError('Expected an SE2Pose or SE2PoseArray, not %s' % type(pose))
+
+
 def pose_to_xyz_yaw(A_tform_B):
     """Gets the x,y,z yaw of B in A from the SE3Pose protobuf message."""
     yaw = Quat.from_proto(A_tform_B.rotation).to_yaw()
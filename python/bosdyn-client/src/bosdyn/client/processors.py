@@ -13,6 +13,10 @@ from bosdyn.util import now_nsec, set_timestamp_from_nsec  # bosdyn-core
 class AddRequestHeader(object):
     """Sets header fields common to all bosdyn.api requests."""
 
+    # Request fields changed by mutate(); with restore_request_fields set, BaseClient saves and
+    # restores only these fields instead of copying the whole request.
+    mutated_fields = ('header',)
+
     def __init__(self, client_name_func):
         """Constructor, takes function to access the client name to insert into request headers."""
         self.get_client_name = client_name_func
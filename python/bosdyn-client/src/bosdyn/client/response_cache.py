@@ -0,0 +1,141 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Short-lived caching and coalescing of the responses of idempotent rpcs.
+
+A ResponseCache is opt-in, and is set as the response_cache of an Sdk, Robot or client, which
+pass it on like request processors:
+
+    sdk.response_cache = ResponseCache(IDEMPOTENT_GETTER_TTLS)
+
+Blocking unary rpcs of the methods given a TTL then share their responses: identical requests
+made while an rpc is in flight wait for its response instead of making their own rpc, and
+identical requests made within the TTL after it completed get the same response.
+"""
+import threading
+import time
+
+# Suggested cache lifetimes in seconds of the responses of idempotent getters, by rpc method.
+# Robot state changes quickly, so its responses are only shared by calls made within a few
+# milliseconds.  Robot.get_frame_tree_snapshot() uses GetRobotState.
+IDEMPOTENT_GETTER_TTLS = {
+    '/bosdyn.api.RobotStateService/GetRobotState': 0.01,
+    '/bosdyn.api.RobotStateService/GetRobotMetrics': 0.1,
+    '/bosdyn.api.RobotStateService/GetRobotHardwareConfiguration': 10.0,
+    '/bosdyn.api.DirectoryService/ListServiceEntries': 1.0,
+    '/bosdyn.api.ImageService/ListImageSources': 1.0,
+}
+
+
+class _Flight(object):
+    """An rpc in progress, which identical requests wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class ResponseCache(object):
+    """Caches the responses of idempotent rpcs for a short time, and coalesces identical requests.
+
+    Requests are identical if they are made on the same channel, and are equal after their
+    'header' field is cleared.  Keying on the channel keeps the responses of different robots
+    apart, so one cache may be shared by all the robots of an Sdk.  Only
+    responses without errors are cached; an error of an rpc is raised to all the callers which
+    waited for it.  Callers waiting for an rpc made by another caller are bound by that caller's
+    timeout, not their own.
+
+    Args:
+        ttl_by_method: Dict of full rpc method name, e.g. '/bosdyn.api.DirectoryService/
+            ListServiceEntries', to the number of seconds its responses are cached.  Methods
+            not in the dict are not cached or coalesced.
+        copy_responses: If True, each caller gets its own copy of a shared response, so callers
+            may modify it.  If False, callers share the response, and must not modify it.
+    """
+
+    def __init__(self, ttl_by_method, copy_responses=True):
+        self._ttl_by_method = dict(ttl_by_method)
+        self._copy_responses = copy_responses
+        self._lock = threading.Lock()
+        self._responses = {}  # Key -> (expiration time, response).
+        self._flights = {}  # Key -> _Flight.
+
+    def ttl(self, method):
+        """Return the cache lifetime of the responses of the rpc method, or None."""
+        return self._ttl_by_method.get(method)
+
+    def get(self, channel, method, request, call_func):
+        """Return the response to request, from the cache, another caller's rpc or call_func().
+
+        Args:
+            channel: The grpc channel the rpc is made on.  Only rpcs on the same channel share
+                responses.
+            method: Full name of the rpc method, which must have a ttl().
+            request: The request message.
+            call_func: Function making the rpc and returning its response, or raising its error.
+        """
+        key = self._key(channel, method, request)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and cached[0] > now:
+                return self._response_copy(cached[1])
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._response_copy(flight.response)
+
+        try:
+            flight.response = call_func()
+        except Exception as exc:
+            flight.error = exc
+            raise
+        else:
+            self._store(key, self._ttl_by_method[method], flight.response)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return self._response_copy(flight.response)
+
+    def clear(self):
+        """Discard all cached responses."""
+        with self._lock:
+            self._responses = {}
+
+    def _store(self, key, ttl, response):
+        now = time.monotonic()
+        with self._lock:
+            self._responses = {
+                other_key: cached
+                for other_key, cached in self._responses.items()
+                if cached[0] > now
+            }
+            self._responses[key] = (now + ttl, response)
+
+    def _response_copy(self, response):
+        if not self._copy_responses:
+            return response
+        response_copy = type(response)()
+        response_copy.CopyFrom(response)
+        return response_copy
+
+    @staticmethod
+    def _key(channel, method, request):
+        if 'header' in request.DESCRIPTOR.fields_by_name and request.HasField('header'):
+            request_copy = type(request)()
+            request_copy.CopyFrom(request)
+            request_copy.ClearField('header')
+            request = request_copy
+        return channel, method, request.SerializeToString(deterministic=True)
@@ -7,33 +7,26 @@
 """Settings common to a user's access to one robot."""
 import copy
 import logging
+import threading
 import time
 
+import grpc
+
 import bosdyn.api.data_buffer_pb2 as data_buffer_protos
 import bosdyn.client.channel
 from bosdyn.util import timestamp_to_sec
 
+# Clients only used by convenience methods of Robot are imported by those methods, so that
+# importing bosdyn.client does not import their modules and protos.
 from .auth import AuthClient
 from .channel import DEFAULT_MAX_MESSAGE_LENGTH
-from .data_buffer import DataBufferClient
-from .data_buffer import log_event as pkg_log_event
 from .directory import DirectoryClient
 from .directory_registration import DirectoryRegistrationClient
-from .estop import EstopClient
-from .estop import is_estopped as pkg_is_estopped
 from .exceptions import Error
 from .lease import LeaseWallet
 from .payload_registration import (PayloadAlreadyExistsError, PayloadNotAuthorizedError,
                                    PayloadRegistrationClient)
-from .power import PowerClient
-from .power import is_powered_on as pkg_is_powered_on
-from .power import power_off as pkg_power_off
-from .power import power_on as pkg_power_on
-from .power import safe_power_off as pkg_safe_power_off
-from .robot_command import RobotCommandClient
 from .robot_id import RobotIdClient
-from .robot_state import RobotStateClient
-from .robot_state import has_arm as pkg_has_arm
 from .time_sync import TimeSyncClient, TimeSyncError, TimeSyncThread
 from .token_cache import TokenCache
 from .token_manager import TokenManager
@@ -111,8 +104,17 @@ class Robot(object):
         self.token_cache = TokenCache()
         self._token_manager = None
         self._current_user = None
+        # The client and channel registries are replaced by updated copies when a client or
+        # channel is added, so they can be read without locking.
         self.service_clients_by_name = {}
         self.channels_by_authority = {}
+        # Clients and channels for use with asyncio, see ensure_client(aio=True).
+        self.aio_service_clients_by_name = {}
+        self.aio_channels_by_authority = {}
+        self._registry_lock = threading.Lock()
+        self._creation_locks = {}
+        self._directory_sync_lock = threading.Lock()
+        self._directory_sync_count = 0
         self.authorities_by_name = {}
         self._robot_id = None
         self._has_arm = None
@@ -124,6 +126,9 @@ class Robot(object):
         self.service_type_by_name = {}
         self.request_processors = []
         self.response_processors = []
+        self.rpc_stats_sinks = []
+        self.adaptive_timeouts = None
+        self.response_cache = None
         self.app_token = None
         self.cert = None
         self.lease_wallet = LeaseWallet()
@@ -134,6 +139,11 @@ class Robot(object):
         self.max_send_message_length = DEFAULT_MAX_MESSAGE_LENGTH
         self.max_receive_message_length = DEFAULT_MAX_MESSAGE_LENGTH
 
+        # Additional (name, value) options and interceptors for the channels created by
+        # ensure_secure_channel().  Interceptors only apply to non-aio channels.
+        self.channel_options = []
+        self.channel_interceptors = []
+
     def _shutdown(self):
         """Shut down background threads for tokens and time sync."""
         if self._time_sync_thread:
@@ -188,6 +198,11 @@ class Robot(object):
         """Adds to this object's processors, etc. based on other"""
         self.request_processors = other.request_processors + self.request_processors
         self.response_processors = other.response_processors + self.response_processors
+        self.rpc_stats_sinks = other.rpc_stats_sinks + self.rpc_stats_sinks
+        if self.adaptive_timeouts is None:
+            self.adaptive_timeouts = other.adaptive_timeouts
+        if self.response_cache is None:
+            self.response_cache = other.response_cache
         self.service_client_factories_by_type.update(other.service_client_factories_by_type)
         self.service_type_by_name.update(other.service_type_by_name)
         # Don't know the types here, so use explicit deepcopy.
@@ -198,7 +213,7 @@ class Robot(object):
         self.client_name = other.client_name
         self.lease_wallet.set_client_name(self.client_name)
 
-    def ensure_client(self, service_name, channel=None, options=[]):
+    def ensure_client(self, service_name, channel=None, options=[], aio=False):
         """Ensure a Client for a given service.
         Note: If a new service has been registered with the directory service, this may raise
         UnregisteredServiceNameError when trying to connect to it until sync_with_directory() is
@@ -209,16 +224,30 @@ class Robot(object):
             channel: gRPC channel object to use. Default None, in which case the Sdk data
                        is used to generate a channel. The channel will become associated with
                        the client.
+            aio: If True, return a client using a grpc.aio channel, whose rpc methods are
+                       coroutines (see BaseClient.is_aio).  aio clients and their channels are
+                       bound to the running event loop, so call this from within it.
 
         Raises:
             UnregisteredServiceNameError: The service is not known.
             UnregisteredServiceTypeError: The client type for this service was never registered.
             RpcError:                There was an error communicating with the robot.
         """
+        registry_name = 'aio_service_clients_by_name' if aio else 'service_clients_by_name'
         # Check if a client with this name is already running
-        if service_name in self.service_clients_by_name:
-            return self.service_clients_by_name[service_name]
+        client = getattr(self, registry_name).get(service_name)
+        if client is not None:
+            return client
+
+        with self._creation_lock(registry_name, service_name):
+            client = getattr(self, registry_name).get(service_name)
+            if client is None:
+                client = self._create_client(service_name, channel, options, aio)
+                # Track service clients that have been created to avoid duplicate clients
+                self._add_to_registry(registry_name, service_name, client)
+        return client
 
+    def _create_client(self, service_name, channel, options, aio):
         # Create an instance of the class
         try:
             service_type = self.service_type_by_name[service_name]
@@ -233,14 +262,28 @@ class Robot(object):
         self.logger.debug('Created client for %s', service_name)
 
         if channel is None:
-            channel = self.ensure_channel(service_name, options=options)
+            channel = self.ensure_channel(service_name, options=options, aio=aio)
 
         client.channel = channel
         client.update_from(self)
-        # Track service clients that have been created to avoid duplicate clients
-        self.service_clients_by_name[service_name] = client
         return client
 
+    def _creation_lock(self, registry_name, key):
+        """Get the lock held while creating the entry for key in a client or channel registry.
+
+        Concurrent callers ensuring the same client or channel wait for the first one to create
+        it, instead of creating duplicates.
+        """
+        with self._registry_lock:
+            return self._creation_locks.setdefault((registry_name, key), threading.RLock())
+
+    def _add_to_registry(self, registry_name, key, value):
+        """Replace a client or channel registry by a copy which includes key."""
+        with self._registry_lock:
+            registry = dict(getattr(self, registry_name))
+            registry[key] = value
+            setattr(self, registry_name, registry)
+
     def get_cached_robot_id(self):
         """Return the RobotId proto for this robot, querying it from the robot if not yet cached.
 
@@ -253,12 +296,13 @@ class Robot(object):
         return self._robot_id
 
 
-    def ensure_channel(self, service_name, options=[]):
+    def ensure_channel(self, service_name, options=[], aio=False):
         """Verify the right information exists before calling the ensure_secure_channel
         method.
 
         Args:
             service_name: Name of the service in the directory.
+            aio: If True, get a grpc.aio channel.
         Returns:
             Existing channel if found, or newly created channel if not found.
         Raises:
@@ -284,12 +328,32 @@ class Robot(object):
             raise UnregisteredServiceNameError(service_name)
 
         skip_app_token_check = service_name == 'robot-id'
-        return self.ensure_secure_channel(authority, skip_app_token_check, options=options)
+        return self.ensure_secure_channel(authority, skip_app_token_check, options=options,
+                                          aio=aio)
+
+    def ensure_secure_channel(self, authority, skip_app_token_check=False, options=[], aio=False):
+        """Get the channel to access the given authority, creating it if it doesn't exist.
+
+        If aio is True, the channel is a grpc.aio channel.
+        """
+        registry_name = 'aio_channels_by_authority' if aio else 'channels_by_authority'
+        channel = getattr(self, registry_name).get(authority)
+        if channel is not None:
+            return channel
+
+        with self._creation_lock(registry_name, authority):
+            channel = getattr(self, registry_name).get(authority)
+            if channel is None:
+                channel = self._create_secure_channel(authority, options, aio)
+                self._add_to_registry(registry_name, authority, channel)
+        return channel
 
-    def ensure_secure_channel(self, authority, skip_app_token_check=False, options=[]):
-        """Get the channel to access the given authority, creating it if it doesn't exist."""
-        if authority in self.channels_by_authority:
-            return self.channels_by_authority[authority]
+    def _create_secure_channel(self, authority, options, aio):
+        # Add this robot's channel options, unless the caller set them.
+        options = list(options)
+        option_names = [option[0] for option in options]
+        options.extend(
+            option for option in self.channel_options if option[0] not in option_names)
 
         # Update max send/receive message lengths.
         if 'grpc.max_receive_message_length' not in [option[0] for option in options]:
@@ -302,10 +366,12 @@ class Robot(object):
             self.cert, lambda: (self.app_token, self.user_token))
         channel = bosdyn.client.channel.create_secure_channel(self.address,
                                                               self._secure_channel_port, creds,
-                                                              authority, options=options)
+                                                              authority, options=options,
+                                                              aio=aio)
+        if self.channel_interceptors and not aio:
+            channel = grpc.intercept_channel(channel, *self.channel_interceptors)
         self.logger.debug('Created channel to %s at port %i with authority %s', self.address,
                           self._secure_channel_port, authority)
-        self.channels_by_authority[authority] = channel
         return channel
 
 
@@ -430,11 +496,20 @@ class Robot(object):
     def sync_with_directory(self):
         """Update local state with all available services on the robot.
 
+        Concurrent calls are coalesced: a caller which had to wait for another thread's sync to
+        finish uses its result instead of listing the services again.
+
         Returns:
             Dict[string, string]: Mapping of service name to service type
         """
-        remote_services = self.list_services()
-        return self.sync_with_services_list(remote_services)
+        sync_count = self._directory_sync_count
+        with self._directory_sync_lock:
+            if self._directory_sync_count != sync_count:
+                return self.service_type_by_name
+            remote_services = self.list_services()
+            service_type_by_name = self.sync_with_services_list(remote_services)
+            self._directory_sync_count += 1
+        return service_type_by_name
 
     def sync_with_services_list(self, services_list):
         """Alternate version of sync_with_directory() that takes the list of services
@@ -521,6 +596,7 @@ class Robot(object):
           NotEstablishedError: timestamp_secs given, but time-sync has not been achieved.
           RpcError:            A problem occurred sending the comment to the robot.
         """
+        from .data_buffer import DataBufferClient
         client = self.ensure_client(DataBufferClient.default_service_name)
         if timestamp_secs is None:
             try:
@@ -547,6 +623,7 @@ class Robot(object):
           id_str (string):                      Unique id for event.  A uuid is generated if None.
           parameters ([bosdyn.api.Parameter]):  Parameters to attach to the event.
         """
+        from .data_buffer import log_event as pkg_log_event
         return pkg_log_event(self, event_type=event_type, level=level, description=description,
                              start_timestamp_secs=start_timestamp_secs,
                              end_timestamp_secs=end_timestamp_secs, id_str=id_str,
@@ -565,6 +642,8 @@ class Robot(object):
             RpcError:           Problem communicating with the robot.
             power_client.CommandTimedOutError: The robot did not power on within timeout_sec
         """
+        from .power import PowerClient
+        from .power import power_on as pkg_power_on
         service_name = PowerClient.default_service_name
         client = self.ensure_client(service_name)
         pkg_power_on(client, timeout_sec, update_frequency, timeout=timeout)
@@ -588,6 +667,11 @@ class Robot(object):
             RobotCommandResponseError: If not cut_immediately, raised on problems with the safe
                 power off.
         """
+        from .power import PowerClient
+        from .power import power_off as pkg_power_off
+        from .power import safe_power_off as pkg_safe_power_off
+        from .robot_command import RobotCommandClient
+        from .robot_state import RobotStateClient
         if cut_immediately:
             power_client = self.ensure_client(PowerClient.default_service_name)
             pkg_power_off(power_client, timeout_sec, update_frequency, timeout=timeout)
@@ -612,6 +696,8 @@ class Robot(object):
         Raises:
             RpcError: A problem occurred trying to communicate with the robot.
         """
+        from .power import is_powered_on as pkg_is_powered_on
+        from .robot_state import RobotStateClient
         state_client = self.ensure_client(RobotStateClient.default_service_name)
         return pkg_is_powered_on(state_client, timeout=timeout)
 
@@ -628,6 +714,8 @@ class Robot(object):
         Raises:
             RpcError: A problem occurred trying to communicate with the robot.
         """
+        from .estop import EstopClient
+        from .estop import is_estopped as pkg_is_estopped
         estop_client = self.ensure_client(EstopClient.default_service_name)
         return pkg_is_estopped(estop_client, timeout=timeout)
 
@@ -644,6 +732,7 @@ class Robot(object):
         Raises:
           RpcError: A problem occurred sending the comment to the robot.
         """
+        from .robot_state import RobotStateClient
         client = self.ensure_client(RobotStateClient.default_service_name)
         current_state = client.get_robot_state(timeout=timeout)
         return current_state.kinematic_state.transforms_snapshot
@@ -662,6 +751,8 @@ class Robot(object):
         """
         if self._has_arm:
             return self._has_arm
+        from .robot_state import RobotStateClient
+        from .robot_state import has_arm as pkg_has_arm
         state_client = self.ensure_client(RobotStateClient.default_service_name)
         self._has_arm = pkg_has_arm(state_client, timeout=timeout)
         return self._has_arm
@@ -22,6 +22,7 @@ from bosdyn.client.common import (BaseClient, error_factory, error_pair,
                                   handle_unset_status_error)
 from bosdyn.util import seconds_to_duration
 
+from .deadline import limit_timeout
 from .exceptions import Error as BaseError
 from .exceptions import InvalidRequestError, ResponseError, TimedOutError, UnsetStatusError
 from .frame_helpers import BODY_FRAME_NAME, ODOM_FRAME_NAME, get_se2_a_tform_b
@@ -1580,7 +1581,7 @@ def blocking_stand(command_client, timeout_sec=10, update_frequency=1.0, params=
 
     Args:
         command_client: RobotCommand client.
-        timeout_sec: Timeout for the command in seconds.
+        timeout_sec: Timeout for the command in seconds, limited by the current Deadline.
         update_frequency: Update frequency for the command in Hz.
         params(spot.MobilityParams): Spot specific parameters for mobility commands to optionally set say body_height
 
@@ -1591,7 +1592,7 @@ def blocking_stand(command_client, timeout_sec=10, update_frequency=1.0, params=
     """
 
     start_time = time.time()
-    end_time = start_time + timeout_sec
+    end_time = start_time + limit_timeout(timeout_sec)
     update_time = 1.0 / update_frequency
 
     stand_command = RobotCommandBuilder.synchro_stand_command(params=params)
@@ -1632,7 +1633,7 @@ def blocking_sit(command_client, timeout_sec=10, update_frequency=1.0):
 
     Args:
         command_client: RobotCommand client.
-        timeout_sec: Timeout for the command in seconds.
+        timeout_sec: Timeout for the command in seconds, limited by the current Deadline.
         update_frequency: Update frequency for the command in Hz.
 
     Raises:
@@ -1642,7 +1643,7 @@ def blocking_sit(command_client, timeout_sec=10, update_frequency=1.0):
     """
 
     start_time = time.time()
-    end_time = start_time + timeout_sec
+    end_time = start_time + limit_timeout(timeout_sec)
     update_time = 1.0 / update_frequency
 
     sit_command = RobotCommandBuilder.synchro_sit_command()
@@ -1683,7 +1684,7 @@ def blocking_selfright(command_client, timeout_sec=30, update_frequency=1.0):
 
     Args:
         command_client: RobotCommand client.
-        timeout_sec: Timeout for the command in seconds.
+        timeout_sec: Timeout for the command in seconds, limited by the current Deadline.
         update_frequency: Update frequency for the command in Hz.
 
     Raises:
@@ -1693,7 +1694,7 @@ def blocking_selfright(command_client, timeout_sec=30, update_frequency=1.0):
     """
 
     start_time = time.time()
-    end_time = start_time + timeout_sec
+    end_time = start_time + limit_timeout(timeout_sec)
     update_time = 1.0 / update_frequency
 
     selfright_command = RobotCommandBuilder.selfright_command()
@@ -9,7 +9,6 @@
 RobotIdClient -- Wrapper around service stub.
 """
 
-from distutils.version import StrictVersion
 
 from bosdyn.api import robot_id_pb2, robot_id_service_pb2_grpc
 from bosdyn.client.common import BaseClient, common_header_errors
@@ -58,4 +57,6 @@ def create_strict_version(robot_id):
                             str(robot_id.software_release.version.minor_version) + '.' + \
                             str(robot_id.software_release.version.patch_level)
 
+    # distutils is slow to import, and only needed here.
+    from distutils.version import StrictVersion
     return StrictVersion(version_string)
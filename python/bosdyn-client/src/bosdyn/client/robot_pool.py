@@ -0,0 +1,183 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""RobotPool manages the robots, channels and clients of a fleet from a single process."""
+import collections
+import logging
+import threading
+
+import grpc
+
+_LOGGER = logging.getLogger(__name__)
+
+# Channel options for managing many robots.  Keepalive pings detect connections to robots which
+# went away during long rpcs, and connections left idle are closed by gRPC and re-established
+# on the next rpc made on the channel.
+DEFAULT_FLEET_CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 60 * 1000),
+    ('grpc.keepalive_timeout_ms', 20 * 1000),
+    ('grpc.keepalive_permit_without_calls', 0),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.client_idle_timeout_ms', 5 * 60 * 1000),
+]
+
+RobotPoolMetrics = collections.namedtuple(
+    'RobotPoolMetrics',
+    ['num_robots', 'num_channels', 'active_rpcs', 'max_active_rpcs', 'total_rpcs'])
+
+
+class _RpcCounter(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor,
+                  grpc.StreamUnaryClientInterceptor, grpc.StreamStreamClientInterceptor):
+    """Channel interceptor counting the rpcs in progress."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active_rpcs = 0
+        self.max_active_rpcs = 0
+        self.total_rpcs = 0
+
+    def _intercept(self, continuation, client_call_details, request):
+        with self._lock:
+            self.active_rpcs += 1
+            self.total_rpcs += 1
+            self.max_active_rpcs = max(self.max_active_rpcs, self.active_rpcs)
+        try:
+            call = continuation(client_call_details, request)
+        except Exception:
+            self._on_done(None)
+            raise
+        call.add_done_callback(self._on_done)
+        return call
+
+    def _on_done(self, _call):
+        with self._lock:
+            self.active_rpcs -= 1
+
+    intercept_unary_unary = _intercept
+    intercept_unary_stream = _intercept
+    intercept_stream_unary = _intercept
+    intercept_stream_stream = _intercept
+
+
+class RobotPool(object):
+    """The robots of a fleet, managed from one process.
+
+    Robots added to the pool are created by the Sdk, and share the pool's channel options and
+    rpc metrics.  Their channels and clients are still created lazily, on the first
+    ensure_client() for each service.
+
+    Args:
+        sdk: Sdk used to create the robots.
+        channel_options: List of (name, value) gRPC options for all channels created for the
+            robots. Default None to use DEFAULT_FLEET_CHANNEL_OPTIONS.
+    """
+
+    def __init__(self, sdk, channel_options=None):
+        self._sdk = sdk
+        if channel_options is None:
+            channel_options = DEFAULT_FLEET_CHANNEL_OPTIONS
+        self._channel_options = list(channel_options)
+        self._robots = {}
+        self._lock = threading.Lock()
+        self._rpc_counter = _RpcCounter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def addresses(self):
+        """Addresses of the robots in the pool."""
+        with self._lock:
+            return list(self._robots)
+
+    def add_robot(self, address, name=None):
+        """Get the Robot at address, adding it to the pool if needed.
+
+        Only channels created after a robot is added use the pool's channel options.
+
+        Args:
+            address: Network-resolvable address of the robot.
+            name: A unique identifier for the robot. Default None to use the address.
+        Returns:
+            The Robot.
+        """
+        with self._lock:
+            robot = self._robots.get(address)
+            if robot is None:
+                robot = self._sdk.create_robot(address, name)
+                robot.channel_options = self._channel_options
+                robot.channel_interceptors.append(self._rpc_counter)
+                self._robots[address] = robot
+            return robot
+
+    def robot(self, address):
+        """Get the Robot at address.
+
+        Raises:
+            KeyError: The robot was not added to the pool.
+        """
+        with self._lock:
+            return self._robots[address]
+
+    def remove_robot(self, address):
+        """Remove the robot at address from the pool, closing its channels."""
+        with self._lock:
+            robot = self._robots.pop(address)
+        self._sdk.robots.pop(address, None)
+        self._close_robot(robot)
+
+    def ensure_client(self, address, service_name):
+        """Ensure a client for a service of the robot at address.  See Robot.ensure_client().
+
+        Raises:
+            KeyError: The robot was not added to the pool.
+        """
+        return self.robot(address).ensure_client(service_name)
+
+    def ensure_clients(self, service_name):
+        """Ensure a client for a service of every robot in the pool.
+
+        Returns:
+            Dict of address to client.
+        """
+        with self._lock:
+            robots = dict(self._robots)
+        return {
+            address: robot.ensure_client(service_name) for address, robot in robots.items()
+        }
+
+    def metrics(self):
+        """Returns RobotPoolMetrics for the channels and rpcs of the robots in the pool.
+
+        Rpcs on aio channels are not counted.
+        """
+        with self._lock:
+            robots = list(self._robots.values())
+        num_channels = sum(
+            len(robot.channels_by_authority) + len(robot.aio_channels_by_authority)
+            for robot in robots)
+        counter = self._rpc_counter
+        return RobotPoolMetrics(len(robots), num_channels, counter.active_rpcs,
+                                counter.max_active_rpcs, counter.total_rpcs)
+
+    def close(self):
+        """Remove all robots from the pool, closing their channels."""
+        for address in self.addresses:
+            self.remove_robot(address)
+
+    @staticmethod
+    def _close_robot(robot):
+        robot._shutdown()  # pylint: disable=protected-access
+        for channel in robot.channels_by_authority.values():
+            channel.close()
+        robot.channels_by_authority = {}
+        robot.service_clients_by_name = {}
+        # aio channels can only be closed from their event loop.
+        robot.aio_channels_by_authority = {}
+        robot.aio_service_clients_by_name = {}
@@ -0,0 +1,338 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Per-rpc latency and payload size statistics of service clients.
+
+Clients report the RpcStats of each rpc to the sinks in their rpc_stats_sinks list, which they
+adopt from the Robot (and the Robot from the Sdk) like request processors:
+
+    sink = HistogramSink()
+    sdk.rpc_stats_sinks.append(sink)
+    ...
+    print(sink.summary())
+"""
+import collections
+import math
+import struct
+import threading
+
+import bosdyn.api.data_buffer_pb2 as data_buffer_protos
+
+# Statistics of one rpc.
+#   method:         full name of the rpc method, e.g. '/bosdyn.api.RobotIdService/GetRobotId'.
+#   wall_time:      seconds from the start of the call until the response was handled.
+#   processor_time: seconds spent applying request and response processors (including copying
+#                   the request), part of wall_time.
+#   request_bytes:  serialized size of the request(s).
+#   response_bytes: serialized size of the response(s).
+#   error:          class name of the error raised by the call, or None.
+RpcStats = collections.namedtuple(
+    'RpcStats',
+    ['method', 'wall_time', 'processor_time', 'request_bytes', 'response_bytes', 'error'])
+
+# Percentiles reported by HistogramSink.summary() by default.
+DEFAULT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class RpcStatsSink(object):
+    """Interface for receiving the RpcStats of the rpcs made by service clients."""
+
+    def record(self, rpc_stats):
+        """Record the RpcStats of a finished rpc.
+
+        Called from the thread which finished the rpc, which may be a gRPC thread, so this
+        should be fast and must be thread-safe.
+        """
+        raise NotImplementedError
+
+
+class Histogram(object):
+    """Histogram of non-negative values with a bounded relative error, like HdrHistogram.
+
+    Values are counted in buckets whose width grows with the value, so any value is known within
+    a relative error of 2**(1 - significant_bits) using memory which grows with the logarithm of
+    the range of values.  This class is not thread-safe.
+
+    Args:
+        unit: Values are counted in integer multiples of unit.
+        significant_bits: Number of significant bits of each value which are kept.
+    """
+
+    def __init__(self, unit=1, significant_bits=7):
+        self._unit = unit
+        self._significant_bits = significant_bits
+        self._counts = {}  # Lower bound of bucket, in units -> count.
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Count a value."""
+        units = max(0, int(value / self._unit))
+        shift = max(0, units.bit_length() - self._significant_bits)
+        bucket = (units >> shift) << shift
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        """Mean of the values, or None if there are none."""
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def percentile(self, percent):
+        """Return the value which percent of the values are less than or equal to.
+
+        As in HdrHistogram, the highest value of the bucket is returned, so the result may be
+        slightly above the actual value, but never above the maximum value.  Returns None if
+        there are no values.
+        """
+        if not self.count:
+            return None
+        target = max(1, int(math.ceil(percent / 100.0 * self.count)))
+        num_values = 0
+        for bucket in sorted(self._counts):
+            num_values += self._counts[bucket]
+            if num_values >= target:
+                break
+        width = 1 << max(0, bucket.bit_length() - self._significant_bits)
+        return min((bucket + width) * self._unit, self.max)
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        """Return a dict of the mean, max and percentiles ('p50', 'p99.9', ...) of the values."""
+        result = collections.OrderedDict()
+        for percent in percentiles:
+            result['p{:g}'.format(percent)] = self.percentile(percent)
+        result['mean'] = self.mean
+        result['max'] = self.max
+        return result
+
+
+class MethodStats(object):
+    """Histograms of the RpcStats of one rpc method.
+
+    Args:
+        time_unit: Resolution of the time histograms, in seconds.
+        significant_bits: Precision of the histograms, see Histogram.
+    """
+
+    def __init__(self, time_unit=1e-6, significant_bits=7):
+        self.wall_time = Histogram(time_unit, significant_bits)
+        self.processor_time = Histogram(time_unit, significant_bits)
+        self.request_bytes = Histogram(1, significant_bits)
+        self.response_bytes = Histogram(1, significant_bits)
+        self.errors = collections.Counter()  # Error class name -> count.
+
+    @property
+    def count(self):
+        """Number of rpcs."""
+        return self.wall_time.count
+
+    def add(self, rpc_stats):
+        """Count the RpcStats of an rpc."""
+        self.wall_time.add(rpc_stats.wall_time)
+        self.processor_time.add(rpc_stats.processor_time)
+        self.request_bytes.add(rpc_stats.request_bytes)
+        self.response_bytes.add(rpc_stats.response_bytes)
+        if rpc_stats.error is not None:
+            self.errors[rpc_stats.error] += 1
+
+
+class HistogramSink(RpcStatsSink):
+    """RpcStatsSink which keeps in-memory histograms of the RpcStats of each rpc method.
+
+    Args:
+        time_unit: Resolution of the time histograms, in seconds.
+        significant_bits: Precision of the histograms, see Histogram.
+    """
+
+    def __init__(self, time_unit=1e-6, significant_bits=7):
+        self._time_unit = time_unit
+        self._significant_bits = significant_bits
+        self._lock = threading.Lock()
+        self._stats_by_method = {}
+
+    def record(self, rpc_stats):
+        with self._lock:
+            method_stats = self._stats_by_method.get(rpc_stats.method)
+            if method_stats is None:
+                method_stats = MethodStats(self._time_unit, self._significant_bits)
+                self._stats_by_method[rpc_stats.method] = method_stats
+            method_stats.add(rpc_stats)
+
+    def methods(self):
+        """Return the names of the rpc methods with recorded stats."""
+        with self._lock:
+            return sorted(self._stats_by_method)
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        """Summarize the stats of each rpc method.
+
+        Returns:
+            Dict of method name to a dict with the 'count' of rpcs, a dict of 'errors' by error
+            class name, and the Histogram.summary() of 'wall_time', 'processor_time',
+            'request_bytes' and 'response_bytes'.
+        """
+        with self._lock:
+            return {
+                method: {
+                    'count': stats.count,
+                    'errors': dict(stats.errors),
+                    'wall_time': stats.wall_time.summary(percentiles),
+                    'processor_time': stats.processor_time.summary(percentiles),
+                    'request_bytes': stats.request_bytes.summary(percentiles),
+                    'response_bytes': stats.response_bytes.summary(percentiles),
+                } for method, stats in self._stats_by_method.items()
+            }
+
+    def reset(self):
+        """Discard all recorded stats."""
+        with self._lock:
+            self._stats_by_method = {}
+
+
+class AdaptiveTimeouts(RpcStatsSink):
+    """RpcStatsSink which chooses the default timeout of each rpc method from its past rpcs.
+
+    The timeout of a method is multiplier times a percentile of the wall time of its last
+    window_size rpcs, limited to [min_timeout, max_timeout].  Until min_samples rpcs of the method
+    were recorded, its timeout is the client's default.  Rpcs which timed out are included, so
+    the timeout grows again if the latency of a method increases.
+
+    Set it as the adaptive_timeouts of an Sdk, Robot or client, which then use it for rpcs made
+    without an explicit timeout, and report the RpcStats of all rpcs to it.
+
+    Args:
+        percentile: Percentile of the recent wall times to base the timeout on.
+        multiplier: Ratio of the timeout to the percentile.
+        min_timeout: Lower limit of the timeouts, in seconds.
+        max_timeout: Upper limit of the timeouts, in seconds.  Default None to use the client's
+            default timeout.
+        min_samples: Number of rpcs of a method needed before adapting its timeout.
+        window_size: Number of recent rpcs of each method to use.
+    """
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, percentile=99, multiplier=3.0, min_timeout=1.0, max_timeout=None,
+                 min_samples=20, window_size=200):
+        self._percentile = percentile
+        self._multiplier = multiplier
+        self._min_timeout = min_timeout
+        self._max_timeout = max_timeout
+        self._min_samples = min_samples
+        self._window_size = window_size
+        self._lock = threading.Lock()
+        self._wall_times = {}  # Method name -> deque of recent wall times.
+        self._timeouts = {}  # Method name -> timeout, or None if it needs to be recomputed.
+
+    def record(self, rpc_stats):
+        with self._lock:
+            wall_times = self._wall_times.get(rpc_stats.method)
+            if wall_times is None:
+                wall_times = collections.deque(maxlen=self._window_size)
+                self._wall_times[rpc_stats.method] = wall_times
+            wall_times.append(rpc_stats.wall_time)
+            self._timeouts[rpc_stats.method] = None
+
+    def timeout(self, method, default_timeout):
+        """Return the timeout for an rpc of the method.
+
+        Args:
+            method: Full name of the rpc method, as in RpcStats.method.
+            default_timeout: The client's default timeout, in seconds.
+        """
+        with self._lock:
+            timeout = self._timeouts.get(method)
+            if timeout is None:
+                wall_times = self._wall_times.get(method)
+                if wall_times is None or len(wall_times) < self._min_samples:
+                    return default_timeout
+                timeout = self._multiplier * self._wall_time_percentile(sorted(wall_times))
+                self._timeouts[method] = timeout
+        max_timeout = default_timeout if self._max_timeout is None else self._max_timeout
+        return max(self._min_timeout, min(timeout, max_timeout))
+
+    def _wall_time_percentile(self, wall_times):
+        index = int(math.ceil(self._percentile / 100.0 * len(wall_times))) - 1
+        return wall_times[max(0, min(index, len(wall_times) - 1))]
+
+
+class DataBufferExporter(object):
+    """Exports the summaries of a HistogramSink to the robot's data buffer, as signal ticks.
+
+    Each rpc method gets its own signal schema, named SCHEMA_PREFIX + method name, which is
+    registered on the first export of the method.  Each export() adds one tick per method, with
+    the count of rpcs and errors so far and the Histogram.summary() values of the method's stats.
+
+    Rpcs made by the DataBufferClient are themselves recorded if the client reports to the sink.
+
+    Args:
+        data_buffer_client: DataBufferClient used to register the schemas and add the ticks.
+        histogram_sink: HistogramSink to export.
+        source: Source name of the signal ticks.
+        percentiles: Percentiles of each histogram to export.
+    """
+
+    SCHEMA_PREFIX = 'bosdyn/rpc_stats'
+
+    _HISTOGRAMS = ('wall_time', 'processor_time', 'request_bytes', 'response_bytes')
+
+    def __init__(self, data_buffer_client, histogram_sink, source='rpc_stats',
+                 percentiles=(50, 90, 99)):
+        self._client = data_buffer_client
+        self._sink = histogram_sink
+        self._source = source
+        self._percentiles = percentiles
+        self._schema_ids = {}  # Method name -> schema id.
+        self._sequence_id = 0
+
+    def _variables(self, method_summary):
+        variables = [
+            data_buffer_protos.SignalSchema.Variable(
+                name='count', type=data_buffer_protos.SignalSchema.Variable.TYPE_UINT64),
+            data_buffer_protos.SignalSchema.Variable(
+                name='errors', type=data_buffer_protos.SignalSchema.Variable.TYPE_UINT64)
+        ]
+        for histogram in self._HISTOGRAMS:
+            variables.extend(
+                data_buffer_protos.SignalSchema.Variable(
+                    name='{}_{}'.format(histogram, key),
+                    type=data_buffer_protos.SignalSchema.Variable.TYPE_FLOAT64)
+                for key in method_summary[histogram])
+        return variables
+
+    def _encode(self, method_summary):
+        values = []
+        for histogram in self._HISTOGRAMS:
+            values.extend(method_summary[histogram].values())
+        return struct.pack('<QQ{}d'.format(len(values)), method_summary['count'],
+                           sum(method_summary['errors'].values()),
+                           *[float('nan') if value is None else value for value in values])
+
+    def export(self, **kwargs):
+        """Add a signal tick with the current stats of each rpc method to the data buffer.
+
+        Raises:
+            RpcError: Problem communicating with the robot.
+        """
+        for method, method_summary in sorted(self._sink.summary(self._percentiles).items()):
+            schema_id = self._schema_ids.get(method)
+            if schema_id is None:
+                schema_id = self._client.register_signal_schema(
+                    self._variables(method_summary), self.SCHEMA_PREFIX + method, **kwargs)
+                self._schema_ids[method] = schema_id
+            self._client.add_signal_tick(self._encode(method_summary), schema_id,
+                                         sequence_id=self._sequence_id, source=self._source,
+                                         **kwargs)
+        self._sequence_id += 1
@@ -9,57 +9,19 @@ from __future__ import absolute_import
 
 import datetime
 import glob
+import importlib
+import importlib.resources
 import logging
 import os
 import platform
 from enum import Enum
 
-import jwt
-import pkg_resources
 from deprecated.sphinx import deprecated
 
-from .arm_surface_contact import ArmSurfaceContactClient
-from .auth import AuthClient
-from .auto_return import AutoReturnClient
-from .autowalk import AutowalkClient
 from .channel import DEFAULT_MAX_MESSAGE_LENGTH
-from .data_acquisition import DataAcquisitionClient
-from .data_acquisition_store import DataAcquisitionStoreClient
-from .data_buffer import DataBufferClient
-from .data_service import DataServiceClient
-from .directory import DirectoryClient
-from .directory_registration import DirectoryRegistrationClient
-from .docking import DockingClient
-from .door import DoorClient
-from .estop import EstopClient
 from .exceptions import Error
-from .fault import FaultClient
-from .graph_nav import GraphNavClient
-from .gripper_camera_param import GripperCameraParamClient
-from .image import ImageClient
-from .ir_enable_disable import IREnableDisableServiceClient
-from .lease import LeaseClient
-from .license import LicenseClient
-from .local_grid import LocalGridClient
-from .log_annotation import LogAnnotationClient
-from .manipulation_api_client import ManipulationApiClient
-from .map_processing import MapProcessingServiceClient
-from .network_compute_bridge_client import NetworkComputeBridgeClient
-from .payload import PayloadClient
-from .payload_registration import PayloadRegistrationClient
-from .point_cloud import PointCloudClient
-from .power import PowerClient
 from .processors import AddRequestHeader
-from .ray_cast import RayCastClient
-from .recording import GraphNavRecordingServiceClient
 from .robot import Robot
-from .robot_command import RobotCommandClient
-from .robot_id import RobotIdClient
-from .robot_state import RobotStateClient
-from .spot_check import SpotCheckClient
-from .time_sync import TimeSyncClient
-from .world_object import WorldObjectClient
-
 
 
 class SdkError(Error):
@@ -80,6 +42,13 @@ BOSDYN_RESOURCE_ROOT = os.environ.get('BOSDYN_RESOURCE_ROOT',
                                       os.path.join(os.path.expanduser('~'), '.bosdyn'))
 
 
+def _read_resource(filename):
+    """Return the contents of a file in the bosdyn.client.resources package."""
+    if hasattr(importlib.resources, 'files'):
+        return importlib.resources.files('bosdyn.client.resources').joinpath(filename).read_bytes()
+    return importlib.resources.read_binary('bosdyn.client.resources', filename)
+
+
 def generate_client_name(prefix=''):
     """Returns a descriptive client name for API clients with an optional prefix."""
     import __main__
@@ -100,44 +69,75 @@ def generate_client_name(prefix=''):
     return '{}{}:{}'.format(prefix, machine_name or user_name, process_info)
 
 
+class _LazyClientFactory(object):
+    """Creates service clients of a class, importing its module on first use."""
+
+    def __init__(self, module_name, class_name):
+        self.module_name = module_name
+        self.class_name = class_name
+
+    def __call__(self):
+        module = importlib.import_module(self.module_name, __package__)
+        return getattr(module, self.class_name)()
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(self.__class__.__name__, self.module_name, self.class_name)
+
+
+# Service clients registered by create_standard_sdk(), as
+# (service name, service type, client module, client class name).  Client modules, and the
+# protobuf modules they use, are only imported when the first client of a service is created.
 _DEFAULT_SERVICE_CLIENTS = [
-    ArmSurfaceContactClient,
-    AuthClient,
-    AutoReturnClient,
-    AutowalkClient,
-    DataAcquisitionClient,
-    DataAcquisitionStoreClient,
-    DataBufferClient,
-    DataServiceClient,
-    DirectoryClient,
-    DirectoryRegistrationClient,
-    DockingClient,
-    DoorClient,
-    EstopClient,
-    FaultClient,
-    GraphNavClient,
-    GraphNavRecordingServiceClient,
-    GripperCameraParamClient,
-    ImageClient,
-    IREnableDisableServiceClient,
-    LeaseClient,
-    LicenseClient,
-    LogAnnotationClient,
-    LocalGridClient,
-    ManipulationApiClient,
-    MapProcessingServiceClient,
-    NetworkComputeBridgeClient,
-    PayloadClient,
-    PayloadRegistrationClient,
-    PointCloudClient,
-    PowerClient,
-    RayCastClient,
-    RobotCommandClient,
-    RobotIdClient,
-    RobotStateClient,
-    SpotCheckClient,
-    TimeSyncClient,
-    WorldObjectClient,
+    ('arm-surface-contact', 'bosdyn.api.ArmSurfaceContactService', '.arm_surface_contact',
+     'ArmSurfaceContactClient'),
+    ('auth', 'bosdyn.api.AuthService', '.auth', 'AuthClient'),
+    ('auto-return', 'bosdyn.api.auto_return.AutoReturnService', '.auto_return',
+     'AutoReturnClient'),
+    ('autowalk-service', 'bosdyn.api.autowalk.AutowalkService', '.autowalk', 'AutowalkClient'),
+    ('data-acquisition', 'bosdyn.api.DataAcquisitionService', '.data_acquisition',
+     'DataAcquisitionClient'),
+    ('data-acquisition-store', 'bosdyn.api.DataAcquisitionStoreService',
+     '.data_acquisition_store', 'DataAcquisitionStoreClient'),
+    ('data-buffer', 'bosdyn.api.DataBufferService', '.data_buffer', 'DataBufferClient'),
+    ('data', 'bosdyn.api.DataService', '.data_service', 'DataServiceClient'),
+    ('directory', 'bosdyn.api.DirectoryService', '.directory', 'DirectoryClient'),
+    ('directory-registration', 'bosdyn.api.DirectoryRegistrationService',
+     '.directory_registration', 'DirectoryRegistrationClient'),
+    ('docking', 'bosdyn.api.docking.DockingService', '.docking', 'DockingClient'),
+    ('door', 'bosdyn.api.spot.DoorService', '.door', 'DoorClient'),
+    ('estop', 'bosdyn.api.EstopService', '.estop', 'EstopClient'),
+    ('fault', 'bosdyn.api.FaultService', '.fault', 'FaultClient'),
+    ('graph-nav-service', 'bosdyn.api.graph_nav.GraphNavService', '.graph_nav', 'GraphNavClient'),
+    ('recording-service', 'bosdyn.api.graph_nav.GraphNavRecordingService', '.recording',
+     'GraphNavRecordingServiceClient'),
+    ('gripper-camera-param', 'bosdyn.api.GripperCameraParamService', '.gripper_camera_param',
+     'GripperCameraParamClient'),
+    ('image', 'bosdyn.api.ImageService', '.image', 'ImageClient'),
+    ('ir-enable-disable-service', 'bosdyn.api.IREnableDisableService', '.ir_enable_disable',
+     'IREnableDisableServiceClient'),
+    ('lease', 'bosdyn.api.LeaseService', '.lease', 'LeaseClient'),
+    ('license', 'bosdyn.api.LicenseService', '.license', 'LicenseClient'),
+    ('log-annotation', 'bosdyn.api.LogAnnotationService', '.log_annotation',
+     'LogAnnotationClient'),
+    ('local-grid-service', 'bosdyn.api.LocalGridService', '.local_grid', 'LocalGridClient'),
+    ('manipulation', 'bosdyn.api.ManipulationApiService', '.manipulation_api_client',
+     'ManipulationApiClient'),
+    ('map-processing-service', 'bosdyn.api.graph_nav.MapProcessingService', '.map_processing',
+     'MapProcessingServiceClient'),
+    ('network-compute-bridge', 'bosdyn.api.NetworkComputeBridge',
+     '.network_compute_bridge_client', 'NetworkComputeBridgeClient'),
+    ('payload', 'bosdyn.api.PayloadService', '.payload', 'PayloadClient'),
+    ('payload-registration', 'bosdyn.api.PayloadRegistrationService', '.payload_registration',
+     'PayloadRegistrationClient'),
+    ('point-cloud', 'bosdyn.api.PointCloudService', '.point_cloud', 'PointCloudClient'),
+    ('power', 'bosdyn.api.PowerService', '.power', 'PowerClient'),
+    ('ray-cast', 'bosdyn.api.RayCastService', '.ray_cast', 'RayCastClient'),
+    ('robot-command', 'bosdyn.api.RobotCommandService', '.robot_command', 'RobotCommandClient'),
+    ('robot-id', 'bosdyn.api.RobotIdService', '.robot_id', 'RobotIdClient'),
+    ('robot-state', 'bosdyn.api.RobotStateService', '.robot_state', 'RobotStateClient'),
+    ('spot-check', 'bosdyn.api.spot.SpotCheckService', '.spot_check', 'SpotCheckClient'),
+    ('time-sync', 'bosdyn.api.TimeSyncService', '.time_sync', 'TimeSyncClient'),
+    ('world-objects', 'bosdyn.api.WorldObjectService', '.world_object', 'WorldObjectClient'),
 ]
 
 
@@ -159,10 +159,10 @@ def create_standard_sdk(client_name_prefix, service_clients=None, cert_resource_
     sdk.load_robot_cert(cert_resource_glob)
     sdk.request_processors.append(AddRequestHeader(lambda: client_name))
 
-    all_service_clients = _DEFAULT_SERVICE_CLIENTS
-    if service_clients:
-        all_service_clients += service_clients
-    for client in all_service_clients:
+    for service_name, service_type, module_name, class_name in _DEFAULT_SERVICE_CLIENTS:
+        sdk.register_service_client(_LazyClientFactory(module_name, class_name), service_type,
+                                    service_name)
+    for client in service_clients or []:
         sdk.register_service_client(client)
     return sdk
 
@@ -183,6 +183,12 @@ class Sdk(object):
         self.logger = logging.getLogger(name or 'bosdyn.Sdk')
         self.request_processors = []
         self.response_processors = []
+        # RpcStatsSinks for all clients, see bosdyn.client.rpc_stats.
+        self.rpc_stats_sinks = []
+        # AdaptiveTimeouts for all clients, see bosdyn.client.rpc_stats.
+        self.adaptive_timeouts = None
+        # ResponseCache for all clients, see bosdyn.client.response_cache.
+        self.response_cache = None
         self.service_client_factories_by_type = {}
         self.service_type_by_name = {}
         # Robots created by this Sdk, keyed by address.
@@ -270,7 +276,7 @@ class Sdk(object):
         """
         self.cert = None
         if resource_path_glob is None:
-            self.cert = pkg_resources.resource_stream('bosdyn.client.resources', 'robot.pem').read()
+            self.cert = _read_resource('robot.pem')
         else:
             cert_paths = [c for c in glob.glob(resource_path_glob) if os.path.isfile(c)]
             if not cert_paths:
@@ -315,6 +321,7 @@ def decode_token(token):
     Raises:
         UnableToLoadAppTokenError: If the token cannot be read.
     """
+    import jwt
     try:
         values = jwt.decode(token, options={"verify_signature": False})
         return values
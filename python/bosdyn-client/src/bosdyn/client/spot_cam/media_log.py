@@ -109,6 +109,20 @@ class MediaLogClient(BaseClient):
         return self.call(self._stub.Retrieve, request, self._retrieve_from_response,
                          self._media_log_error_from_response, copy_request=False, **kwargs)
 
+    def retrieve_async(self, logpoint, progress_cb=None, **kwargs):
+        """Async version of retrieve().
+
+        The streamed data is reassembled as it arrives, and progress_cb, if given, is called with
+        (bytes received, total bytes) after each chunk.  Cancelling the returned future cancels
+        the retrieval.
+        """
+        request = logging_pb2.RetrieveRequest(point=logpoint)
+        return self.call_async_streaming(self._stub.Retrieve, request,
+                                         self._retrieve_from_data,
+                                         self._media_log_error_from_response,
+                                         chunk_from_response=self._chunk_from_response,
+                                         progress_cb=progress_cb, copy_request=False, **kwargs)
+
     def retrieve_raw_data(self, logpoint, **kwargs):
         """Retrieves the image associated with the Logpoint.
 
@@ -118,6 +132,15 @@ class MediaLogClient(BaseClient):
         return self.call(self._stub.RetrieveRawData, request, self._retrieve_from_response,
                          self._media_log_error_from_response, copy_request=False, **kwargs)
 
+    def retrieve_raw_data_async(self, logpoint, progress_cb=None, **kwargs):
+        """Async version of retrieve_raw_data().  See retrieve_async()."""
+        request = logging_pb2.RetrieveRawDataRequest(point=logpoint)
+        return self.call_async_streaming(self._stub.RetrieveRawData, request,
+                                         self._retrieve_from_data,
+                                         self._media_log_error_from_response,
+                                         chunk_from_response=self._chunk_from_response,
+                                         progress_cb=progress_cb, copy_request=False, **kwargs)
+
     @deprecated(reason='Spot CAM encryption has been removed as a result of the switch to NTFS.',
                 version='3.0.0', action="always")
     def set_passphrase(self, passphrase, **kwargs):
@@ -210,6 +233,15 @@ class MediaLogClient(BaseClient):
             local_chunks.append(chunk)
         return logpoint, b''.join(chunk.data for chunk in local_chunks)
 
+    @staticmethod
+    def _chunk_from_response(response):
+        return response.data
+
+    @staticmethod
+    def _retrieve_from_data(response, data):
+        logpoint = response.logpoint if response is not None else None
+        return logpoint, bytes(data)
+
     @staticmethod
     def _set_passphrase_from_response(response):
         pass
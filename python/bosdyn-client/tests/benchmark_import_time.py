@@ -0,0 +1,48 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark of the startup time of "import bosdyn.client" and create_standard_sdk()."""
+
+import os
+import statistics
+import subprocess
+import sys
+
+# Run in a fresh interpreter, so that no module is already imported.
+_CODE = ('import time\n'
+         'start = time.perf_counter()\n'
+         'import bosdyn.client\n'
+         'imported = time.perf_counter()\n'
+         'bosdyn.client.create_standard_sdk("benchmark")\n'
+         'print(imported - start, time.perf_counter() - imported)\n')
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='Number of fresh interpreters to take the median of.')
+    options = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    import_times = []
+    sdk_times = []
+    for _ in range(options.repeat):
+        output = subprocess.check_output([sys.executable, '-c', _CODE], env=env)
+        import_time, sdk_time = (float(value) for value in output.split())
+        import_times.append(import_time)
+        sdk_times.append(sdk_time)
+    total_times = [a + b for a, b in zip(import_times, sdk_times)]
+    for name, times in (('import bosdyn.client', import_times),
+                        ('create_standard_sdk()', sdk_times), ('total', total_times)):
+        print('{:24s} {:8.1f} ms median of {} runs'.format(name, 1e3 * statistics.median(times),
+                                                           len(times)))
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,61 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Microbenchmarks of the scalar pose math in bosdyn.client.math_helpers."""
+
+import sys
+import timeit
+
+import numpy
+
+from bosdyn.client.math_helpers import Quat, SE2Pose, SE3Pose
+
+
+def _benchmarks():
+    """Returns a list of (name, function) for each operation to time."""
+    a_pose = SE3Pose(1.0, 2.0, 3.0, Quat(0.9, 0.1, 0.3, 0.3).normalize())
+    b_pose = SE3Pose(-0.5, 0.2, 0.1, Quat(0.5, 0.5, -0.5, 0.5))
+    out_pose = SE3Pose.from_identity()
+    a_se2 = SE2Pose(1.0, 2.0, 0.5)
+    b_se2 = SE2Pose(-0.5, 0.2, 1.5)
+    out_se2 = SE2Pose(0.0, 0.0, 0.0)
+    cloud = numpy.random.RandomState(0).uniform(-5.0, 5.0, size=(1000, 3))
+
+    return [
+        ('SE3Pose.mult', lambda: a_pose.mult(b_pose)),
+        ('SE3Pose.mult_into', lambda: a_pose.mult_into(b_pose, out_pose)),
+        ('SE3Pose.inverse', lambda: a_pose.inverse()),
+        ('SE3Pose.inverse_inplace', lambda: out_pose.inverse_inplace()),
+        ('SE3Pose.transform_point', lambda: a_pose.transform_point(1.0, 2.0, 3.0)),
+        ('SE3Pose.to_matrix', lambda: a_pose.to_matrix()),
+        ('SE3Pose.transform_cloud (1000 points)', lambda: a_pose.transform_cloud(cloud)),
+        ('Quat.mult', lambda: a_pose.rot.mult(b_pose.rot)),
+        ('Quat.mult_into', lambda: a_pose.rot.mult_into(b_pose.rot, out_pose.rot)),
+        ('Quat.to_matrix', lambda: a_pose.rot.to_matrix()),
+        ('SE2Pose.mult', lambda: a_se2.mult(b_se2)),
+        ('SE2Pose.mult_into', lambda: a_se2.mult_into(b_se2, out_se2)),
+        ('SE2Pose.inverse', lambda: a_se2.inverse()),
+    ]
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=100000,
+                        help='Number of calls of each operation per repeat.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of repeats to take the best of.')
+    options = parser.parse_args()
+
+    for name, function in _benchmarks():
+        best = min(timeit.repeat(function, number=options.number, repeat=options.repeat))
+        print('{:40s} {:8.3f} us'.format(name, 1e6 * best / options.number))
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,86 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Microbenchmarks of copying versus copy-free (restore_request_fields) request processing."""
+
+import sys
+import time
+
+import grpc
+
+from bosdyn.api import data_acquisition_store_pb2
+from bosdyn.api.graph_nav import graph_nav_pb2, map_pb2
+from bosdyn.client.common import BaseClient
+from bosdyn.client.processors import AddRequestHeader
+
+
+class _NullUnaryRpc(object):
+    _method = 'MockStub.Store'
+
+    def __call__(self, request, **kwargs):
+        request.SerializeToString()
+
+
+class _NullStreamRpc(grpc.StreamUnaryMultiCallable):
+    _method = 'MockStub.UploadWaypointSnapshot'
+
+    def __call__(self, request_iterator, **kwargs):
+        for request in request_iterator:
+            request.SerializeToString()
+
+    def with_call(self, request_iterator, **kwargs):
+        raise NotImplementedError
+
+    def future(self, request_iterator, **kwargs):
+        raise NotImplementedError
+
+
+def _make_client(restore_request_fields):
+    client = BaseClient(lambda channel: None)
+    client.channel = 'benchmark'
+    client.request_processors.append(AddRequestHeader(lambda: 'benchmark'))
+    client.restore_request_fields = restore_request_fields
+    return client
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--megabytes', type=int, default=8, help='Payload size of the requests.')
+    parser.add_argument('--number', type=int, default=10, help='Number of calls of each kind.')
+    options = parser.parse_args()
+
+    nbytes = options.megabytes * 1024 * 1024
+    image_request = data_acquisition_store_pb2.StoreImageRequest()
+    image_request.image.image.data = bytes(nbytes)
+    snapshot = map_pb2.WaypointSnapshot(id='snapshot')
+    snapshot.images.add().shot.image.data = bytes(nbytes)
+    snapshot_requests = [
+        graph_nav_pb2.UploadWaypointSnapshotRequest(chunk=chunk)
+        for chunk in BaseClient.chunk_message(snapshot, 1024 * 1024)
+    ]
+    traffic = [
+        ('image', _NullUnaryRpc(), lambda: image_request),
+        ('snapshot', _NullStreamRpc(), lambda: iter(snapshot_requests)),
+    ]
+    copying_client = _make_client(restore_request_fields=False)
+    copy_free_client = _make_client(restore_request_fields=True)
+
+    for name, rpc, make_request in traffic:
+        times = []
+        for client in (copying_client, copy_free_client):
+            start = time.perf_counter()
+            for _ in range(options.number):
+                client.call(rpc, make_request())
+            times.append((time.perf_counter() - start) / options.number)
+        print('{} traffic: copying {:.3f} ms, copy-free {:.3f} ms per call'.format(
+            name, times[0] * 1e3, times[1] * 1e3))
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -9,6 +9,7 @@
 import concurrent
 
 import grpc
+import grpc.aio
 
 import bosdyn.api.header_pb2 as HeaderProto
 
@@ -29,13 +30,28 @@ def setup_client_and_service(client, service, service_adder):
         add_FooServiceServicer_to_server. Unfortunately, there's not an easy
         way to get to that method from the Service class.
     """
+    server, port = _start_server(service, service_adder)
+    channel = grpc.insecure_channel('localhost:{}'.format(port))
+    client.channel = channel
+    return server
+
+
+def setup_aio_client_and_service(client, service, service_adder):
+    """As setup_client_and_service, but the client gets a grpc.aio channel.
+
+    Must be called from a coroutine, since the channel is bound to the running event loop.
+    """
+    server, port = _start_server(service, service_adder)
+    client.channel = grpc.aio.insecure_channel('localhost:{}'.format(port))
+    return server
+
+
+def _start_server(service, service_adder):
     server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=10))
     service_adder(service, server)
     port = server.add_insecure_port('localhost:0')
     server.start()
-    channel = grpc.insecure_channel('localhost:{}'.format(port))
-    client.channel = channel
-    return server
+    return server, port
 
 
 def add_common_header(response, request, error_code=HeaderProto.CommonError.CODE_OK,
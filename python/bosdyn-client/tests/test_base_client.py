@@ -4,9 +4,15 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import logging
 from functools import partial
 
-from bosdyn.client.common import BaseClient
+import grpc
+
+from bosdyn.api import data_acquisition_store_pb2, data_chunk_pb2, image_pb2
+from bosdyn.api.graph_nav import graph_nav_pb2, map_pb2
+from bosdyn.client.common import BaseClient, DataChunkAssembler, trim_large_bytes_fields
+from bosdyn.client.processors import AddRequestHeader
 
 
 def method_wrapper(func):
@@ -91,3 +97,214 @@ def test_base_client():
     response = client.call_async(client._stub.rpc_method, None,
                                  value_from_response=value_from_response, **kwargs)
     assert isinstance(response.result(), Response)
+
+
+def test_trim_large_bytes_fields():
+    small = image_pb2.GetImageResponse()
+    small.image_responses.add().shot.image.data = b'12345'
+    assert trim_large_bytes_fields(small) is small
+    assert trim_large_bytes_fields(None) is None
+
+    large = image_pb2.GetImageResponse()
+    large.image_responses.add().shot.image.data = b'12345'
+    large.image_responses.add().shot.image.data = bytes(5000)
+    trimmed = trim_large_bytes_fields(large)
+    assert trimmed is not large
+    assert trimmed.image_responses[0].shot.image.data == b'12345'
+    assert trimmed.image_responses[1].shot.image.data == b'<5000 bytes>'
+    # The original message is unchanged.
+    assert len(large.image_responses[1].shot.image.data) == 5000
+    assert trim_large_bytes_fields(large, max_size=10000) is large
+
+    chunk = data_chunk_pb2.DataChunk(total_size=5000, data=bytes(5000))
+    assert 'bytes>' in BaseClient.request_trim_for_log(chunk)
+
+
+def test_lazy_logging():
+    formatted = []
+
+    def _trim(message):
+        formatted.append(message)
+        return 'formatted'
+
+    client = BaseClient(stub_creation_func)
+    client.channel = "test"
+    client.request_trim_for_log = _trim
+    client.response_trim_for_log = _trim
+    logger = client._get_logger(client._stub.rpc_method)
+    level = logger.level
+    try:
+        logger.setLevel(logging.INFO)
+        client.call(client._stub.rpc_method, None)
+        client.call_async(client._stub.rpc_method, None).result()
+        assert not formatted
+
+        logger.setLevel(logging.DEBUG)
+        client.call(client._stub.rpc_method, None)
+        assert formatted
+    finally:
+        logger.setLevel(level)
+
+
+class _UndeclaredProcessor(object):
+    """Request processor which does not declare the fields it mutates."""
+
+    def mutate(self, request):
+        pass
+
+
+class _RecordingUnaryRpc(object):
+    """Unary rpc which records the requests it is called with and their serialized bytes."""
+    _method = 'MockStub.Store'
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request, **kwargs):
+        self.requests.append((request, request.SerializeToString()))
+        return data_acquisition_store_pb2.StoreImageResponse()
+
+    def future(self, request, **kwargs):
+        self(request)
+        return Response()
+
+
+class _RecordingStreamRpc(grpc.StreamUnaryMultiCallable):
+    _method = 'MockStub.UploadWaypointSnapshot'
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request_iterator, **kwargs):
+        for request in request_iterator:
+            self.requests.append((request, request.SerializeToString()))
+        return graph_nav_pb2.UploadWaypointSnapshotResponse()
+
+    def with_call(self, request_iterator, **kwargs):
+        raise NotImplementedError
+
+    def future(self, request_iterator, **kwargs):
+        raise NotImplementedError
+
+
+def _make_client(*processors):
+    client = BaseClient(stub_creation_func)
+    client.channel = "test"
+    client.request_processors.extend(processors)
+    return client
+
+
+def _make_image_request(nbytes):
+    request = data_acquisition_store_pb2.StoreImageRequest()
+    request.image.image.data = bytes(nbytes)
+    request.data_id.action_id.action_name = 'action'
+    return request
+
+
+def _make_snapshot_requests(nbytes):
+    snapshot = map_pb2.WaypointSnapshot(id='snapshot')
+    snapshot.images.add().shot.image.data = bytes(nbytes)
+    return [
+        graph_nav_pb2.UploadWaypointSnapshotRequest(chunk=chunk)
+        for chunk in BaseClient.chunk_message(snapshot, 1024 * 1024)
+    ]
+
+
+def test_request_processing_copies_by_default():
+    client = _make_client(AddRequestHeader(lambda: 'test-client'))
+    rpc = _RecordingUnaryRpc()
+    request = _make_image_request(100)
+    client.call(rpc, request)
+    client.call_async(rpc, request)
+    for sent, _serialized in rpc.requests:
+        assert sent is not request
+        assert sent.header.client_name == 'test-client'
+    assert not request.HasField('header')
+
+
+def test_copy_free_request_processing():
+    client = _make_client(AddRequestHeader(lambda: 'test-client'))
+    client.restore_request_fields = True
+    rpc = _RecordingUnaryRpc()
+    request = _make_image_request(100)
+
+    client.call(rpc, request)
+    client.call_async(rpc, request)
+    for sent, serialized in rpc.requests:
+        # The request is not copied, but its header was set when it was serialized.
+        assert sent is request
+        sent_request = data_acquisition_store_pb2.StoreImageRequest.FromString(serialized)
+        assert sent_request.header.client_name == 'test-client'
+        assert sent_request.image == request.image
+    # The caller's request is unchanged.
+    assert not request.HasField('header')
+
+    # Without copy_request, the header stays in the caller's request.
+    client.call(rpc, request, copy_request=False)
+    assert request.header.client_name == 'test-client'
+
+    # Streamed requests are not copied either.
+    requests = _make_snapshot_requests(3 * 1024 * 1024)
+    stream_rpc = _RecordingStreamRpc()
+    client.call(stream_rpc, iter(requests))
+    assert len(stream_rpc.requests) == len(requests) == 4
+    for (sent, serialized), request in zip(stream_rpc.requests, requests):
+        assert sent is request
+        assert not request.HasField('header')
+        sent_request = graph_nav_pb2.UploadWaypointSnapshotRequest.FromString(serialized)
+        assert sent_request.header.client_name == 'test-client'
+
+
+def test_undeclared_processor_copies_request():
+    client = _make_client(AddRequestHeader(lambda: 'test-client'), _UndeclaredProcessor())
+    client.restore_request_fields = True
+    rpc = _RecordingUnaryRpc()
+    request = _make_image_request(100)
+    client.call(rpc, request)
+    sent, _serialized = rpc.requests[0]
+    assert sent is not request
+    assert sent.header.client_name == 'test-client'
+    assert not request.HasField('header')
+
+
+def test_request_processing_leaves_large_requests_unchanged():
+    nbytes = 2 * 1024 * 1024
+    for processors, restore_request_fields in (
+        ([AddRequestHeader(lambda: 'test-client')], False),
+        ([AddRequestHeader(lambda: 'test-client')], True),
+        ([AddRequestHeader(lambda: 'test-client'), _UndeclaredProcessor()], True)):
+        client = _make_client(*processors)
+        client.restore_request_fields = restore_request_fields
+        image_request = _make_image_request(nbytes)
+        expected_image_request = _make_image_request(nbytes)
+        client.call(_RecordingUnaryRpc(), image_request)
+        assert image_request == expected_image_request
+
+        snapshot_requests = _make_snapshot_requests(nbytes)
+        client.call(_RecordingStreamRpc(), iter(snapshot_requests))
+        assert snapshot_requests == _make_snapshot_requests(nbytes)
+
+
+def test_data_chunk_assembler():
+    snapshot = map_pb2.WaypointSnapshot(id='snapshot')
+    snapshot.images.add().shot.image.data = bytes(range(256)) * 10
+    serialized = snapshot.SerializeToString()
+    assembler = DataChunkAssembler()
+    assert assembler.data == b''
+    for chunk in BaseClient.chunk_message(snapshot, 1000):
+        assembler.add(chunk)
+        assert assembler.total_size == len(serialized)
+    assert assembler.num_bytes == len(serialized)
+    assert assembler.data == serialized
+    assert map_pb2.WaypointSnapshot.FromString(assembler.data) == snapshot
+
+    # Incomplete or oversized streams.
+    assembler = DataChunkAssembler()
+    assembler.add(data_chunk_pb2.DataChunk(total_size=10, data=b'abc'))
+    assert assembler.data == b'abc'
+    assembler.add(data_chunk_pb2.DataChunk(total_size=10, data=b'0123456789'))
+    assert assembler.data == b'abc0123456789'
+    assembler = DataChunkAssembler()
+    assembler.add(data_chunk_pb2.DataChunk(data=b'abc'))
+    assert assembler.total_size is None
+    assert assembler.data == b'abc'
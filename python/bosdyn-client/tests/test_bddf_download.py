@@ -0,0 +1,111 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Tests for streaming bddf downloads."""
+import io
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import bosdyn.api.bddf_pb2 as bddf
+import bosdyn.client.bddf_download
+from bosdyn.api.data_buffer_pb2 import OperatorComment
+from bosdyn.bddf import DataWriter, PodSeriesWriter, ProtobufSeriesWriter
+from bosdyn.client.bddf_download import stream_data
+
+
+class _FakeResponse(io.BytesIO):
+    """Http response which returns the body in small pieces."""
+
+    def __init__(self, body, status=200):
+        super(_FakeResponse, self).__init__(body)
+        self.status = status
+        self.headers = {'Content-Disposition': ''}
+
+    def read(self, nbytes=-1):
+        return super(_FakeResponse, self).read(min(nbytes, 7) if nbytes > 0 else nbytes)
+
+
+def _make_log():
+    outfile = io.BytesIO()
+    outfile.close = lambda: None
+    with DataWriter(outfile) as data_writer:
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'bosdyn:channel': 'pod'},
+                                     bddf.TYPE_FLOAT32, dimensions=[2])
+        for idx in range(5):
+            comment_writer.write(1000 + idx, OperatorComment(message=str(idx)))
+        pod_writer.write_many([1000, 1001, 1002], np.ones((3, 2)))
+    return outfile.getvalue()
+
+
+def _stream(urlopen, **kwargs):
+    robot = mock.Mock(user_token='token')
+    with mock.patch.object(bosdyn.client.bddf_download, 'urlopen', urlopen):
+        return list(stream_data(robot, 'hostname', start_nsec=1, end_nsec=2, robot_time=True,
+                                **kwargs))
+
+
+def test_stream_data():
+    body = _make_log()
+    urlopen = mock.Mock(side_effect=lambda *args, **kwargs: _FakeResponse(body))
+    filename = os.path.join(tempfile.gettempdir(), 'test_stream.bddf')
+
+    blocks = _stream(urlopen, protobuf_classes=[OperatorComment], output_filename=filename)
+    assert len(blocks) == 6
+    for idx, (timestamp, series_descriptor, msg) in enumerate(blocks[:5]):
+        assert timestamp == 1000 + idx
+        assert series_descriptor.message_type.type_name == OperatorComment.DESCRIPTOR.full_name
+        assert msg == OperatorComment(message=str(idx))
+    assert np.array_equal(blocks[5][2], np.ones((3, 2)))
+    with open(filename, 'rb') as infile:
+        assert infile.read() == body
+
+    # Without the protobuf class, messages are bytes.
+    blocks = _stream(urlopen, channels=[OperatorComment.DESCRIPTOR.full_name])
+    assert [msg for _ts, _desc, msg in blocks
+           ] == [OperatorComment(message=str(idx)).SerializeToString() for idx in range(5)]
+    assert not _stream(urlopen, message_types=['other.Type'])
+    assert len(_stream(urlopen, channels=['pod'])) == 1
+
+    # A truncated response is an error.
+    urlopen = mock.Mock(side_effect=lambda *args, **kwargs: _FakeResponse(body[:-30]))
+    with pytest.raises(EOFError):
+        _stream(urlopen)
+
+    os.unlink(filename)
+
+
+def test_stream_data_resume():
+    body = _make_log()
+    filename = os.path.join(tempfile.gettempdir(), 'test_stream_resume.bddf')
+    with open(filename, 'wb') as outfile:
+        outfile.write(body[:100])
+    requests = []
+
+    def _urlopen(request, **_kwargs):
+        requests.append(request)
+        return _FakeResponse(body[100:], status=206)
+
+    blocks = _stream(_urlopen, output_filename=filename, resume=True)
+    assert requests[0].get_header('Range') == 'bytes=100-'
+    assert len(blocks) == 6
+    with open(filename, 'rb') as infile:
+        assert infile.read() == body
+
+    # If the server ignores the range, the download starts over.
+    with open(filename, 'wb') as outfile:
+        outfile.write(body[:100])
+    blocks = _stream(lambda request, **_kwargs: _FakeResponse(body), output_filename=filename,
+                     resume=True)
+    assert len(blocks) == 6
+    with open(filename, 'rb') as infile:
+        assert infile.read() == body
+
+    os.unlink(filename)
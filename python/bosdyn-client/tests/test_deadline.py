@@ -0,0 +1,99 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the deadline module."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import bosdyn.api.robot_id_pb2 as robot_id_protos
+import bosdyn.api.robot_id_service_pb2_grpc as robot_id_service
+from bosdyn.client.deadline import Deadline, current_deadline, limit_timeout
+from bosdyn.client.exceptions import TimedOutError
+from bosdyn.client.robot_id import RobotIdClient
+
+from . import helpers
+
+
+class MockRobotIdServicer(robot_id_service.RobotIdServiceServicer):
+
+    def __init__(self, rpc_delay):
+        super(MockRobotIdServicer, self).__init__()
+        self.rpc_delay = rpc_delay
+
+    def GetRobotId(self, request, context):
+        time.sleep(self.rpc_delay)
+        resp = robot_id_protos.RobotIdResponse()
+        helpers.add_common_header(resp, request)
+        return resp
+
+
+def test_deadline():
+    assert current_deadline() is None
+    assert limit_timeout(5) == 5
+    assert limit_timeout(None) is None
+    with Deadline(10) as outer:
+        assert current_deadline() is outer
+        assert 9 < outer.remaining <= 10
+        assert not outer.expired
+        assert limit_timeout(5) == 5
+        assert 9 < limit_timeout(None) <= 10
+        assert 9 < limit_timeout(20) <= 10
+        # Nested deadlines can only be earlier.
+        with Deadline(20):
+            assert current_deadline() is outer
+        with Deadline(1) as inner:
+            assert current_deadline() is inner
+            assert limit_timeout(5) <= 1
+
+            deadlines = []
+            thread = threading.Thread(target=lambda: deadlines.append(current_deadline()))
+            thread.start()
+            thread.join()
+            assert deadlines == [None]
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+    with Deadline(-1) as expired:
+        assert expired.expired
+        assert limit_timeout(5) == 0
+
+
+def test_client_deadline():
+    client = RobotIdClient()
+    server = helpers.setup_client_and_service(client, MockRobotIdServicer(rpc_delay=0.5),
+                                              robot_id_service.add_RobotIdServiceServicer_to_server)
+    start = time.time()
+    with Deadline(0.1):
+        with pytest.raises(TimedOutError):
+            client.get_id(timeout=10)
+        with pytest.raises(TimedOutError):
+            client.get_id_async().result()
+        # Calls fail immediately once the deadline has passed.
+        call_start = time.time()
+        with pytest.raises(TimedOutError):
+            client.get_id(timeout=None)
+        assert time.time() - call_start < 0.1
+    assert time.time() - start < 0.5
+    client.get_id()
+    server.stop(0)
+
+
+def test_aio_client_deadline():
+
+    async def _get_id():
+        client = RobotIdClient()
+        server = helpers.setup_aio_client_and_service(
+            client, MockRobotIdServicer(rpc_delay=0.5),
+            robot_id_service.add_RobotIdServiceServicer_to_server)
+        with Deadline(0.1):
+            with pytest.raises(TimedOutError):
+                await client.get_id()
+        server.stop(0)
+
+    asyncio.run(_get_id())
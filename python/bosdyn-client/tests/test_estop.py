@@ -4,11 +4,13 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import asyncio
 import concurrent.futures
 import logging
 import time
 
 import grpc
+import grpc.aio
 import pytest
 
 import bosdyn.api.estop_pb2
@@ -29,10 +31,19 @@ class MockEstopServicer(bosdyn.api.estop_service_pb2_grpc.EstopServiceServicer):
         super(MockEstopServicer, self).__init__()
         self._rpc_delay = rpc_delay
         self._challenge = 0
+        self.deregister_requests = []
 
     def RegisterEstopEndpoint(self, request, context):
         """Create mock."""
 
+    def DeregisterEstopEndpoint(self, request, context):
+        """Record the request and report success."""
+        self.deregister_requests.append(request)
+        resp = bosdyn.api.estop_pb2.DeregisterEstopEndpointResponse(
+            status=bosdyn.api.estop_pb2.DeregisterEstopEndpointResponse.STATUS_SUCCESS)
+        resp.header.error.code = bosdyn.api.header_pb2.CommonError.CODE_OK
+        return resp
+
     def EstopCheckIn(self, request, context):
         """Implement the EstopCheckIn function of the service.
 
@@ -166,3 +177,26 @@ def test_challenge_exc_async():
         fut.result()
     time.sleep(0.1)
     assert old_challenge + 1 == endpoint.get_challenge()
+
+
+def test_deregister_aio():
+    service = MockEstopServicer()
+
+    async def _run():
+        server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+        bosdyn.api.estop_service_pb2_grpc.add_EstopServiceServicer_to_server(service, server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        client = bosdyn.client.estop.EstopClient()
+        client.channel = grpc.aio.insecure_channel('localhost:{}'.format(port))
+        endpoint = bosdyn.client.estop.EstopEndpoint(client, 'test-endpoint', estop_timeout=1)
+
+        await client.deregister('config-id', endpoint)
+        assert len(service.deregister_requests) == 1
+        assert service.deregister_requests[0].target_config_id == 'config-id'
+        assert service.deregister_requests[0].target_endpoint.name == 'test-endpoint'
+
+        await client.channel.close()
+        server.stop(0)
+
+    asyncio.run(_run())
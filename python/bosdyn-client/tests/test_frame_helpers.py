@@ -9,6 +9,7 @@
 import math
 
 import google.protobuf.text_format
+import numpy
 import pytest
 
 import bosdyn.api.geometry_pb2 as geom_protos
@@ -712,3 +713,73 @@ def test_express_velocity_types():
     assert type(body_vel.linear_velocity_x) == float
     assert body_vel.linear_velocity_x == 1.1
     assert body_vel.linear.x == 1.1
+
+
+def _random_snapshot(num_frames, seed=0):
+    """Creates a random tree of frames with random rotations."""
+    rng = numpy.random.RandomState(seed)
+    snapshot = geom_protos.FrameTreeSnapshot()
+    snapshot.child_to_parent_edge_map['frame0'].parent_frame_name = ''
+    for idx in range(1, num_frames):
+        parent_frame_name = 'frame{}'.format(rng.randint(idx))
+        rot = math_helpers.Quat(*rng.normal(size=4))
+        norm = math.sqrt(rot.w**2 + rot.x**2 + rot.y**2 + rot.z**2)
+        rot = math_helpers.Quat(rot.w / norm, rot.x / norm, rot.y / norm, rot.z / norm)
+        pose = math_helpers.SE3Pose(*rng.uniform(-5, 5, size=3), rot)
+        edge = snapshot.child_to_parent_edge_map['frame{}'.format(idx)]
+        edge.parent_frame_name = parent_frame_name
+        edge.parent_tform_child.CopyFrom(pose.to_proto())
+    return snapshot
+
+
+def test_frame_tree_matches_snapshot_math():
+    snapshot = _random_snapshot(30)
+    frame_tree = frame_helpers.FrameTree(snapshot)
+    assert frame_tree.root_frame_name == 'frame0'
+    assert len(frame_tree.frame_names) == 30
+    assert 'frame29' in frame_tree
+    for frame_a in ('frame0', 'frame7', 'frame29'):
+        for frame_b in frame_tree.frame_names:
+            expected = frame_helpers.get_a_tform_b(snapshot, frame_a, frame_b).to_matrix()
+            for _ in range(2):
+                assert numpy.allclose(frame_tree.a_tform_b(frame_a, frame_b).to_matrix(),
+                                      expected)
+                assert numpy.allclose(frame_tree.a_tform_b_matrix(frame_a, frame_b), expected)
+            # The FrameTree can be used in place of the snapshot.
+            assert numpy.allclose(
+                frame_helpers.get_a_tform_b(frame_tree, frame_a, frame_b).to_matrix(), expected)
+
+    assert frame_tree.a_tform_b('frame0', 'foo') is None
+    assert frame_tree.a_tform_b_matrix('foo', 'frame0') is None
+    # Cached matrices and poses cannot be modified by callers.
+    with pytest.raises(ValueError):
+        frame_tree.a_tform_b_matrix('frame0', 'frame1')[0, 0] = 2
+    frame_tree.a_tform_b('frame0', 'frame1').x = 1e6
+    assert frame_tree.a_tform_b('frame0', 'frame1').x != 1e6
+
+
+def test_frame_tree_transforms_to():
+    snapshot = _random_snapshot(10)
+    frame_tree = frame_helpers.FrameTree(snapshot)
+    frame_names = ['frame9', 'frame0', 'frame3', 'frame3']
+    transforms = frame_tree.transforms_to('frame5', frame_names)
+    assert transforms.shape == (4, 4, 4)
+    for frame_name, frame5_tform_frame in zip(frame_names, transforms):
+        assert numpy.allclose(frame5_tform_frame,
+                              frame_tree.a_tform_b_matrix('frame5', frame_name))
+    assert frame_tree.transforms_to('frame5', []).shape == (0, 4, 4)
+    with pytest.raises(frame_helpers.ValidateFrameTreeUnknownFrameError):
+        frame_tree.transforms_to('frame5', ['frame1', 'foo'])
+
+
+def test_frame_tree_validation():
+    with pytest.raises(frame_helpers.ValidateFrameTreeError):
+        frame_helpers.FrameTree(geom_protos.FrameTreeSnapshot())
+    snapshot = _random_snapshot(5)
+    snapshot.child_to_parent_edge_map['frame0'].parent_frame_name = 'frame4'
+    with pytest.raises(frame_helpers.ValidateFrameTreeCycleError):
+        frame_helpers.FrameTree(snapshot)
+    snapshot = _random_snapshot(5)
+    snapshot.child_to_parent_edge_map['other'].parent_frame_name = ''
+    with pytest.raises(frame_helpers.ValidateFrameTreeDisjointError):
+        frame_helpers.FrameTree(snapshot)
@@ -5,7 +5,10 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Unit tests for the graph_nav module."""
+import asyncio
 import concurrent
+import threading
+import time
 
 import grpc
 import pytest
@@ -41,6 +44,10 @@ class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
         self.download_wp_snapshot_status = graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_OK
         self.download_edge_snapshot_status = graph_nav_pb2.DownloadEdgeSnapshotResponse.STATUS_OK
         self.lease_use_result = None
+        self.waypoint_snapshot = map_pb2.WaypointSnapshot()
+        self.chunk_delay = 0
+        self.uploaded_waypoint_snapshots = []
+        self.uploaded_edge_snapshots = []
 
     def SetLocalization(self, request, context):
         resp = graph_nav_pb2.SetLocalizationResponse()
@@ -82,6 +89,8 @@ class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
         return resp
 
     def UploadWaypointSnapshot(self, request_iterator, context):
+        data = b''.join(request.chunk.data for request in request_iterator)
+        self.uploaded_waypoint_snapshots.append(map_pb2.WaypointSnapshot.FromString(data))
         resp = graph_nav_pb2.UploadWaypointSnapshotResponse()
         resp.status = graph_nav_pb2.UploadWaypointSnapshotResponse.STATUS_OK
         resp.header.error.code = self.common_header_code
@@ -90,6 +99,8 @@ class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
         return resp
 
     def UploadEdgeSnapshot(self, request_iterator, context):
+        data = b''.join(request.chunk.data for request in request_iterator)
+        self.uploaded_edge_snapshots.append(map_pb2.EdgeSnapshot.FromString(data))
         resp = graph_nav_pb2.UploadEdgeSnapshotResponse()
         resp.header.error.code = self.common_header_code
         if self.lease_use_result:
@@ -104,10 +115,15 @@ class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
         return resp
 
     def DownloadWaypointSnapshot(self, request, context):
-        resp = graph_nav_pb2.DownloadWaypointSnapshotResponse()
-        resp.header.error.code = self.common_header_code
-        resp.status = self.download_wp_snapshot_status
-        yield resp
+        chunks = list(GraphNavClient.chunk_message(self.waypoint_snapshot, 100))
+        for chunk in chunks or [None]:
+            resp = graph_nav_pb2.DownloadWaypointSnapshotResponse()
+            resp.header.error.code = self.common_header_code
+            resp.status = self.download_wp_snapshot_status
+            if chunk is not None:
+                resp.chunk.CopyFrom(chunk)
+            time.sleep(self.chunk_delay)
+            yield resp
 
     def DownloadEdgeSnapshot(self, request, context):
         resp = graph_nav_pb2.DownloadEdgeSnapshotResponse()
@@ -399,6 +415,81 @@ def test_download_waypoint_snapshot(client, service, server):
         make_call()
 
 
+def test_download_waypoint_snapshot_async(client, service, server):
+    service.waypoint_snapshot = map_pb2.WaypointSnapshot(id='mywaypoint')
+    service.waypoint_snapshot.images.add().shot.image.data = bytes(1000)
+    total_size = service.waypoint_snapshot.ByteSize()
+    progress = []
+    future = client.download_waypoint_snapshot_async(
+        waypoint_snapshot_id="mywaypoint", progress_cb=lambda *args: progress.append(args))
+    assert future.result() == service.waypoint_snapshot
+    assert progress == [(min(end, total_size), total_size)
+                        for end in range(100, total_size + 100, 100)]
+
+    service.common_header_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+    with pytest.raises(InternalServerError):
+        client.download_waypoint_snapshot_async(waypoint_snapshot_id="mywaypoint").result()
+
+    service.common_header_code = header_pb2.CommonError.CODE_OK
+    service.download_wp_snapshot_status = graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_SNAPSHOT_DOES_NOT_EXIST
+    future = client.download_waypoint_snapshot_async(waypoint_snapshot_id="mywaypoint")
+    assert isinstance(future.exception(), bosdyn.client.graph_nav.UnknownMapInformationError)
+
+
+class _HeldEdgeSnapshotServicer(MockGraphNavServicer):
+    """Holds DownloadEdgeSnapshot streams for the 'held' snapshot open until released."""
+
+    def __init__(self):
+        super(_HeldEdgeSnapshotServicer, self).__init__()
+        self.release = threading.Event()
+
+    def DownloadEdgeSnapshot(self, request, context):
+        if request.edge_snapshot_id == 'held':
+            self.release.wait()
+        for resp in super(_HeldEdgeSnapshotServicer, self).DownloadEdgeSnapshot(request, context):
+            yield resp
+
+
+def test_download_async_more_streams_than_threads(client):
+    # More open streams than a default thread pool has workers must not delay other streams.
+    num_held = 40
+    service = _HeldEdgeSnapshotServicer()
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=num_held + 2))
+    graph_nav_service_pb2_grpc.add_GraphNavServiceServicer_to_server(service, server)
+    port = server.add_insecure_port('localhost:0')
+    client.channel = grpc.insecure_channel('localhost:{}'.format(port))
+    server.start()
+    try:
+        held = [client.download_edge_snapshot_async('held') for _ in range(num_held)]
+        snapshot = client.download_edge_snapshot_async('free').result(timeout=5)
+        assert isinstance(snapshot, map_pb2.EdgeSnapshot)
+        assert not any(future.done() for future in held)
+        service.release.set()
+        for future in held:
+            assert isinstance(future.result(timeout=5), map_pb2.EdgeSnapshot)
+    finally:
+        service.release.set()
+        server.stop(0)
+
+
+def test_download_waypoint_snapshot_async_cancel(client, service, server):
+    service.waypoint_snapshot = map_pb2.WaypointSnapshot(id='mywaypoint')
+    service.waypoint_snapshot.images.add().shot.image.data = bytes(1000)
+    service.chunk_delay = 0.05
+    progress = []
+    future = client.download_waypoint_snapshot_async(
+        waypoint_snapshot_id="mywaypoint", progress_cb=lambda *args: progress.append(args))
+    while not progress:
+        time.sleep(0.01)
+    assert future.cancel()
+    assert future.cancelled()
+    assert future.done()
+    with pytest.raises(concurrent.futures.CancelledError):
+        future.result()
+    time.sleep(0.2)
+    assert len(progress) < 5
+
+
 def test_download_edge_snapshot(client, service, server):
     make_call = lambda: client.download_edge_snapshot(edge_snapshot_id="myedge")
     make_call()
@@ -411,3 +502,68 @@ def test_download_edge_snapshot(client, service, server):
     service.download_edge_snapshot_status = graph_nav_pb2.DownloadEdgeSnapshotResponse.STATUS_SNAPSHOT_DOES_NOT_EXIST
     with pytest.raises(bosdyn.client.graph_nav.UnknownMapInformationError):
         make_call()
+
+
+def test_download_waypoint_snapshot_aio(client, service):
+
+    async def _run():
+        server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+        graph_nav_service_pb2_grpc.add_GraphNavServiceServicer_to_server(service, server)
+        port = server.add_insecure_port('localhost:0')
+        client.channel = grpc.aio.insecure_channel('localhost:{}'.format(port))
+        server.start()
+
+        snapshot = await client.download_waypoint_snapshot(waypoint_snapshot_id="mywaypoint")
+        assert isinstance(snapshot, map_pb2.WaypointSnapshot)
+
+        # The responses can also be received one at a time.
+        responses = [
+            response async for response in client.download_waypoint_snapshot(
+                waypoint_snapshot_id="mywaypoint")
+        ]
+        assert len(responses) == 1
+        assert responses[0].status == graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_OK
+
+        # Streamed requests may come from an async iterator.
+        async def _upload_requests():
+            for chunk in client.chunk_message(map_pb2.WaypointSnapshot(id='snapshot'), 4):
+                yield graph_nav_pb2.UploadWaypointSnapshotRequest(chunk=chunk)
+
+        response = await client.call(client._stub.UploadWaypointSnapshot, _upload_requests())
+        assert response.status == graph_nav_pb2.UploadWaypointSnapshotResponse.STATUS_OK
+
+        service.common_header_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+        with pytest.raises(InternalServerError):
+            await client.download_waypoint_snapshot(waypoint_snapshot_id="mywaypoint")
+
+        await client.channel.close()
+        server.stop(0)
+
+    asyncio.run(_run())
+
+
+def test_upload_snapshots_aio(client, service):
+
+    async def _run():
+        server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+        graph_nav_service_pb2_grpc.add_GraphNavServiceServicer_to_server(service, server)
+        port = server.add_insecure_port('localhost:0')
+        client.channel = grpc.aio.insecure_channel('localhost:{}'.format(port))
+        server.start()
+
+        await client.upload_waypoint_snapshot(map_pb2.WaypointSnapshot(id='waypoint-snapshot'))
+        assert [snapshot.id for snapshot in service.uploaded_waypoint_snapshots
+               ] == ['waypoint-snapshot']
+
+        await client.upload_edge_snapshot(map_pb2.EdgeSnapshot(id='edge-snapshot'))
+        assert [snapshot.id for snapshot in service.uploaded_edge_snapshots] == ['edge-snapshot']
+
+        service.lease_use_result = lease_pb2.LeaseUseResult(
+            status=lease_pb2.LeaseUseResult.STATUS_OLDER)
+        with pytest.raises(bosdyn.client.LeaseUseError):
+            await client.upload_edge_snapshot(map_pb2.EdgeSnapshot(id='edge-snapshot'))
+
+        await client.channel.close()
+        server.stop(0)
+
+    asyncio.run(_run())
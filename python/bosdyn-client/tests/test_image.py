@@ -9,12 +9,14 @@ import logging
 import time
 
 import grpc
+import numpy as np
 import pytest
 
 import bosdyn.api.image_pb2 as image_protos
 import bosdyn.api.image_service_pb2_grpc as image_service
 import bosdyn.client.image
 from bosdyn.client.exceptions import TimedOutError
+from bosdyn.client.math_helpers import Quat, SE3Pose
 
 from . import helpers
 
@@ -193,3 +195,140 @@ def test_get_image_source_data_error():
                                      image_responses=[image_response])
     with pytest.raises(bosdyn.client.image.ImageDataError):
         res = client.get_image_from_sources(image_sources=['foo'])
+
+
+def _make_depth_response(depth_array, fx=100.0, fy=110.0, cx=3.5, cy=2.5, depth_scale=1000.0):
+    response = image_protos.ImageResponse()
+    response.source.image_type = image_protos.ImageSource.IMAGE_TYPE_DEPTH
+    response.source.rows, response.source.cols = depth_array.shape
+    response.source.depth_scale = depth_scale
+    response.source.pinhole.intrinsics.focal_length.x = fx
+    response.source.pinhole.intrinsics.focal_length.y = fy
+    response.source.pinhole.intrinsics.principal_point.x = cx
+    response.source.pinhole.intrinsics.principal_point.y = cy
+    response.shot.image.rows, response.shot.image.cols = depth_array.shape
+    response.shot.image.pixel_format = image_protos.Image.PIXEL_FORMAT_DEPTH_U16
+    response.shot.image.data = depth_array.astype(np.uint16).tobytes()
+    return response
+
+
+def _expected_cloud(depth_array, fx=100.0, fy=110.0, cx=3.5, cy=2.5, depth_scale=1000.0):
+    rows, cols = np.nonzero((depth_array > 0) & (depth_array < 65535))
+    z = depth_array[rows, cols] / depth_scale
+    return np.stack([z * (cols - cx) / fx, z * (rows - cy) / fy, z], axis=1)
+
+
+def _depth_array():
+    depth_array = np.random.RandomState(0).randint(1, 5000, size=(6, 8)).astype(np.uint16)
+    depth_array[1, 2] = 0
+    depth_array[4, 5] = 65535
+    return depth_array
+
+
+def test_depth_image_to_pointcloud():
+    depth_array = _depth_array()
+    cloud = bosdyn.client.image.depth_image_to_pointcloud(_make_depth_response(depth_array))
+    assert cloud.shape == (46, 3)
+    assert np.allclose(cloud, _expected_cloud(depth_array))
+
+    # The minimum and maximum distances filter on z.
+    cloud = bosdyn.client.image.depth_image_to_pointcloud(_make_depth_response(depth_array),
+                                                          min_dist=1.0, max_dist=3.0)
+    assert np.all(cloud[:, 2] >= 1.0)
+    assert np.all(cloud[:, 2] <= 3.0)
+
+    response = _make_depth_response(depth_array)
+    response.source.image_type = image_protos.ImageSource.IMAGE_TYPE_VISUAL
+    with pytest.raises(ValueError):
+        bosdyn.client.image.depth_image_to_pointcloud(response)
+
+
+def test_depth_projector():
+    depth_array = _depth_array()
+    response = _make_depth_response(depth_array)
+    projector = bosdyn.client.image.DepthProjector.from_image_source(response.source,
+                                                                     dtype=np.float32)
+    assert projector is bosdyn.client.image.DepthProjector.from_image_source(
+        response.source, dtype=np.float32)
+    assert projector.max_points == 48
+
+    out = np.empty((projector.max_points, 3), dtype=np.float32)
+    cloud = projector.project_response(response, out=out)
+    assert cloud.dtype == np.float32
+    assert np.shares_memory(cloud, out)
+    assert np.allclose(cloud, _expected_cloud(depth_array), atol=1e-6)
+
+    tform = SE3Pose(1, 2, 3, Quat.from_yaw(0.7))
+    expected = tform.transform_cloud(_expected_cloud(depth_array))
+    assert np.allclose(projector.project_response(response, tform=tform), expected, atol=1e-5)
+    # Again, using the rotated rays cached from the first call.
+    assert np.allclose(projector.project_response(response, tform=tform.to_matrix()), expected,
+                       atol=1e-5)
+
+    with pytest.raises(ValueError):
+        projector.project_response(response, out=np.empty((10, 3), dtype=np.float32))
+    with pytest.raises(ValueError):
+        projector.project(depth_array[:, 1:])
+
+
+def test_depth_projector_decimation_and_roi():
+    depth_array = _depth_array()
+    response = _make_depth_response(depth_array)
+    projector = bosdyn.client.image.DepthProjector.from_image_source(response.source,
+                                                                     decimation=2, roi=(1, 5, 2, 8))
+    assert projector.max_points == 6
+    cloud = projector.project_response(response)
+
+    # Zero out the pixels outside the decimated region of interest and convert the whole image.
+    expected_array = np.zeros_like(depth_array)
+    expected_array[1:5:2, 2:8:2] = depth_array[1:5:2, 2:8:2]
+    assert np.allclose(cloud, _expected_cloud(expected_array))
+
+
+def _add_sensor_frame(response, sensor_frame_name, body_tform_sensor):
+    response.shot.frame_name_image_sensor = sensor_frame_name
+    edges = response.shot.transforms_snapshot.child_to_parent_edge_map
+    edges['body'].parent_frame_name = ''
+    edges[sensor_frame_name].parent_frame_name = 'body'
+    edges[sensor_frame_name].parent_tform_child.CopyFrom(body_tform_sensor.to_proto())
+    return response
+
+
+def test_depth_images_to_pointcloud():
+    depth_array = _depth_array()
+    body_tform_left = SE3Pose(0.5, 0.1, 0.2, Quat.from_yaw(0.5))
+    body_tform_right = SE3Pose(0.5, -0.1, 0.2, Quat.from_roll(-0.4))
+    responses = [
+        _add_sensor_frame(_make_depth_response(depth_array), 'left', body_tform_left),
+        _add_sensor_frame(_make_depth_response(depth_array[::-1].copy(), fx=80.0), 'right',
+                          body_tform_right),
+    ]
+    expected = np.concatenate([
+        body_tform_left.transform_cloud(_expected_cloud(depth_array)),
+        body_tform_right.transform_cloud(_expected_cloud(depth_array[::-1], fx=80.0)),
+    ])
+
+    cloud = bosdyn.client.image.depth_images_to_pointcloud(responses, 'body', dtype=np.float64)
+    assert np.allclose(cloud, expected)
+
+    cloud = bosdyn.client.image.depth_images_to_pointcloud(responses, 'body', max_points=10)
+    assert cloud.dtype == np.float32
+    assert cloud.shape == (10, 3)
+    assert np.allclose(cloud[0], expected[0], atol=1e-5)
+    assert np.allclose(cloud[-1], expected[-1], atol=1e-5)
+
+    with pytest.raises(ValueError):
+        bosdyn.client.image.depth_images_to_pointcloud(responses, 'odom')
+
+
+def test_voxel_downsample_pointcloud():
+    points = np.array([[0.01, 0.01, 0.01], [0.03, 0.05, 0.07], [0.15, 0.0, 0.0],
+                       [-0.05, 0.0, 0.0]])
+    downsampled = bosdyn.client.image.voxel_downsample_pointcloud(points, 0.1)
+    assert len(downsampled) == 3
+    assert any(np.allclose(point, [0.02, 0.03, 0.04]) for point in downsampled)
+    assert any(np.allclose(point, [0.15, 0.0, 0.0]) for point in downsampled)
+    assert any(np.allclose(point, [-0.05, 0.0, 0.0]) for point in downsampled)
+    assert len(bosdyn.client.image.voxel_downsample_pointcloud(points[:0], 0.1)) == 0
+    with pytest.raises(ValueError):
+        bosdyn.client.image.voxel_downsample_pointcloud(points, 0)
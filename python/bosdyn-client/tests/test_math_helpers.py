@@ -7,6 +7,7 @@
 """Unit tests for frame helpers"""
 
 import math
+import pickle
 import random
 from math import cos, fabs, pi, sin, sqrt
 
@@ -964,3 +965,189 @@ def test_se3_vec3_mult_exceptions():
         " " * vec
     with pytest.raises(TypeError):
         se3 * ""
+
+
+def _random_se3_poses(count):
+    poses = []
+    for _ in range(count):
+        rot = Quat(*[random.gauss(0.0, 1.0) for _ in range(4)]).normalize()
+        poses.append(
+            SE3Pose(random.uniform(-2.0, 2.0), random.uniform(-2.0, 2.0), random.uniform(-2.0, 2.0),
+                    rot))
+    return poses
+
+
+def test_se3_pose_array_matches_scalar():
+    random.seed(1234)
+    a_poses = _random_se3_poses(50)
+    b_poses = _random_se3_poses(50)
+    a_array = SE3PoseArray.from_poses(a_poses)
+    b_array = SE3PoseArray.from_poses(b_poses)
+    assert len(a_array) == 50
+
+    product = a_array * b_array
+    inverse = a_array.inverse()
+    fractions = numpy.linspace(0.0, 1.0, 50)
+    interp = SE3PoseArray.interp(a_array, b_array, fractions)
+    for i in range(50):
+        assert numpy.allclose(product[i].to_matrix(), (a_poses[i] * b_poses[i]).to_matrix())
+        assert numpy.allclose(inverse[i].to_matrix(), a_poses[i].inverse().to_matrix())
+        expected = SE3Pose.interp(a_poses[i], b_poses[i], fractions[i])
+        assert numpy.allclose(interp[i].to_matrix(), expected.to_matrix())
+
+    # Matrices round trip.
+    assert numpy.allclose(SE3PoseArray.from_matrix(a_array.to_matrix()).to_matrix(),
+                          a_array.to_matrix())
+
+    # A single pose broadcasts against the array, from either side.
+    assert numpy.allclose((a_poses[0] * b_array)[3].to_matrix(),
+                          (a_poses[0] * b_poses[3]).to_matrix())
+    assert numpy.allclose((a_array * b_poses[0])[3].to_matrix(),
+                          (a_poses[3] * b_poses[0]).to_matrix())
+
+    points = numpy.random.RandomState(0).uniform(-1.0, 1.0, size=(50, 3))
+    transformed = a_array.transform_points(points)
+    for i in range(50):
+        assert numpy.allclose(transformed[i], a_poses[i].transform_point(*points[i]))
+
+    with pytest.raises(TypeError):
+        a_array * ""
+
+
+def test_se3_pose_array_protos():
+    protos = [
+        geometry_pb2.SE3Pose(position=geometry_pb2.Vec3(x=1, y=2, z=3),
+                             rotation=geometry_pb2.Quaternion(w=0, x=1, y=0, z=0)),
+        geometry_pb2.SE3Pose(position=geometry_pb2.Vec3(x=4, y=5, z=6)),
+    ]
+    poses = SE3PoseArray.from_proto(protos)
+    assert numpy.allclose(poses.positions, [[1, 2, 3], [4, 5, 6]])
+    # A missing rotation becomes the identity, like SE3Pose.from_proto().
+    assert numpy.allclose(poses.rot.wxyz, [[0, 1, 0, 0], [1, 0, 0, 0]])
+    assert poses.to_proto()[0] == protos[0]
+    assert len(SE3PoseArray.from_proto([])) == 0
+
+
+def test_quat_array():
+    random.seed(4321)
+    quats = [pose.rot for pose in _random_se3_poses(20)]
+    quat_array = QuatArray.from_quats(quats)
+    yaws = quat_array.to_yaw()
+    from_matrix = QuatArray.from_matrix(quat_array.to_matrix())
+    slerped = QuatArray.slerp(quat_array, quats[0], 0.25)
+    for i, quat in enumerate(quats):
+        assert abs(yaws[i] - quat.to_yaw()) < EPSILON
+        assert numpy.allclose(from_matrix[i].to_matrix(), quat.to_matrix())
+        assert numpy.allclose(slerped[i].to_matrix(), Quat.slerp(quat, quats[0], 0.25).to_matrix())
+        assert numpy.allclose((quat_array * quat_array.inverse())[i].to_matrix(), numpy.eye(3))
+
+    normalized = QuatArray([[2, 0, 0, 0], [0, 0, 0, 0]]).normalize()
+    assert numpy.allclose(normalized.wxyz, [[1, 0, 0, 0], [1, 0, 0, 0]])
+
+
+def test_se2_pose_array_matches_scalar():
+    random.seed(5678)
+    poses = [
+        SE2Pose(random.uniform(-2.0, 2.0), random.uniform(-2.0, 2.0),
+                random.uniform(-math.pi, math.pi)) for _ in range(30)
+    ]
+    pose_array = SE2PoseArray.from_poses(poses)
+    product = pose_array * pose_array[::-1]
+    identity = pose_array * pose_array.inverse()
+    for i, pose in enumerate(poses):
+        expected = pose * poses[-1 - i]
+        assert abs(product[i].x - expected.x) < EPSILON
+        assert abs(product[i].y - expected.y) < EPSILON
+        assert angle_diff(product[i].angle, expected.angle) < EPSILON
+        assert numpy.allclose(identity[i].to_matrix(), numpy.eye(3))
+
+    se3_array = pose_array.get_closest_se3_transform(height_z=1.0)
+    assert numpy.allclose(se3_array.z, 1.0)
+    flattened = se3_array.get_closest_se2_transform()
+    assert numpy.allclose(flattened.positions, pose_array.positions)
+    assert numpy.allclose(numpy.cos(flattened.angles - pose_array.angles), 1.0)
+
+    proto = SE2PoseArray.from_proto(pose_array.to_proto())
+    assert numpy.allclose(proto.to_matrix(), pose_array.to_matrix())
+
+
+def test_pickled_poses_without_matrix_cache():
+    # Instances pickled before the matrix cache existed have no cache attributes.
+    quat = Quat.__new__(Quat)
+    quat.__dict__.update(w=1, x=0, y=0, z=0)
+    assert numpy.allclose(quat.to_matrix(), numpy.eye(3))
+    pose = SE3Pose.__new__(SE3Pose)
+    pose.__dict__.update(x=1, y=2, z=3, rot=quat)
+    assert numpy.allclose(pose.to_matrix(), SE3Pose(1, 2, 3, Quat()).to_matrix())
+    pose = pickle.loads(pickle.dumps(SE3Pose(1, 2, 3, Quat.from_yaw(0.5))))
+    assert numpy.allclose(pose.to_matrix(), SE3Pose(1, 2, 3, Quat.from_yaw(0.5)).to_matrix())
+
+
+def test_cached_matrices_follow_mutation():
+    quat = Quat.from_yaw(0.5)
+    first = quat.to_matrix()
+    # Modifying a returned matrix must not corrupt the cache.
+    first[0, 0] = 100.0
+    assert numpy.allclose(quat.to_matrix(), Quat.from_yaw(0.5).to_matrix())
+
+    quat.normalize()
+    quat.z = -quat.z
+    assert numpy.allclose(quat.to_matrix(), Quat.from_yaw(-0.5).to_matrix())
+
+    pose = SE3Pose(1, 2, 3, Quat.from_yaw(0.5))
+    cloud = numpy.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    assert numpy.allclose(pose.transform_cloud(cloud), [pose.transform_point(*p) for p in cloud])
+    pose.x = 5
+    pose.rot.w, pose.rot.z = pose.rot.z, pose.rot.w
+    assert numpy.allclose(pose.to_matrix()[0:3, 0:3], pose.rot.to_matrix())
+    assert pose.to_matrix()[0, 3] == 5
+    assert numpy.allclose(pose.transform_cloud(cloud), [pose.transform_point(*p) for p in cloud])
+
+
+def test_quat_transform_point_matches_product():
+    random.seed(2468)
+    for _ in range(20):
+        quat = Quat(*[random.gauss(0.0, 1.0) for _ in range(4)])
+        point = [random.uniform(-1.0, 1.0) for _ in range(3)]
+        expected = quat.mult(Quat(0, *point)).mult(quat.inverse())
+        x, y, z = quat.transform_point(*point)
+        assert abs(x - expected.x) < EPSILON
+        assert abs(y - expected.y) < EPSILON
+        assert abs(z - expected.z) < EPSILON
+
+
+def test_inplace_pose_operations():
+    random.seed(1357)
+    a_pose, b_pose = _random_se3_poses(2)
+    expected = (a_pose * b_pose).to_matrix()
+    out = SE3Pose.from_identity()
+    assert a_pose.mult_into(b_pose, out) is out
+    assert numpy.allclose(out.to_matrix(), expected)
+
+    # The output may alias either input.
+    a_copy = SE3Pose(a_pose.x, a_pose.y, a_pose.z, Quat(*list(a_pose)[3:]))
+    a_copy.mult_into(b_pose, a_copy)
+    assert numpy.allclose(a_copy.to_matrix(), expected)
+    a_pose.mult_into(b_pose, b_pose)
+    assert numpy.allclose(b_pose.to_matrix(), expected)
+
+    expected_inverse = a_pose.inverse().to_matrix()
+    assert a_pose.inverse_inplace() is a_pose
+    assert numpy.allclose(a_pose.to_matrix(), expected_inverse)
+
+    quat = Quat.from_roll(0.3)
+    quat.mult_into(Quat.from_pitch(0.2), quat)
+    assert numpy.allclose(quat.to_matrix(),
+                          Quat.from_roll(0.3).mult(Quat.from_pitch(0.2)).to_matrix())
+    assert numpy.allclose(quat.inverse_inplace().mult(Quat.from_roll(0.3)).to_matrix(),
+                          Quat.from_pitch(-0.2).to_matrix())
+
+    se2 = SE2Pose(1, 2, 2.5)
+    other = SE2Pose(-1, 0.5, 1.5)
+    expected_se2 = se2 * other
+    se2.mult_into(other, se2)
+    assert abs(se2.x - expected_se2.x) < EPSILON
+    assert abs(se2.y - expected_se2.y) < EPSILON
+    assert angle_diff(se2.angle, expected_se2.angle) < EPSILON
+    se2.inverse_inplace()
+    assert numpy.allclose((se2 * expected_se2).to_matrix(), numpy.eye(3))
@@ -0,0 +1,162 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the response_cache module."""
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import bosdyn.api.header_pb2 as header_protos
+import bosdyn.api.robot_state_pb2 as robot_state_protos
+import bosdyn.api.robot_state_service_pb2_grpc as robot_state_service
+from bosdyn.client.exceptions import InternalServerError
+from bosdyn.client.processors import AddRequestHeader
+from bosdyn.client.response_cache import IDEMPOTENT_GETTER_TTLS, ResponseCache
+from bosdyn.client.robot_state import RobotStateClient
+
+from . import helpers
+
+GET_ROBOT_STATE = '/bosdyn.api.RobotStateService/GetRobotState'
+
+
+class MockRobotStateServicer(robot_state_service.RobotStateServiceServicer):
+
+    def __init__(self):
+        super(MockRobotStateServicer, self).__init__()
+        self.rpc_delay = 0
+        self.error_code = header_protos.CommonError.CODE_OK
+        self.num_calls = 0
+        self._lock = threading.Lock()
+
+    def GetRobotState(self, request, context):
+        with self._lock:
+            self.num_calls += 1
+            num_calls = self.num_calls
+        time.sleep(self.rpc_delay)
+        response = robot_state_protos.RobotStateResponse()
+        helpers.add_common_header(response, request, error_code=self.error_code)
+        response.robot_state.power_state.locomotion_charge_percentage.value = num_calls
+        return response
+
+    def GetRobotMetrics(self, request, context):
+        with self._lock:
+            self.num_calls += 1
+        response = robot_state_protos.RobotMetricsResponse()
+        helpers.add_common_header(response, request)
+        return response
+
+
+def _setup(ttl=0.5):
+    client = RobotStateClient()
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+    client.response_cache = ResponseCache({GET_ROBOT_STATE: ttl})
+    service = MockRobotStateServicer()
+    server = helpers.setup_client_and_service(
+        client, service, robot_state_service.add_RobotStateServiceServicer_to_server)
+    return client, service, server
+
+
+def _charge(robot_state):
+    return robot_state.power_state.locomotion_charge_percentage.value
+
+
+def test_response_cache():
+    client, service, server = _setup()
+    first = client.get_robot_state()
+    assert _charge(first) == 1
+    # Responses are copies, so callers may modify them.
+    first.power_state.locomotion_charge_percentage.value = 100
+    assert _charge(client.get_robot_state()) == 1
+    assert service.num_calls == 1
+
+    # Methods without a ttl are not cached.
+    client.get_robot_metrics()
+    client.get_robot_metrics()
+    assert service.num_calls == 3
+
+    # Async calls are not cached.
+    assert _charge(client.get_robot_state_async().result()) == 4
+
+    client.response_cache.clear()
+    assert _charge(client.get_robot_state()) == 5
+    time.sleep(0.6)
+    assert _charge(client.get_robot_state()) == 6
+    server.stop(0)
+
+
+def test_response_cache_coalescing():
+    client, service, server = _setup(ttl=0)
+    service.rpc_delay = 0.2
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        states = list(executor.map(lambda _: client.get_robot_state(), range(8)))
+    assert service.num_calls == 1
+    assert all(_charge(state) == 1 for state in states)
+
+    # Errors are shared by waiting callers, but not cached.
+    service.error_code = header_protos.CommonError.CODE_INTERNAL_SERVER_ERROR
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(client.get_robot_state) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(InternalServerError):
+            future.result()
+    assert service.num_calls == 2
+    service.error_code = header_protos.CommonError.CODE_OK
+    service.rpc_delay = 0
+    assert _charge(client.get_robot_state()) == 3
+    server.stop(0)
+
+
+def test_response_cache_key():
+    cache = ResponseCache(IDEMPOTENT_GETTER_TTLS)
+    assert cache.ttl(GET_ROBOT_STATE) == IDEMPOTENT_GETTER_TTLS[GET_ROBOT_STATE]
+    assert cache.ttl('/bosdyn.api.RobotCommandService/RobotCommand') is None
+    request = robot_state_protos.RobotStateRequest()
+    request.header.client_name = 'a'
+    other_request = robot_state_protos.RobotStateRequest()
+    other_request.header.client_name = 'b'
+    # Requests differing only in their header share responses.
+    responses = [robot_state_protos.RobotStateResponse(), robot_state_protos.RobotStateResponse()]
+    channel = object()
+    cache.get(channel, GET_ROBOT_STATE, request, responses.pop)
+    cache.get(channel, GET_ROBOT_STATE, other_request, lambda: pytest.fail('Not cached'))
+    assert len(responses) == 1
+    assert request.header.client_name == 'a'
+    # Requests on other channels do not.
+    cache.get(object(), GET_ROBOT_STATE, request, responses.pop)
+    assert len(responses) == 0
+
+
+def test_response_cache_two_robots():
+    cache = ResponseCache({GET_ROBOT_STATE: 0.5})
+    clients_and_services = []
+    servers = []
+    for _ in range(2):
+        client, service, server = _setup()
+        client.response_cache = cache
+        clients_and_services.append((client, service))
+        servers.append(server)
+    (client_a, service_a), (client_b, service_b) = clients_and_services
+    service_b.num_calls = 10
+
+    assert _charge(client_a.get_robot_state()) == 1
+    assert _charge(client_b.get_robot_state()) == 11
+    assert _charge(client_a.get_robot_state()) == 1
+    assert _charge(client_b.get_robot_state()) == 11
+    assert service_a.num_calls == 1
+    assert service_b.num_calls == 11
+
+    # Concurrent calls to different robots are not coalesced.
+    cache.clear()
+    service_a.rpc_delay = service_b.rpc_delay = 0.2
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        future_a = executor.submit(client_a.get_robot_state)
+        future_b = executor.submit(client_b.get_robot_state)
+    assert _charge(future_a.result()) == 2
+    assert _charge(future_b.result()) == 12
+    for server in servers:
+        server.stop(0)
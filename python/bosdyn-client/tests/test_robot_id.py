@@ -5,6 +5,7 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Unit tests for the robot_id client."""
+import asyncio
 import logging
 import time
 
@@ -93,3 +94,41 @@ def test_version_tuple():
     client, service, server = _setup(robot_id=_create_fake_robot_id())
     robot_id = client.get_id()
     bosdyn.client.robot_id.version_tuple(robot_id.software_release.version) == (1, 1, 12)
+
+
+def _setup_aio(rpc_delay=0, robot_id=None):
+    client = bosdyn.client.robot_id.RobotIdClient()
+    service = MockRobotIdServicer(rpc_delay=rpc_delay, robot_id=robot_id)
+    server = helpers.setup_aio_client_and_service(
+        client, service, robot_id_service.add_RobotIdServiceServicer_to_server)
+    return client, service, server
+
+
+def test_get_robot_id_aio():
+
+    async def _run():
+        client, service, server = _setup_aio(robot_id=_create_fake_robot_id())
+        assert client.is_aio
+        _check_robot_id(await client.get_id())
+        _check_robot_id(await client.get_id_async())
+        robot_ids = await asyncio.gather(*[client.get_id() for _ in range(5)])
+        for robot_id in robot_ids:
+            _check_robot_id(robot_id)
+        await client.channel.close()
+        server.stop(0)
+
+    asyncio.run(_run())
+
+
+def test_get_robot_id_aio_timeout():
+    timeout = 0.1
+
+    async def _run():
+        client, service, server = _setup_aio(rpc_delay=(2.0 * timeout),
+                                             robot_id=_create_fake_robot_id())
+        with pytest.raises(TimedOutError):
+            await client.get_id(timeout=timeout)
+        await client.channel.close()
+        server.stop(0)
+
+    asyncio.run(_run())
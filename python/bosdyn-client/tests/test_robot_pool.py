@@ -0,0 +1,95 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the robot_pool module."""
+import concurrent
+import time
+
+import grpc
+import pytest
+
+import bosdyn.api.robot_id_pb2 as robot_id_protos
+import bosdyn.api.robot_id_service_pb2_grpc as robot_id_service
+import bosdyn.client.channel
+from bosdyn.client.robot_id import RobotIdClient
+from bosdyn.client.robot_pool import DEFAULT_FLEET_CHANNEL_OPTIONS, RobotPool
+from bosdyn.client.sdk import Sdk
+
+
+class MockRobotIdServicer(robot_id_service.RobotIdServiceServicer):
+
+    def __init__(self, rpc_delay=0):
+        super(MockRobotIdServicer, self).__init__()
+        self.rpc_delay = rpc_delay
+
+    def GetRobotId(self, request, context):
+        time.sleep(self.rpc_delay)
+        resp = robot_id_protos.RobotIdResponse()
+        resp.header.error.code = resp.header.error.CODE_OK
+        resp.robot_id.serial_number = 'serial'
+        return resp
+
+
+@pytest.fixture
+def server_port():
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=10))
+    service = MockRobotIdServicer(rpc_delay=0.2)
+    robot_id_service.add_RobotIdServiceServicer_to_server(service, server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    yield port
+    server.stop(0)
+
+
+@pytest.fixture
+def pool(server_port, monkeypatch):
+    created_options = []
+
+    def _create_channel(address, port, creds, authority, options=[], aio=False):
+        created_options.append(options)
+        return grpc.insecure_channel('localhost:{}'.format(server_port), options)
+
+    monkeypatch.setattr(bosdyn.client.channel, 'create_secure_channel', _create_channel)
+    sdk = Sdk()
+    sdk.register_service_client(RobotIdClient)
+    with RobotPool(sdk) as robot_pool:
+        robot_pool.created_options = created_options
+        yield robot_pool
+
+
+def test_robot_pool(pool):
+    robots = [pool.add_robot('robot-{}'.format(idx)) for idx in range(3)]
+    assert pool.add_robot('robot-0') is robots[0]
+    assert pool.robot('robot-1') is robots[1]
+    assert sorted(pool.addresses) == ['robot-0', 'robot-1', 'robot-2']
+    assert pool.metrics() == (3, 0, 0, 0, 0)
+
+    clients = pool.ensure_clients(RobotIdClient.default_service_name)
+    assert sorted(clients) == pool.addresses
+    assert clients['robot-2'] is pool.ensure_client('robot-2', RobotIdClient.default_service_name)
+    assert pool.metrics().num_channels == 3
+    for options in pool.created_options:
+        for option in DEFAULT_FLEET_CHANNEL_OPTIONS:
+            assert option in options
+
+    # Rpcs on all robots are counted.
+    futures = [client.get_id_async() for client in clients.values()]
+    futures += [client.get_id_async() for client in clients.values()]
+    assert pool.metrics().active_rpcs > 0
+    for future in futures:
+        assert future.result().serial_number == 'serial'
+    metrics = pool.metrics()
+    assert metrics.active_rpcs == 0
+    assert metrics.total_rpcs == 6
+    assert 1 < metrics.max_active_rpcs <= 6
+
+    pool.remove_robot('robot-0')
+    assert 'robot-0' not in pool.addresses
+    assert 'robot-0' not in pool._sdk.robots
+    with pytest.raises(KeyError):
+        pool.robot('robot-0')
+    assert pool.metrics().num_channels == 2
+    assert not robots[0].channels_by_authority
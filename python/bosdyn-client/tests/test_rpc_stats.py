@@ -0,0 +1,184 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the rpc_stats module."""
+import asyncio
+import struct
+import time
+from unittest import mock
+
+import pytest
+
+import bosdyn.api.header_pb2 as header_protos
+import bosdyn.api.robot_id_pb2 as robot_id_protos
+import bosdyn.api.robot_id_service_pb2_grpc as robot_id_service
+from bosdyn.client.exceptions import InternalServerError, TimedOutError
+from bosdyn.client.processors import AddRequestHeader
+from bosdyn.client.robot_id import RobotIdClient
+from bosdyn.client.rpc_stats import (AdaptiveTimeouts, DataBufferExporter, Histogram,
+                                     HistogramSink, RpcStats)
+
+from . import helpers
+
+GET_ROBOT_ID = '/bosdyn.api.RobotIdService/GetRobotId'
+
+
+class MockRobotIdServicer(robot_id_service.RobotIdServiceServicer):
+
+    def __init__(self):
+        super(MockRobotIdServicer, self).__init__()
+        self.rpc_delay = 0
+        self.error_code = header_protos.CommonError.CODE_OK
+
+    def GetRobotId(self, request, context):
+        time.sleep(self.rpc_delay)
+        resp = robot_id_protos.RobotIdResponse()
+        helpers.add_common_header(resp, request, error_code=self.error_code)
+        resp.robot_id.serial_number = 'x' * 100
+        return resp
+
+
+def _setup():
+    client = RobotIdClient()
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+    sink = HistogramSink()
+    client.rpc_stats_sinks.append(sink)
+    service = MockRobotIdServicer()
+    server = helpers.setup_client_and_service(client, service,
+                                              robot_id_service.add_RobotIdServiceServicer_to_server)
+    return client, service, server, sink
+
+
+def test_histogram():
+    histogram = Histogram(unit=1e-6, significant_bits=7)
+    assert histogram.percentile(50) is None
+    assert histogram.mean is None
+    values = [0.001 * idx for idx in range(1, 1001)]
+    for value in values:
+        histogram.add(value)
+    assert histogram.count == 1000
+    assert histogram.min == values[0]
+    assert histogram.max == values[-1]
+    assert histogram.mean == pytest.approx(0.5005)
+    for percent in (1, 50, 90, 99, 99.9):
+        assert histogram.percentile(percent) == pytest.approx(percent / 100, rel=2**-6)
+    assert histogram.percentile(100) == values[-1]
+    # Memory grows with the logarithm of the range.
+    assert len(histogram._counts) < 1000
+    assert list(histogram.summary((50, 99.9))) == ['p50', 'p99.9', 'mean', 'max']
+
+
+def test_histogram_sink():
+    client, service, server, sink = _setup()
+    client.get_id()
+    client.get_id_async().result()
+    service.error_code = header_protos.CommonError.CODE_INTERNAL_SERVER_ERROR
+    with pytest.raises(InternalServerError):
+        client.get_id()
+    with pytest.raises(InternalServerError):
+        client.get_id_async().result()
+    service.error_code = header_protos.CommonError.CODE_OK
+    service.rpc_delay = 0.2
+    with pytest.raises(TimedOutError):
+        client.get_id_async(timeout=0.05).result()
+    server.stop(0)
+
+    assert sink.methods() == [GET_ROBOT_ID]
+    summary = sink.summary()[GET_ROBOT_ID]
+    assert summary['count'] == 5
+    assert summary['errors'] == {'InternalServerError': 2, 'TimedOutError': 1}
+    assert summary['wall_time']['max'] >= 0.05
+    assert 0 < summary['processor_time']['max'] < summary['wall_time']['max']
+    assert summary['request_bytes']['max'] > 0
+    assert summary['response_bytes']['max'] > 100
+    sink.reset()
+    assert not sink.methods()
+
+
+def test_aio_histogram_sink():
+
+    async def _get_id():
+        client = RobotIdClient()
+        sink = HistogramSink()
+        client.rpc_stats_sinks.append(sink)
+        server = helpers.setup_aio_client_and_service(
+            client, MockRobotIdServicer(), robot_id_service.add_RobotIdServiceServicer_to_server)
+        await client.get_id()
+        await client.get_id_async()
+        server.stop(0)
+        return sink
+
+    sink = asyncio.run(_get_id())
+    assert sink.summary()[GET_ROBOT_ID]['count'] == 2
+
+
+def test_sink_errors_are_ignored():
+    client, service, server, sink = _setup()
+    failing_sink = mock.Mock()
+    failing_sink.record.side_effect = RuntimeError('sink failed')
+    client.rpc_stats_sinks.insert(0, failing_sink)
+    assert client.get_id().serial_number
+    server.stop(0)
+    assert failing_sink.record.call_count == 1
+    assert sink.summary()[GET_ROBOT_ID]['count'] == 1
+
+
+def test_adaptive_timeouts():
+    timeouts = AdaptiveTimeouts(percentile=90, multiplier=2, min_timeout=0.5, min_samples=10)
+    for idx in range(9):
+        timeouts.record(RpcStats('/a.Service/Method', 1.0 + idx, 0, 0, 0, None))
+    assert timeouts.timeout('/a.Service/Method', 30) == 30
+    assert timeouts.timeout('/a.Service/Other', 30) == 30
+    timeouts.record(RpcStats('/a.Service/Method', 10.0, 0, 0, 0, None))
+    assert timeouts.timeout('/a.Service/Method', 30) == 18.0
+    assert timeouts.timeout('/a.Service/Method', 5) == 5
+    for idx in range(200):
+        timeouts.record(RpcStats('/a.Service/Method', 0.001, 0, 0, 0, None))
+    assert timeouts.timeout('/a.Service/Method', 30) == 0.5
+
+
+def test_client_adaptive_timeouts():
+    client, service, server, sink = _setup()
+    client.adaptive_timeouts = AdaptiveTimeouts(min_timeout=0.1, min_samples=5)
+    for _ in range(5):
+        client.get_id()
+    service.rpc_delay = 0.5
+    # The timeout adapted to the fast rpcs, so a slow one fails early.
+    start = time.time()
+    with pytest.raises(TimedOutError):
+        client.get_id()
+    assert time.time() - start < 0.4
+    # An explicit timeout is used as is.
+    client.get_id(timeout=2)
+    server.stop(0)
+
+
+def test_data_buffer_exporter():
+    sink = HistogramSink()
+    for idx in range(10):
+        sink.record(RpcStats('/a.Service/Method', 0.01 * (idx + 1), 0.001, 10, 20, None))
+    sink.record(RpcStats('/a.Service/Other', 0.01, 0.001, 10, 20, 'TimedOutError'))
+    data_buffer_client = mock.Mock()
+    data_buffer_client.register_signal_schema.side_effect = [7, 8]
+    exporter = DataBufferExporter(data_buffer_client, sink, percentiles=(50, 99))
+    exporter.export()
+    exporter.export()
+
+    # The schemas are only registered once.
+    assert data_buffer_client.register_signal_schema.call_count == 2
+    variables, schema_name = data_buffer_client.register_signal_schema.call_args_list[0][0]
+    assert schema_name == 'bosdyn/rpc_stats/a.Service/Method'
+    names = [variable.name for variable in variables]
+    assert names[:5] == ['count', 'errors', 'wall_time_p50', 'wall_time_p99', 'wall_time_mean']
+    assert len(names) == 2 + 4 * 4
+
+    ticks = data_buffer_client.add_signal_tick.call_args_list
+    assert [tick[0][1] for tick in ticks] == [7, 8, 7, 8]
+    assert [tick[1]['sequence_id'] for tick in ticks] == [0, 0, 1, 1]
+    values = struct.unpack('<QQ16d', ticks[0][0][0])
+    assert values[:2] == (10, 0)
+    assert values[3] == pytest.approx(0.1)
+    assert struct.unpack('<QQ16d', ticks[1][0][0])[:2] == (1, 1)
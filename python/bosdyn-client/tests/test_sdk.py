@@ -4,10 +4,18 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
 import unittest
+from unittest import mock
 
 import pkg_resources
 
+import bosdyn.api.directory_pb2
 import bosdyn.client
 import bosdyn.client.common
 import bosdyn.client.processors
@@ -106,6 +114,77 @@ Spam, Spam, Spam, Spam!
         client = robot.ensure_client(service_name,
                                      channel=robot.ensure_secure_channel('the-knights-of-ni'))
 
+
+    def test_aio_client_creation(self):
+        service_name = ServiceClientMock.default_service_name
+        sdk = self._create_sdk()
+        robot = self._create_robot(sdk, 'test-robot')
+        robot.service_type_by_name[service_name] = service_name
+        robot.service_client_factories_by_type[service_name] = ServiceClientMock
+        client = robot.ensure_client(service_name,
+                                     channel=robot.ensure_secure_channel('the-knights-of-ni'))
+
+        async def _ensure_aio_client():
+            channel = robot.ensure_secure_channel('the-knights-of-ni', aio=True)
+            self.assertIs(channel, robot.ensure_secure_channel('the-knights-of-ni', aio=True))
+            return robot.ensure_client(service_name, channel=channel, aio=True)
+
+        aio_client = asyncio.run(_ensure_aio_client())
+        self.assertTrue(aio_client.is_aio)
+        self.assertFalse(client.is_aio)
+        self.assertIsNot(aio_client, client)
+        self.assertIs(client, robot.ensure_client(service_name))
+        self.assertIs(aio_client, robot.aio_service_clients_by_name[service_name])
+
+    def test_concurrent_client_creation(self):
+        service_name = ServiceClientMock.default_service_name
+        sdk = self._create_sdk()
+        robot = self._create_robot(sdk, 'test-robot')
+        created = []
+
+        def _slow_factory():
+            time.sleep(0.05)
+            created.append(ServiceClientMock())
+            return created[-1]
+
+        listed = []
+
+        def _slow_list_services():
+            time.sleep(0.05)
+            listed.append(None)
+            return [
+                bosdyn.api.directory_pb2.ServiceEntry(name=service_name, type=service_name,
+                                                      authority='the-knights-of-ni')
+            ]
+
+        robot.list_services = _slow_list_services
+        robot.service_type_by_name[service_name] = service_name
+        robot.service_client_factories_by_type[service_name] = _slow_factory
+        clients = []
+        threads = [
+            threading.Thread(target=lambda: clients.append(robot.ensure_client(service_name)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(created), 1)
+        self.assertEqual(len(listed), 1)
+        self.assertEqual(len(robot.channels_by_authority), 1)
+        self.assertTrue(all(client is created[0] for client in clients))
+
+        # Concurrent directory syncs are coalesced.
+        threads = [threading.Thread(target=robot.sync_with_directory) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        num_listed = len(listed)
+        self.assertLessEqual(num_listed, 3)
+        robot.sync_with_directory()
+        self.assertEqual(len(listed), num_listed + 1)
+
     def test_load_robot_cert(self):
         sdk = bosdyn.client.Sdk()
         sdk.load_robot_cert()
@@ -121,6 +200,39 @@ Spam, Spam, Spam, Spam!
         # App tokens are deprecated, test that not loading a token does not throw an exception
         sdk.load_app_token(None)
 
+    def test_standard_sdk_clients(self):
+        sdk = bosdyn.client.create_standard_sdk('test', [ServiceClientMock])
+        self.assertEqual(len(sdk.service_client_factories_by_type),
+                         len(bosdyn.client.sdk._DEFAULT_SERVICE_CLIENTS) + 1)
+        for service_name, service_type, _, _ in bosdyn.client.sdk._DEFAULT_SERVICE_CLIENTS:
+            self.assertEqual(sdk.service_type_by_name[service_name], service_type)
+            client = sdk.service_client_factories_by_type[service_type]()
+            self.assertEqual(client.default_service_name, service_name)
+            self.assertEqual(client.service_type, service_type)
+        # Extra clients are not added to the defaults of later sdks.
+        sdk = bosdyn.client.create_standard_sdk('test')
+        self.assertNotIn('mock', sdk.service_type_by_name)
+
+    def test_import_is_lazy(self):
+        code = ('import sys\n'
+                'import bosdyn.client\n'
+                'sdk = bosdyn.client.create_standard_sdk("test")\n'
+                'for module in ("numpy", "jwt", "pkg_resources", "bosdyn.client.robot_command"):\n'
+                '    assert module not in sys.modules, module\n'
+                'import bosdyn.client.math_helpers\n')
+        subprocess.check_call([sys.executable, '-c', code],
+                              env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+        # Submodules are still accessible as attributes of the package.
+        self.assertEqual(bosdyn.client.robot_command.RobotCommandClient.default_service_name,
+                         'robot-command')
+        # Unknown names are not imported.
+        with mock.patch('importlib.import_module') as import_module:
+            with self.assertRaises(AttributeError):
+                bosdyn.client.no_such_attribute
+            with self.assertRaises(AttributeError):
+                bosdyn.client.robot_comand
+            import_module.assert_not_called()
+
 
 
 if __name__ == '__main__':
@@ -10,6 +10,7 @@ import time
 import grpc
 import pytest
 
+import bosdyn.client.common
 import bosdyn.client.spot_cam.media_log
 from bosdyn.api.spot_cam import camera_pb2, logging_pb2, service_pb2_grpc
 from bosdyn.client.exceptions import TimedOutError
@@ -23,6 +24,7 @@ class MockMediaLogService(service_pb2_grpc.MediaLogServiceServicer):
         """Create mock that returns fake media."""
         super(MockMediaLogService, self).__init__()
         self._rpc_delay = rpc_delay
+        self.retrieve_data = logging_pb2.Logpoint()
 
     def Delete(self, request, context):
         time.sleep(self._rpc_delay)
@@ -63,10 +65,14 @@ class MockMediaLogService(service_pb2_grpc.MediaLogServiceServicer):
     def Retrieve(self, request, context):
         time.sleep(self._rpc_delay)
 
-        response = logging_pb2.RetrieveResponse()
-        helpers.add_common_header(response, request)
-        response.logpoint.CopyFrom(request.point)
-        yield response
+        chunks = list(bosdyn.client.common.BaseClient.chunk_message(self.retrieve_data, 10))
+        for chunk in chunks or [None]:
+            response = logging_pb2.RetrieveResponse()
+            helpers.add_common_header(response, request)
+            response.logpoint.CopyFrom(request.point)
+            if chunk is not None:
+                response.data.CopyFrom(chunk)
+            yield response
 
     def RetrieveRawData(self, request, context):
         time.sleep(self._rpc_delay)
@@ -199,6 +205,25 @@ def test_retrieve():
     assert len(image_binary) == 0
 
 
+def test_retrieve_async():
+    client, service, server = _setup()
+    completed_lp = _create_fake_logpoint()
+    lp, image_binary = client.retrieve_async(completed_lp).result()
+    assert lp.SerializeToString() == completed_lp.SerializeToString()
+    assert len(image_binary) == 0
+
+    # Data streamed in chunks is reassembled.
+    service.retrieve_data = completed_lp
+    progress = []
+    future = client.retrieve_async(completed_lp,
+                                   progress_cb=lambda *args: progress.append(args))
+    lp, image_binary = future.result()
+    expected = completed_lp.SerializeToString()
+    assert image_binary == expected
+    assert progress[-1] == (len(expected), len(expected))
+    assert len(progress) == len(range(0, len(expected), 10))
+
+
 def test_retrieve_raw_data():
     client, service, server = _setup()
     completed_lp = _create_fake_logpoint()
@@ -10,7 +10,9 @@
 
 # pylint: disable=unused-import
 from .common import (LOGGER, PROTOBUF_CONTENT_TYPE, AddSeriesError, ChecksumError, DataError,
-                     DataFormatError, ParseError, SeriesNotUniqueError)
+                     DataFormatError, ParseError, SeriesNotUniqueError, WriteQueueFullError)
+# Class for writing data to a file from a background thread.
+from .async_data_writer import AsyncDataWriter
 # Class for reading data from a file-like object which is seekable.
 from .data_reader import DataReader
 # Class for writing data to a file.
@@ -19,8 +21,14 @@ from .data_writer import DataWriter
 from .grpc_reader import GrpcReader
 # Class for registering a series which stores GRPC request/response pairs.
 from .grpc_service_writer import GrpcServiceWriter
+# A persistent catalog of the indexes of many data files, stored in SQLite.
+from .index_catalog import IndexCatalog
+# A class for reading messages from many data files, merged in time order.
+from .merged_log_reader import MergedLogReader
 # A class for reading message data from a DataFile.
 from .message_reader import MessageReader
+# Decode messages from data files in parallel worker processes.
+from .parallel_scan import parallel_scan
 # Class for reading a series of POD data from a DataFile.
 from .pod_series_reader import PodSeriesReader
 # Class which assists with writing POD data values into a series, within a DataWriter.
@@ -0,0 +1,252 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""AsyncDataWriter is a DataWriter which writes to the file from a background thread."""
+
+import collections
+import threading
+
+from .common import LOGGER, WriteQueueFullError
+from .data_writer import DataWriter
+
+# Default limit on the number of bytes of data waiting in the queue.
+DEFAULT_MAX_QUEUE_BYTES = 64 * 1024**2
+
+# Default size of the writes made to the output file.
+DEFAULT_COALESCE_BYTES = 1024**2
+
+
+class _CoalescingFile:
+    """Collects small writes into a buffer which is written to the output file in one call."""
+
+    def __init__(self, outfile, coalesce_bytes):
+        self._outfile = outfile
+        self._offset = outfile.tell()
+        self._buffer = bytearray()
+        self._coalesce_bytes = coalesce_bytes
+
+    def tell(self):
+        """Return location from start of file, including buffered data."""
+        return self._offset + len(self._buffer)
+
+    def write(self, data):
+        """Write data, buffering it unless the buffer is full or data is large."""
+        if len(data) >= self._coalesce_bytes:
+            self.flush_buffer()
+            self._outfile.write(data)
+            self._offset += len(data)
+            return
+        self._buffer += data
+        if len(self._buffer) >= self._coalesce_bytes:
+            self.flush_buffer()
+
+    def flush_buffer(self):
+        """Write buffered data to the output file."""
+        if not self._buffer:
+            return
+        self._outfile.write(self._buffer)
+        self._offset += len(self._buffer)
+        self._buffer = bytearray()
+
+    def flush(self):
+        """Write buffered data and flush the output file."""
+        self.flush_buffer()
+        if hasattr(self._outfile, 'flush'):
+            self._outfile.flush()
+
+    def close(self):
+        """Write buffered data and close the output file."""
+        self.flush_buffer()
+        self._outfile.close()
+
+
+class AsyncDataWriter(DataWriter):  # pylint: disable=too-many-instance-attributes
+    """A DataWriter which writes to the file from a background thread.
+
+    write_data() only validates the data and adds it to a bounded in-memory queue.  A background
+    thread compresses and indexes the queued blocks, computes the file checksum and writes them
+    to the file, coalescing many blocks into each write call.  The resulting file is
+    byte-for-byte the same as one written by DataWriter, unless blocks are dropped by the
+    DROP_OLDEST policy.
+
+    When more than max_queue_bytes of data is waiting to be written, counting both the queue and
+    the batch of blocks the background thread is writing, the overflow_policy decides what
+    happens to a new block:
+     BLOCK:       wait until the background thread makes room in the queue.
+     DROP_OLDEST: drop the oldest queued data blocks to make room.  Blocks which the background
+                  thread is already writing cannot be dropped.
+     ERROR:       raise WriteQueueFullError.
+    """
+
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    ERROR = 'error'
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, outfile, annotations=None, max_queue_bytes=DEFAULT_MAX_QUEUE_BYTES,
+                 overflow_policy=BLOCK, coalesce_bytes=DEFAULT_COALESCE_BYTES):
+        """
+        Args:
+         outfile:         a file-like objet for writing binary data (e.g., from open(fname, 'wb')).
+         annotations:     optional dict of key (string) -> value (string) pairs.
+         max_queue_bytes: limit on the number of bytes of data waiting to be written.
+         overflow_policy: BLOCK, DROP_OLDEST or ERROR, for when the queue is full.
+         coalesce_bytes:  size of the writes made to outfile.
+        """
+        self._thread = None
+        if overflow_policy not in (self.BLOCK, self.DROP_OLDEST, self.ERROR):
+            raise ValueError("Unknown overflow_policy '{}'".format(overflow_policy))
+        self._max_queue_bytes = max_queue_bytes
+        self._overflow_policy = overflow_policy
+        self._queue = collections.deque()  # (series_index, timestamp, desc, data, indexes)
+        self._queue_bytes = 0
+        self._batch_bytes = 0  # Bytes of data in the batch the background thread is writing.
+        self._num_dropped = 0
+        self._busy = False  # True while the background thread is writing a batch of blocks.
+        self._stopping = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._io_lock = threading.Lock()  # Held while writing to the file.
+        self._coalescing_file = _CoalescingFile(outfile, coalesce_bytes)
+        super(AsyncDataWriter, self).__init__(self._coalescing_file, annotations)
+        self._thread = threading.Thread(name='bddf_writer', target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def num_dropped(self):
+        """Number of data blocks dropped because the queue was full."""
+        return self._num_dropped
+
+    @property
+    def queue_bytes(self):
+        """Number of bytes of data currently waiting in the queue."""
+        return self._queue_bytes
+
+    def add_series(self, series_type, series_spec, message_type=None, pod_type=None,
+                   annotations=None, additional_index_names=None, compression=None):
+        """Register a new series for messages.  See DataWriter.add_series().
+
+        Data queued before the series is added is written to the file first.
+        """
+        self._wait_for_idle()
+        with self._io_lock:
+            return super(AsyncDataWriter, self).add_series(series_type, series_spec,
+                                                           message_type, pod_type, annotations,
+                                                           additional_index_names, compression)
+
+    def write_data(self, series_index, timestamp_nsec, data, additional_indexes=None):
+        """Queue binary data to be stored in the file, under a previously-defined channel.
+
+        Args:
+         series_index:   integer returned when series was registered with the file.
+         timestamp_nsec: nsec since unix epoch to timestamp the data.
+         data:           binary data to store.
+         additional_indexes: additional timestamps if needed for this channel.
+
+        Raises:
+            DataFormatError if the data or additional_indexes are not valid for this series.
+            WriteQueueFullError if the queue is full and overflow_policy is ERROR.
+            Any error raised while writing previously queued data.
+        """
+        self._raise_error()
+        data_descriptor = self._indexer.make_data_descriptor(series_index, timestamp_nsec,
+                                                             additional_indexes)
+        data = bytes(data)  # The caller may reuse its buffer once this returns.
+        with self._condition:
+            self._make_room(len(data))
+            self._queue.append((series_index, timestamp_nsec, data_descriptor, data,
+                                additional_indexes))
+            self._queue_bytes += len(data)
+            self._condition.notify_all()
+
+    def flush(self):
+        """Wait until all queued data is written, then flush the file."""
+        self._wait_for_idle()
+        self._raise_error()
+        with self._io_lock:
+            self._coalescing_file.flush()
+
+    def _make_room(self, nbytes):
+        if not self._max_queue_bytes:
+            return
+
+        def _is_full():
+            # A block larger than the limit is accepted once nothing else is waiting.
+            pending_bytes = self._queue_bytes + self._batch_bytes
+            return pending_bytes > 0 and pending_bytes + nbytes > self._max_queue_bytes
+
+        if self._overflow_policy == self.BLOCK:
+            self._condition.wait_for(lambda: not _is_full() or self._error is not None)
+            self._raise_error()
+        elif self._overflow_policy == self.DROP_OLDEST:
+            while self._queue and _is_full():
+                dropped = self._queue.popleft()
+                self._queue_bytes -= len(dropped[3])
+                self._num_dropped += 1
+        elif _is_full():
+            raise WriteQueueFullError('{} bytes already waiting to be written, limit is {}'.format(
+                self._queue_bytes + self._batch_bytes, self._max_queue_bytes))
+
+    def _wait_for_idle(self):
+        with self._condition:
+            self._condition.wait_for(lambda: (not self._queue and not self._busy) or
+                                     self._error is not None)
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                batch = self._queue
+                self._queue = collections.deque()
+                # The batch still counts against max_queue_bytes until it is written.
+                self._batch_bytes = self._queue_bytes
+                self._queue_bytes = 0
+                self._busy = True
+                self._condition.notify_all()
+            try:
+                with self._io_lock:
+                    for series_index, timestamp_nsec, data_descriptor, data, indexes in batch:
+                        data = self._compress(series_index, data)
+                        self._indexer.index_data_block(series_index, timestamp_nsec,
+                                                       self._writer.tell(), len(data), indexes)
+                        self._writer.write_data_block(data_descriptor, data)
+                    self._coalescing_file.flush_buffer()
+            except Exception as err:  # pylint: disable=broad-except
+                LOGGER.exception("Failed writing bddf data")
+                with self._condition:
+                    self._error = err
+                    self._batch_bytes = 0
+                    self._busy = False
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self._batch_bytes = 0
+                self._busy = False
+                self._condition.notify_all()
+
+    def _close(self):
+        if self._thread is None or self._writer.closed:
+            return  # Never started, or already closed.
+        for thunk in self._on_close:
+            thunk()
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+        with self._io_lock:
+            try:
+                if self._error is None:
+                    self._indexer.write_index(self._writer)
+            finally:
+                self._writer.close()
+        self._raise_error()
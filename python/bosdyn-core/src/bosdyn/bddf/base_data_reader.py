@@ -104,10 +104,14 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
     def _read(self, nbytes):
         assert nbytes
         block = self._file.read(nbytes)
-        if not block:
+        if len(block) < nbytes:
             raise EOFError("Unexpected end of bddf file")
         return block
 
+    def _unpack(self, fmt, nbytes):
+        """Read nbytes and unpack them according to the struct format fmt."""
+        return struct.unpack(fmt, self._read(nbytes))
+
     def _read_header(self):
         magic = self._read(len(MAGIC))
         if magic != MAGIC:
@@ -153,11 +157,11 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
         return getattr(desc, descriptor_type_name)
 
     def _read_block(self):
-        (block_header,) = struct.unpack('<Q', self._read(8))
+        (block_header,) = self._unpack('<Q', 8)
         block_size = block_header & BLOCK_HEADER_SIZE_MASK
         block_type = (block_header & BLOCK_HEADER_TYPE_MASK) >> 56
         if block_type == END_BLOCK_TYPE:
-            self._index_offset = struct.unpack('<Q', self._read(8))[0]
+            self._index_offset = self._unpack('<Q', 8)[0]
             self._read_checksum = self._computed_checksum()  # pylint: disable=assignment-from-none
             self._checksum = self._read(self._file_descriptor.checksum_num_bytes)
             self._eof = True
@@ -175,7 +179,7 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
                     DESCRIPTOR_BLOCK_TYPE, block_type))
             return is_data_block, self._read_proto(bddf.DescriptorBlock, block_size), None
 
-        (desc_size,) = struct.unpack('<I', self._read(4))
+        (desc_size,) = self._unpack('<I', 4)
         if desc_size > block_size:
             raise ParseError("Data block descriptor size {} > block size {}.".format(
                 desc_size, block_size))
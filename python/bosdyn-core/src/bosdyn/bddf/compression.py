@@ -0,0 +1,68 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Compression of the data blocks of a series."""
+import zlib
+
+from .common import DataFormatError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Series annotation naming the compression applied to each data block of the series.
+COMPRESSION_ANNOTATION = 'bosdyn:compression'
+
+ZLIB = 'zlib'
+ZSTD = 'zstd'
+LZ4 = 'lz4'
+
+
+def available_compressions():
+    """Return the names of the compression methods which can be used in this environment."""
+    names = [ZLIB]
+    if zstandard is not None:
+        names.append(ZSTD)
+    if lz4 is not None:
+        names.append(LZ4)
+    return names
+
+
+def _codec(name):
+    """Return (compress, decompress) functions for the named compression method."""
+    if name == ZLIB:
+        return zlib.compress, zlib.decompress
+    if name == ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+    if name == LZ4 and lz4 is not None:
+        return lz4.frame.compress, lz4.frame.decompress
+    raise DataFormatError("Compression '{}' is not supported (available: {})".format(
+        name, ', '.join(available_compressions())))
+
+
+def compressor(name):
+    """Return a function which compresses bytes with the named compression method.
+
+    Raises DataFormatError if the compression method is unknown or not installed.
+    """
+    return _codec(name)[0]
+
+
+def decompressor(series_descriptor):
+    """Return a function which decompresses the data blocks of a series, or None if uncompressed.
+
+    Raises DataFormatError if the compression method is unknown or not installed.
+    """
+    name = series_descriptor.annotations.get(COMPRESSION_ANNOTATION)
+    if not name:
+        return None
+    return _codec(name)[1]
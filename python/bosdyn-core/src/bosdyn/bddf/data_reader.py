@@ -5,32 +5,53 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Class for reading data from a file-like object which is seekable."""
+import io
+import mmap
 import os
 import struct
 
+import numpy as np
+
 from .base_data_reader import BaseDataReader
-from .common import END_MAGIC, INDEX_OFFSET_OFFSET, MAGIC, ParseError
+from .compression import decompressor
+from .common import END_MAGIC, INDEX_OFFSET_OFFSET, LOGGER, MAGIC, ParseError
 
 
 class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attributes
     """Class for reading data from a file-like object which is seekable.
 
     Methods raise ParseError if there is a problem with the format of the file.
+
+    If use_mmap is True, the file is memory-mapped and block headers are parsed directly out
+    of the mapping.  In this mode, the data returned by read() is a memoryview into the
+    mapping rather than a copy of the bytes, and it remains valid as long as it is referenced.
     """
 
-    def __init__(self, infile=None, filename=None):
+    def __init__(self, infile=None, filename=None, use_mmap=False):
         """
         At least one of the following arguments must be specified.
 
         Args:
          infile:      binary file-like object for reading (e.g., from open(fname, "rb")).
          filename:    path of input file, if applicable.
+         use_mmap:    if True, memory-map the file and return data blocks as memoryviews.
         """
+        self._use_mmap = use_mmap
+        self._mmap = None
+        self._view = None  # memoryview over self._mmap, when memory-mapped.
+        self._position = 0  # Read location within self._view, when memory-mapped.
         super(DataReader, self).__init__(infile, filename)
         self._series_index_to_descriptor = {}
         self._series_index_to_block_index = {}  # {series_index -> SeriesBlockIndex}
+        self._series_index_to_timestamps = {}  # {series_index -> (timestamps, time order)}
+        self._series_index_to_decompressor = {}
         self._read_index()
 
+    @property
+    def is_memory_mapped(self):
+        """Returns True if the file is being read through a memory-map."""
+        return self._view is not None
+
     def series_descriptor(self, series_index):
         """Return SeriesDescriptor for given series index, loading it if necessary."""
         try:
@@ -59,15 +80,28 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
          series_index: int selecting from which series to read the message.
          index_in_series: The index number of the message within the channel.
 
-        Returns: DataTypeDescriptor for channel, timestamp_nsec (int), message-data (bytes)
+        Returns: DataTypeDescriptor for channel, timestamp_nsec (int), message-data (bytes,
+                  or memoryview if the file is memory-mapped and the series is uncompressed)
 
         Raises ParseError if there is a problem with the format of the file.
         """
         series_block_index = self.series_block_index(series_index)
         msg_idx = series_block_index.block_entries[index_in_series]
         desc, data = self._read_data_block_at(msg_idx.file_offset)
+        decompress = self._decompressor(series_index)
+        if decompress is not None:
+            data = decompress(data)
         return desc, msg_idx.timestamp.ToNanoseconds(), data
 
+    def _decompressor(self, series_index):
+        try:
+            return self._series_index_to_decompressor[series_index]
+        except KeyError:
+            pass
+        decompress = decompressor(self.series_descriptor(series_index))
+        self._series_index_to_decompressor[series_index] = decompress
+        return decompress
+
     def series_block_index(self, series_index):
         """Returns the SeriesBlockIndexes for the given series_index, loading it as needed."""
         try:
@@ -80,13 +114,139 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
         self._series_index_to_block_index[series_index] = block_index
         return block_index
 
+    def series_timestamps(self, series_index):
+        """Returns the timestamps (nsec) of the data blocks of a series, as an int64 numpy array.
+
+        The array is built from the SeriesBlockIndex the first time it is requested.
+        """
+        return self._timestamp_index(series_index)[0]
+
+    def find_index(self, series_index, timestamp_nsec):
+        """Return the index of the first data block in the series at or after timestamp_nsec.
+
+        Timestamps in a series are expected to be non-decreasing, as they are when data is
+        written in time order.  Otherwise the blocks are searched in timestamp order.
+
+        Returns num_data_blocks(series_index) if all blocks are before timestamp_nsec.
+        """
+        timestamps, order = self._timestamp_index(series_index)
+        if order is None:
+            return int(np.searchsorted(timestamps, timestamp_nsec, side='left'))
+        position = int(np.searchsorted(timestamps[order], timestamp_nsec, side='left'))
+        if position == len(order):
+            return position
+        return int(order[position])
+
+    def index_range(self, series_index, start_nsec=None, end_nsec=None):
+        """Return the indexes of data blocks with start_nsec <= timestamp < end_nsec, in time order.
+
+        Args:
+         series_index: int selecting the series.
+         start_nsec:   start of the time window (inclusive), or None for the start of the series.
+         end_nsec:     end of the time window (exclusive), or None for the end of the series.
+
+        Returns: sequence of index_in_series values (ints).
+        """
+        timestamps, order = self._timestamp_index(series_index)
+        sorted_timestamps = timestamps if order is None else timestamps[order]
+        start = 0 if start_nsec is None else int(
+            np.searchsorted(sorted_timestamps, start_nsec, side='left'))
+        end = len(timestamps) if end_nsec is None else int(
+            np.searchsorted(sorted_timestamps, end_nsec, side='left'))
+        if order is None:
+            return range(start, max(start, end))
+        return [int(index) for index in order[start:end]]
+
+    def read_range(self, series_index, start_nsec=None, end_nsec=None):
+        """Generator of data blocks with start_nsec <= timestamp < end_nsec, in time order.
+
+        Args:
+         series_index: int selecting the series.
+         start_nsec:   start of the time window (inclusive), or None for the start of the series.
+         end_nsec:     end of the time window (exclusive), or None for the end of the series.
+
+        Yields: DataTypeDescriptor for channel, timestamp_nsec (int), message-data, as read().
+        """
+        for index_in_series in self.index_range(series_index, start_nsec, end_nsec):
+            yield self.read(series_index, index_in_series)
+
+    def _timestamp_index(self, series_index):
+        try:
+            return self._series_index_to_timestamps[series_index]
+        except KeyError:
+            pass
+        block_entries = self.series_block_index(series_index).block_entries
+        timestamps = np.fromiter(
+            (entry.timestamp.seconds * 1000000000 + entry.timestamp.nanos
+             for entry in block_entries), dtype=np.int64, count=len(block_entries))
+        order = None
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+        self._series_index_to_timestamps[series_index] = (timestamps, order)
+        return timestamps, order
+
+    def _map_file(self):
+        try:
+            fileno = self._file.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            raise ValueError("use_mmap requires a file object with a fileno()")
+        self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._position = 0
+
+    def _read_header(self):
+        if self._use_mmap:
+            self._map_file()
+        super(DataReader, self)._read_header()
+
+    def _close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Data blocks returned to the caller still reference the mapping.
+                # It will be unmapped once they are garbage collected.
+                LOGGER.debug("Memory-mapped data still referenced when closing %s",
+                             self._filename)
+            self._mmap = None
+        super(DataReader, self)._close()
+
+    def _read(self, nbytes):
+        if self._view is None:
+            return super(DataReader, self)._read(nbytes)
+        assert nbytes
+        end = self._position + nbytes
+        if end > len(self._view):
+            raise EOFError("Unexpected end of bddf file")
+        block = self._view[self._position:end]
+        self._position = end
+        return block
+
+    def _unpack(self, fmt, nbytes):
+        if self._view is None:
+            return super(DataReader, self)._unpack(fmt, nbytes)
+        end = self._position + nbytes
+        if end > len(self._view):
+            raise EOFError("Unexpected end of bddf file")
+        values = struct.unpack_from(fmt, self._view, self._position)
+        self._position = end
+        return values
+
+    def _seek_from_end(self, nbytes):
+        if self._view is None:
+            self._file.seek(-nbytes, os.SEEK_END)
+        else:
+            self._position = len(self._view) - nbytes
+
     def _read_index(self):
-        self._file.seek(-len(END_MAGIC), os.SEEK_END)
+        self._seek_from_end(len(END_MAGIC))
         end_magic = self._read(len(END_MAGIC))
         if end_magic != END_MAGIC:
             raise ParseError("Bad magic bytes at the end of the file.")
-        self._file.seek(-INDEX_OFFSET_OFFSET, os.SEEK_END)
-        self._index_offset, self._checksum = struct.unpack('<QQ', self._read(16))
+        self._seek_from_end(INDEX_OFFSET_OFFSET)
+        self._index_offset, self._checksum = self._unpack('<QQ', 16)
         if self._index_offset < len(MAGIC):
             raise ParseError('Invalid offset to index: {})'.format(self._index_offset))
         self._file_index = self._read_desc_block_at("file_index", self._index_offset)
@@ -97,7 +257,10 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
     def _seek_to(self, location):
         if location < len(MAGIC):
             raise ParseError('Invalid offset for block: {})'.format(location))
-        self._file.seek(location)
+        if self._view is None:
+            self._file.seek(location)
+        else:
+            self._position = location
 
     def _read_data_block_at(self, location):
         self._seek_to(location)
@@ -9,6 +9,7 @@
 import bosdyn.api.bddf_pb2 as bddf
 
 from .block_writer import BlockWriter
+from .compression import COMPRESSION_ANNOTATION, compressor
 from .file_indexer import FileIndexer
 
 
@@ -28,6 +29,7 @@ class DataWriter:
         self._annotations = annotations
         self._writer.write_header(annotations)
         self._on_close = []
+        self._series_index_to_compressor = {}
 
     def __del__(self):
         self._close()
@@ -44,7 +46,8 @@ class DataWriter:
         return self._indexer.file_index
 
     def add_message_series(self, series_type, series_spec, content_type, type_name,
-                           is_metadata=False, annotations=None, additional_index_names=None):
+                           is_metadata=False, annotations=None, additional_index_names=None,
+                           compression=None):
         """Add a new series for storing message data.  Message data is variable-sized binary data.
 
         Args:
@@ -59,6 +62,8 @@ class DataWriter:
                           associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         compression:   name of the compression applied to each data block (e.g., 'zlib'),
+                          or None to store data uncompressed.
 
         Returns series id (int).
         """
@@ -66,9 +71,11 @@ class DataWriter:
                                                   is_metadata=is_metadata)
         return self.add_series(series_type, series_spec, message_type=message_type,
                                annotations=annotations,
-                               additional_index_names=additional_index_names)
+                               additional_index_names=additional_index_names,
+                               compression=compression)
 
-    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None):
+    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None,
+                       compression=None):
         """Add a new series for storing data POD data (float, double, int, etc....).
 
         Args:
@@ -79,14 +86,17 @@ class DataWriter:
                            [3] means vectors of size 3, [4, 4] is a 4x4 matrix, etc....
          annotations:   optional dict of key (string) -> value (string) pairs to
                             associate with the message channel
+         compression:   name of the compression applied to each data block (e.g., 'zlib'),
+                          or None to store data uncompressed.
 
         Returns series id (int).
         """
         pod_type = bddf.PodTypeDescriptor(pod_type=type_enum, dimension=dimension)
-        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations)
+        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations,
+                               compression=compression)
 
     def add_series(self, series_type, series_spec, message_type=None, pod_type=None,
-                   annotations=None, additional_index_names=None):
+                   annotations=None, additional_index_names=None, compression=None):
         """Register a new series for messages.
 
         Args:
@@ -98,13 +108,26 @@ class DataWriter:
                             associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         compression:   name of the compression applied to each data block (e.g., 'zlib'),
+                          or None to store data uncompressed.  The name is stored in the
+                          'bosdyn:compression' series annotation, and readers decompress
+                          the data transparently.
 
         Returns series id (int).
 
-        Raises SeriesNotUniqueError if a series matching series_spec is already added.
+        Raises SeriesNotUniqueError if a series matching series_spec is already added,
+               DataFormatError if the compression is not supported.
         """
-        return self._indexer.add_series(series_type, series_spec, message_type, pod_type,
-                                        annotations, additional_index_names, self._writer)
+        compress = None
+        if compression:
+            compress = compressor(compression)
+            annotations = dict(annotations or {})
+            annotations[COMPRESSION_ANNOTATION] = compression
+        series_index = self._indexer.add_series(series_type, series_spec, message_type, pod_type,
+                                                annotations, additional_index_names, self._writer)
+        if compress:
+            self._series_index_to_compressor[series_index] = compress
+        return series_index
 
     def write_data(self, series_index, timestamp_nsec, data, additional_indexes=None):
         """Store binary data into the file, under a previously-defined channel.
@@ -118,12 +141,19 @@ class DataWriter:
         Raises:
             DataFormatError if the data or additional_indexes are not valid for this series.
         """
+        data = self._compress(series_index, data)
         self._indexer.index_data_block(series_index, timestamp_nsec, self._writer.tell(), len(data),
                                        additional_indexes)
         data_descriptor = self._indexer.make_data_descriptor(series_index, timestamp_nsec,
                                                              additional_indexes)
         self._writer.write_data_block(data_descriptor, data)
 
+    def _compress(self, series_index, data):
+        compress = self._series_index_to_compressor.get(series_index)
+        if compress is None:
+            return data
+        return compress(data)
+
     def run_on_close(self, thunk):
         """Register a function to be called when file is closed, before index is written."""
         self._on_close.append(thunk)
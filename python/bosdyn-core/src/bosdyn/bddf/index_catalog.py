@@ -0,0 +1,250 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""A persistent catalog of the indexes of many data files, stored in SQLite."""
+import glob
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from .common import END_MAGIC, SHA1_DIGEST_NBYTES
+from .data_reader import DataReader
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    checksum BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    series_index INTEGER NOT NULL,
+    series_type TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    channel TEXT,
+    type_name TEXT,
+    num_blocks INTEGER NOT NULL,
+    total_bytes INTEGER NOT NULL,
+    start_nsec INTEGER,
+    end_nsec INTEGER,
+    timestamps BLOB NOT NULL,
+    file_offsets BLOB NOT NULL,
+    PRIMARY KEY (file_id, series_index)
+);
+CREATE INDEX IF NOT EXISTS series_channel ON series (channel);
+"""
+
+
+def _file_checksum(filename):
+    """Return the checksum stored at the end of a data file."""
+    with open(filename, 'rb') as infile:
+        infile.seek(-(SHA1_DIGEST_NBYTES + len(END_MAGIC)), os.SEEK_END)
+        return infile.read(SHA1_DIGEST_NBYTES)
+
+
+class IndexCatalog:
+    """A persistent catalog of the indexes of many data files, stored in SQLite.
+
+    For each data file, the catalog stores the series specs and message type names, and the
+    timestamps and file offsets of all data blocks as compact int64/uint64 arrays.  Which files
+    contain data for a channel within a time window can then be answered from the catalog
+    without opening the data files.
+
+    Entries are validated against the size and modification time of the data file.  If only
+    the modification time changed, the checksum at the end of the file is compared.
+    """
+
+    def __init__(self, catalog_filename):
+        """
+        Args:
+         catalog_filename:  path of the SQLite database file (':memory:' for a temporary one).
+        """
+        self._db = sqlite3.connect(catalog_filename)
+        self._db.execute('PRAGMA foreign_keys = ON')
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value_, tb_):
+        self.close()
+
+    def close(self):
+        """Close the catalog database."""
+        if self._db is None:
+            return
+        self._db.close()
+        self._db = None
+
+    def is_current(self, filename):
+        """Returns True if the catalog has a valid entry for the data file.
+
+        Returns False if the data file no longer exists.
+        """
+        path = os.path.abspath(filename)
+        row = self._db.execute('SELECT id, size, mtime_ns, checksum FROM files WHERE path = ?',
+                               (path,)).fetchone()
+        if row is None:
+            return False
+        file_id, size, mtime_ns, checksum = row
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns == mtime_ns:
+            return True
+        if _file_checksum(path) != checksum:
+            return False
+        with self._db:
+            self._db.execute('UPDATE files SET mtime_ns = ? WHERE id = ?',
+                             (stat.st_mtime_ns, file_id))
+        return True
+
+    def index_file(self, filename):
+        """Add the index of a data file to the catalog, unless it already has a valid entry.
+
+        Returns True if the file was (re)indexed, False if the catalog entry was current.
+
+        Raises ParseError if there is a problem with the format of the file.
+        Raises FileNotFoundError if the file does not exist, after removing its catalog entry.
+        """
+        if self.is_current(filename):
+            return False
+        path = os.path.abspath(filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with self._db:
+                self._db.execute('DELETE FROM files WHERE path = ?', (path,))
+            raise
+        rows = []
+        with DataReader(filename=path) as data_reader:
+            for series_index, series_identifier in enumerate(
+                    data_reader.file_index.series_identifiers):
+                series_descriptor = data_reader.series_descriptor(series_index)
+                block_index = data_reader.series_block_index(series_index)
+                timestamps = data_reader.series_timestamps(series_index)
+                file_offsets = np.fromiter(
+                    (entry.file_offset for entry in block_index.block_entries), dtype=np.uint64,
+                    count=len(block_index.block_entries))
+                spec = dict(series_identifier.spec)
+                type_name = None
+                if series_descriptor.WhichOneof("DataType") == "message_type":
+                    type_name = series_descriptor.message_type.type_name
+                rows.append(
+                    (series_index, series_identifier.series_type, json.dumps(spec, sort_keys=True),
+                     spec.get('bosdyn:channel'), type_name, len(timestamps),
+                     block_index.total_bytes,
+                     int(timestamps.min()) if len(timestamps) else None,
+                     int(timestamps.max()) if len(timestamps) else None,
+                     timestamps.astype('<i8').tobytes(), file_offsets.astype('<u8').tobytes()))
+        checksum = _file_checksum(path)
+        with self._db:
+            self._db.execute('DELETE FROM files WHERE path = ?', (path,))
+            file_id = self._db.execute(
+                'INSERT INTO files (path, size, mtime_ns, checksum) VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, checksum)).lastrowid
+            self._db.executemany(
+                'INSERT INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(file_id,) + row for row in rows])
+        return True
+
+    def index_directory(self, directory, pattern='*.bddf', recursive=False):
+        """Add the indexes of all data files in a directory which match pattern.
+
+        Returns the list of matching filenames.
+        """
+        if recursive:
+            filenames = glob.glob(os.path.join(directory, '**', pattern), recursive=True)
+        else:
+            filenames = glob.glob(os.path.join(directory, pattern))
+        filenames.sort()
+        for filename in filenames:
+            self.index_file(filename)
+        return filenames
+
+    def prune(self):
+        """Remove entries for data files which no longer exist.  Returns the removed paths."""
+        removed = [
+            path for (path,) in self._db.execute('SELECT path FROM files')
+            if not os.path.exists(path)
+        ]
+        with self._db:
+            self._db.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in removed])
+        return removed
+
+    def find_series(self, channel=None, series_type=None, start_nsec=None, end_nsec=None):
+        """Find series with data blocks in a time window.
+
+        Args:
+         channel:      channel name ('bosdyn:channel' in the series spec), or None for any.
+         series_type:  series type, or None for any.
+         start_nsec:   start of the time window (inclusive), or None for no limit.
+         end_nsec:     end of the time window (exclusive), or None for no limit.
+
+        Returns: list of (path, series_index, series_spec dict).
+        """
+        query = ('SELECT path, series_index, spec, timestamps FROM series '
+                 'JOIN files ON files.id = series.file_id WHERE num_blocks > 0')
+        params = []
+        if channel is not None:
+            query += ' AND channel = ?'
+            params.append(channel)
+        if series_type is not None:
+            query += ' AND series_type = ?'
+            params.append(series_type)
+        if start_nsec is not None:
+            query += ' AND end_nsec >= ?'
+            params.append(start_nsec)
+        if end_nsec is not None:
+            query += ' AND start_nsec < ?'
+            params.append(end_nsec)
+        query += ' ORDER BY path, series_index'
+        results = []
+        for path, series_index, spec, timestamps in self._db.execute(query, params):
+            if start_nsec is not None and end_nsec is not None:
+                # The series spans the window, but there may be no block within it.
+                timestamps = np.frombuffer(timestamps, dtype='<i8')
+                inside = (timestamps >= start_nsec) & (timestamps < end_nsec)
+                if not inside.any():
+                    continue
+            results.append((path, series_index, json.loads(spec)))
+        return results
+
+    def find_files(self, channel=None, series_type=None, start_nsec=None, end_nsec=None):
+        """Find data files with data blocks in a time window.  Arguments are as find_series().
+
+        Returns: sorted list of paths.
+        """
+        return sorted({
+            path for path, _series_index, _spec in self.find_series(
+                channel, series_type, start_nsec, end_nsec)
+        })
+
+    def series_timestamps(self, filename, series_index):
+        """Return the timestamps (nsec) of the data blocks of a series, as an int64 array."""
+        return np.frombuffer(self._series_column(filename, series_index, 'timestamps'),
+                             dtype='<i8')
+
+    def block_file_offsets(self, filename, series_index):
+        """Return the file offsets of the data blocks of a series, as a uint64 array."""
+        return np.frombuffer(self._series_column(filename, series_index, 'file_offsets'),
+                             dtype='<u8')
+
+    def _series_column(self, filename, series_index, column):
+        row = self._db.execute(
+            'SELECT {} FROM series JOIN files ON files.id = series.file_id '
+            'WHERE path = ? AND series_index = ?'.format(column),
+            (os.path.abspath(filename), series_index)).fetchone()
+        if row is None:
+            raise KeyError('No series {} for {} in the catalog'.format(series_index, filename))
+        return row[0]
@@ -0,0 +1,139 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""A class for reading messages from many data files, merged in time order."""
+import heapq
+
+from .data_reader import DataReader
+
+
+class _ChannelStream:  # pylint: disable=too-few-public-methods
+    """The messages of one channel in one file, within the requested time window."""
+
+    def __init__(self, data_reader, series_index, channel_name, protobuf_type, indexes):
+        self.data_reader = data_reader
+        self.series_index = series_index
+        self.channel_name = channel_name
+        self.protobuf_type = protobuf_type
+        self.indexes = indexes
+        self.timestamps = data_reader.series_timestamps(series_index)
+
+    def timestamp(self, position):
+        """Return the timestamp (nsec) of the message at the given position in the stream."""
+        return int(self.timestamps[self.indexes[position]])
+
+    def read(self, position):
+        """Return the message at the given position in the stream."""
+        _desc, _timestamp, data = self.data_reader.read(self.series_index,
+                                                        self.indexes[position])
+        if self.protobuf_type is None:
+            return data
+        protobuf = self.protobuf_type()
+        protobuf.ParseFromString(data)
+        return protobuf
+
+
+class MergedLogReader:
+    """A class for reading messages from many data files, merged in time order.
+
+    Messages are yielded as (timestamp_nsec, channel_name, message) in global timestamp
+    order, using a heap-based merge over the timestamp index of each channel.  Only the
+    indexes of the files are loaded up front; messages are read from the files as they
+    are yielded.
+
+    Messages in channels with a type listed in protobuf_classes are deserialized.  Messages of
+    other types are returned as binary data.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, filenames, channels=None, protobuf_classes=None, start_nsec=None,
+            end_nsec=None, use_mmap=False):
+        """
+        Args:
+         filenames:        paths of the data files to read.
+         channels:         names of the channels to read, or None to read all message channels.
+         protobuf_classes: protobuf classes used to deserialize messages, by type name.
+         start_nsec:       start of the time window (inclusive), or None for no limit.
+         end_nsec:         end of the time window (exclusive), or None for no limit.
+         use_mmap:         if True, memory-map the files (see DataReader).
+        """
+        self._channels = set(channels) if channels is not None else None
+        self._type_name_to_class = {
+            protobuf_class.DESCRIPTOR.full_name: protobuf_class
+            for protobuf_class in (protobuf_classes or [])
+        }
+        self._start_nsec = start_nsec
+        self._end_nsec = end_nsec
+        self._data_readers = []
+        self._streams = []
+        try:
+            for filename in filenames:
+                data_reader = DataReader(filename=filename, use_mmap=use_mmap)
+                self._data_readers.append(data_reader)
+                self._add_streams(data_reader)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value_, tb_):
+        self.close()
+
+    def close(self):
+        """Close all the data files."""
+        for data_reader in self._data_readers:
+            data_reader._close()  # pylint: disable=protected-access
+        self._data_readers = []
+        self._streams = []
+
+    @property
+    def data_readers(self):
+        """Return the DataReaders for the files being merged, in the order given."""
+        return self._data_readers
+
+    @property
+    def num_messages(self):
+        """Number of messages which will be yielded when iterating."""
+        return sum(len(stream.indexes) for stream in self._streams)
+
+    def _add_streams(self, data_reader):
+        for series_index, series_identifier in enumerate(
+                data_reader.file_index.series_identifiers):
+            try:
+                channel_name = series_identifier.spec["bosdyn:channel"]
+            except KeyError:
+                continue  # Not a message channel
+            if self._channels is not None and channel_name not in self._channels:
+                continue
+            series_descriptor = data_reader.series_descriptor(series_index)
+            if series_descriptor.WhichOneof("DataType") != "message_type":
+                continue  # Not a message channel
+            type_name = series_descriptor.message_type.type_name
+            indexes = data_reader.index_range(series_index, self._start_nsec, self._end_nsec)
+            if not indexes:
+                continue
+            self._streams.append(
+                _ChannelStream(data_reader, series_index, channel_name,
+                               self._type_name_to_class.get(type_name), indexes))
+
+    def __iter__(self):
+        # Heap entries are (timestamp, stream number, position in stream).  Ties in timestamp
+        #  are broken by the order of the files and series.
+        heap = [(stream.timestamp(0), stream_number, 0)
+                for stream_number, stream in enumerate(self._streams)]
+        heapq.heapify(heap)
+        while heap:
+            timestamp_nsec, stream_number, position = heap[0]
+            stream = self._streams[stream_number]
+            message = stream.read(position)
+            position += 1
+            if position < len(stream.indexes):
+                heapq.heapreplace(heap, (stream.timestamp(position), stream_number, position))
+            else:
+                heapq.heappop(heap)
+            yield timestamp_nsec, stream.channel_name, message
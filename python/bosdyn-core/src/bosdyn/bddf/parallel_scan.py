@@ -0,0 +1,160 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Scan and decode messages from data files in parallel, across multiple processes."""
+import functools
+import heapq
+import multiprocessing.util
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .data_reader import DataReader
+
+# Default number of data blocks decoded by a worker in one task.
+DEFAULT_BLOCKS_PER_TASK = 1024
+
+# DataReaders opened by a worker process, as filename -> ((use_mmap, st_mtime_ns, st_size),
+#  DataReader).  Workers keep their files open so that the file index is only parsed once per
+#  process, and reopen a file which was rewritten or is read with a different use_mmap.
+_WORKER_DATA_READERS = {}
+
+
+class _ScanTask:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """A range of data blocks of one series, decoded by one worker."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, filename, series_index, channel_name, protobuf_type, indexes, map_function,
+            filter_function, use_mmap):
+        self.filename = filename
+        self.series_index = series_index
+        self.channel_name = channel_name
+        self.protobuf_type = protobuf_type
+        self.indexes = indexes
+        self.map_function = map_function
+        self.filter_function = filter_function
+        self.use_mmap = use_mmap
+
+
+def _worker_data_reader(filename, use_mmap):
+    """Return the worker's DataReader for the file, closing any outdated reader it replaces."""
+    stat = os.stat(filename)
+    key = (use_mmap, stat.st_mtime_ns, stat.st_size)
+    cached = _WORKER_DATA_READERS.get(filename)
+    if cached is not None:
+        cached_key, data_reader = cached
+        if cached_key == key:
+            return data_reader
+        data_reader._close()  # pylint: disable=protected-access
+    elif not _WORKER_DATA_READERS:
+        # Close the readers when the worker process exits.
+        multiprocessing.util.Finalize(None, _close_worker_data_readers, exitpriority=10)
+    data_reader = DataReader(filename=filename, use_mmap=use_mmap)
+    _WORKER_DATA_READERS[filename] = (key, data_reader)
+    return data_reader
+
+
+def _close_worker_data_readers():
+    for _key, data_reader in _WORKER_DATA_READERS.values():
+        data_reader._close()  # pylint: disable=protected-access
+    _WORKER_DATA_READERS.clear()
+
+
+def _run_scan_task(task):
+    """Decode the data blocks of a task, returning [(timestamp_nsec, mapped value)]."""
+    data_reader = _worker_data_reader(task.filename, task.use_mmap)
+    results = []
+    for index_in_series in task.indexes:
+        _desc, timestamp_nsec, data = data_reader.read(task.series_index, index_in_series)
+        if task.protobuf_type is None:
+            message = bytes(data)
+        else:
+            message = task.protobuf_type()
+            message.ParseFromString(data)
+        if task.filter_function and not task.filter_function(timestamp_nsec, task.channel_name,
+                                                             message):
+            continue
+        results.append((timestamp_nsec, task.map_function(timestamp_nsec, task.channel_name,
+                                                          message)))
+    return results
+
+
+def _plan_tasks(  # pylint: disable=too-many-arguments,too-many-locals
+        filenames, channels, protobuf_classes, start_nsec, end_nsec, blocks_per_task,
+        map_function, filter_function, use_mmap):
+    type_name_to_class = {
+        protobuf_class.DESCRIPTOR.full_name: protobuf_class
+        for protobuf_class in (protobuf_classes or [])
+    }
+    tasks = []
+    for filename in filenames:
+        with DataReader(filename=filename) as data_reader:
+            for series_index, series_identifier in enumerate(
+                    data_reader.file_index.series_identifiers):
+                try:
+                    channel_name = series_identifier.spec["bosdyn:channel"]
+                except KeyError:
+                    continue  # Not a message channel
+                if channels is not None and channel_name not in channels:
+                    continue
+                series_descriptor = data_reader.series_descriptor(series_index)
+                if series_descriptor.WhichOneof("DataType") != "message_type":
+                    continue  # Not a message channel
+                protobuf_type = type_name_to_class.get(series_descriptor.message_type.type_name)
+                indexes = list(data_reader.index_range(series_index, start_nsec, end_nsec))
+                for start in range(0, len(indexes), blocks_per_task):
+                    tasks.append(
+                        _ScanTask(filename, series_index, channel_name, protobuf_type,
+                                  indexes[start:start + blocks_per_task], map_function,
+                                  filter_function, use_mmap))
+    return tasks
+
+
+def parallel_scan(  # pylint: disable=too-many-arguments
+        filenames, map_function, filter_function=None, reduce_function=None, initial=None,
+        channels=None, protobuf_classes=None, start_nsec=None, end_nsec=None, max_workers=None,
+        blocks_per_task=DEFAULT_BLOCKS_PER_TASK, use_mmap=False):
+    """Decode messages from data files in parallel worker processes.
+
+    The message series selected in the files are split by series and ranges of data blocks,
+    using the file index.  Each worker process opens its own DataReader, decodes messages and
+    applies filter_function and map_function to them.  Results are merged in timestamp order.
+
+    The functions are sent to the worker processes, so they must be picklable
+    (e.g., defined at the top level of a module).  Each is called as
+    function(timestamp_nsec, channel_name, message).
+
+    Args:
+     filenames:        paths of the data files to read.
+     map_function:     function returning the value computed from a message.
+     filter_function:  function returning True for messages to keep, or None to keep all.
+     reduce_function:  function combining (accumulated, value) in timestamp order, or None.
+     initial:          initial value for reduce_function, or None to start from the first value.
+     channels:         names of the channels to read, or None to read all message channels.
+     protobuf_classes: protobuf classes used to deserialize messages, by type name.  Messages of
+                        other types are passed as binary data.
+     start_nsec:       start of the time window (inclusive), or None for no limit.
+     end_nsec:         end of the time window (exclusive), or None for no limit.
+     max_workers:      number of worker processes (default is the number of processors).
+     blocks_per_task:  number of data blocks decoded by a worker in one task.
+     use_mmap:         if True, workers memory-map the files (see DataReader).
+
+    Returns: the reduced value if reduce_function is specified, otherwise
+             a list of (timestamp_nsec, mapped value) in timestamp order.  If no messages are
+             selected, the reduced value is initial, which is None by default.
+    """
+    if channels is not None:
+        channels = set(channels)
+    tasks = _plan_tasks(filenames, channels, protobuf_classes, start_nsec, end_nsec,
+                        blocks_per_task, map_function, filter_function, use_mmap)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        task_results = list(executor.map(_run_scan_task, tasks))
+    merged = heapq.merge(*task_results, key=lambda result: result[0])
+    if reduce_function is None:
+        return list(merged)
+    values = (value for _timestamp, value in merged)
+    if initial is None:
+        initial = next(values, None)
+    return functools.reduce(reduce_function, values, initial)
@@ -5,10 +5,9 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """A class for reading a series of POD data from a DataFile."""
-import struct
-from itertools import product
+import numpy as np
 
-from .common import POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_STRUCT, ParseError
+from .common import POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_NUMPY_DTYPE, ParseError
 
 
 class PodSeriesReader:
@@ -26,10 +25,12 @@ class PodSeriesReader:
                 self._series_descriptor.WhichOneof("DataType")))
 
         self._pod_type = self._series_descriptor.pod_type
+        self._sample_shape = tuple(self._pod_type.dimension)
         self._num_values_per_sample = 1
-        for dim in self._pod_type.dimension:
+        for dim in self._sample_shape:
             self._num_values_per_sample *= dim
         pod_type = self._pod_type.pod_type
+        self._dtype = np.dtype(POD_TYPE_TO_NUMPY_DTYPE[pod_type])
         self._bytes_per_sample = POD_TYPE_TO_NUM_BYTES[pod_type] * self._num_values_per_sample
         self._num_data_blocks = None
 
@@ -55,29 +56,53 @@ class PodSeriesReader:
 
         Returns: timestamp_nsec (int), POD data values (array of (array ... (of POD values)))
         """
+        timestamp_nsec, samples = self.read_samples_numpy(index_in_series)
+        return timestamp_nsec, samples.tolist()
+
+    def read_samples_numpy(self, index_in_series):
+        """Return the POD data values from the data block of the given index as a numpy array.
+
+        The array is a read-only view of the data block, with shape
+        (num_samples,) + dimension of the series.
+
+        Returns: timestamp_nsec (int), POD data values (numpy.ndarray)
+        """
         _desc, timestamp_nsec, data = self._data_reader.read(self._series_index, index_in_series)
+        return timestamp_nsec, self._to_numpy(data, index_in_series)
+
+    def read_series_numpy(self, start=0, end=None):
+        """Return the POD data values from a range of data blocks, concatenated.
+
+        Samples stored within a data block share the timestamp of that block.
+
+        Args:
+         start:  index of the first data block to read.
+         end:    index one past the last data block to read (default is the end of the series).
+
+        Returns: timestamps_nsec (numpy.ndarray of int64, one per sample),
+                 POD data values (numpy.ndarray of shape (num_samples,) + dimension)
+        """
+        if end is None:
+            end = self.num_data_blocks
+        block_timestamps = []
+        block_samples = []
+        for index_in_series in range(start, end):
+            timestamp_nsec, samples = self.read_samples_numpy(index_in_series)
+            block_timestamps.append(timestamp_nsec)
+            block_samples.append(samples)
+        if not block_samples:
+            return (np.empty(0, dtype=np.int64),
+                    np.empty((0,) + self._sample_shape, dtype=self._dtype))
+        timestamps_nsec = np.repeat(np.array(block_timestamps, dtype=np.int64),
+                                    [len(samples) for samples in block_samples])
+        return timestamps_nsec, np.concatenate(block_samples)
+
+    def _to_numpy(self, data, index_in_series):
         num_samples = len(data) // self._bytes_per_sample
         expected_size = num_samples * self._bytes_per_sample
         if len(data) != expected_size:
             raise ParseError('{} idx={} expect {} elements but got {})'.format(
                 self._series_descriptor.series_identifier, index_in_series, expected_size,
                 len(data)))
-
-        num_values = num_samples * self._num_values_per_sample
-        format_str = '<{}{}'.format(num_values, POD_TYPE_TO_STRUCT[self._pod_type.pod_type])
-        pod_data = list(struct.unpack(format_str, data))
-
-        def _split(vals, dims):
-            if not dims:
-                return vals
-            els_per_sample = product(dims)
-            assert els_per_sample
-            next_dims = dims[1:]
-            return [
-                _split(vals[i:i + els_per_sample], next_dims)
-                for i in range(0, len(vals), els_per_sample)
-            ]
-
-        split_data = _split(pod_data, self._pod_type.dimension)
-
-        return timestamp_nsec, split_data
+        samples = np.frombuffer(data, dtype=self._dtype)
+        return samples.reshape((num_samples,) + self._sample_shape)
@@ -7,16 +7,59 @@
 """Assists with writing POD data values into a series, within a DataWriter."""
 import struct
 
+import numpy as np
+
 from .bosdyn import MessageChannel
-from .common import POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_STRUCT, DataFormatError
+from .common import (POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_NUMPY_DTYPE, POD_TYPE_TO_STRUCT,
+                     DataFormatError)
+
+# Default size in bytes of the data blocks written by a PodSeriesWriter.
+DEFAULT_DATA_BLOCK_SIZE = 2048
+
+# A block size better suited to high-rate series stored in large files.  Larger blocks mean
+#  fewer block headers, index entries and write calls per sample.
+LARGE_FILE_DATA_BLOCK_SIZE = 64 * 1024
+
+
+def _checked_cast(data, dtype, series_spec):
+    """Return data as a numpy array of dtype, checking that no values were changed by the cast.
+
+    Integer series reject fractional or out-of-range values.  Float series accept rounding
+    to the series precision, but not overflow to infinity.
+
+    Raises DataFormatError if data cannot be represented as dtype.
+    """
+    values = np.asarray(data)
+    if values.dtype == dtype:
+        return values
+    try:
+        with np.errstate(invalid='ignore', over='ignore'):
+            cast_values = values.astype(dtype)
+    except (TypeError, ValueError) as err:
+        raise DataFormatError('{} cannot store {} values as {}: {}'.format(
+            series_spec, values.dtype, dtype, err)) from err
+    if np.can_cast(values.dtype, dtype, casting='safe'):
+        return cast_values
+    if dtype.kind == 'f':
+        unchanged = np.isfinite(cast_values) | ~np.isfinite(values)
+    else:
+        unchanged = cast_values == values
+    if not np.all(unchanged):
+        raise DataFormatError('{} cannot store values {} as {}'.format(
+            series_spec, values[~unchanged].tolist(), dtype))
+    return cast_values
 
 
 class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
-    """A class to assist with writing POD data values into a series, within a DataWriter."""
+    """A class to assist with writing POD data values into a series, within a DataWriter.
+
+    Samples are accumulated into a preallocated block buffer which is written to the file
+    when no more samples fit within data_block_size.
+    """
 
     def __init__(  # pylint: disable=too-many-arguments
             self, data_writer, series_type, series_spec, pod_type, dimensions=None,
-            annotations=None, data_block_size=2048):
+            annotations=None, data_block_size=DEFAULT_DATA_BLOCK_SIZE, compression=None):
         self._data_writer = data_writer
         self._series_type = series_type
         self._series_spec = series_spec
@@ -25,16 +68,22 @@ class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
         self._series_index = self._data_writer.add_pod_series(self.series_type, self.series_spec,
                                                               type_enum=self._pod_type,
                                                               dimension=self._dimensions,
-                                                              annotations=annotations)
+                                                              annotations=annotations,
+                                                              compression=compression)
 
         self._data_block_size = data_block_size
         self._num_values_per_sample = 1
         for dim in self._dimensions:
             self._num_values_per_sample *= dim
+        self._dtype = np.dtype(POD_TYPE_TO_NUMPY_DTYPE[pod_type])
+        self._struct = struct.Struct('<{}{}'.format(self._num_values_per_sample,
+                                                    POD_TYPE_TO_STRUCT[pod_type]))
         self._bytes_per_sample = POD_TYPE_TO_NUM_BYTES[pod_type] * self._num_values_per_sample
-        self._block = b''
+        # A block holds as many samples as fit in data_block_size, but at least one.
+        self._samples_per_block = max(1, self._data_block_size // self._bytes_per_sample)
+        self._block = bytearray(self._samples_per_block * self._bytes_per_sample)
+        self._num_block_samples = 0
         self._timestamp_nsec = None
-        self._format_str = '<{}{}'.format(self._num_values_per_sample, POD_TYPE_TO_STRUCT[pod_type])
         self._data_writer.run_on_close(self.finish_block)
 
     def write(self, timestamp_nsec, sample):
@@ -46,36 +95,87 @@ class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
          timestamp_nsec:  nsec since unix epoch to timestamp the data
          sample:          array/vector of POD values to write
 
-        Raises DataFormatError if the data is invalid for this series.
+        Raises DataFormatError if the data is invalid for this series, including values which
+        cannot be represented by the POD type of the series.  Values of integer series must be
+        integers.
         """
-        serialized_sample = struct.pack(self._format_str, sample)
-        if len(serialized_sample) != self._bytes_per_sample:
+        # The sample is packed straight into the block buffer, as this runs once per sample.
+        if isinstance(sample, np.ndarray):
+            values = sample.ravel().tolist()
+        elif isinstance(sample, (list, tuple)):
+            values = sample
+            if values and isinstance(values[0], (list, tuple)):
+                values = np.ravel(values).tolist()
+        else:
+            values = (sample,)
+        if len(values) != self._num_values_per_sample:
             raise DataFormatError('{} expect {} elements but got {})'.format(
-                self._series_spec, self._bytes_per_sample, len(serialized_sample)))
-        if self._bytes_per_sample >= self._data_block_size:
-            # We should always immediately write data.
-            self._data_writer.write_data(self._series_index, timestamp_nsec, serialized_sample)
-            return
-
-        if not self._block:
+                self._series_spec, self._num_values_per_sample, len(values)))
+        offset = self._num_block_samples * self._bytes_per_sample
+        try:
+            self._struct.pack_into(self._block, offset, *values)
+        except (struct.error, OverflowError) as err:
+            raise DataFormatError('{} cannot store values {}: {}'.format(
+                self._series_spec, values, err)) from err
+        if not self._num_block_samples:
             # New block, starts with current timestamp.
             self._timestamp_nsec = timestamp_nsec
-            self._block = serialized_sample
-        else:
-            # Add data to pre-existing block
-            self._block += serialized_sample
-
-        if len(self._block) + self._bytes_per_sample > self._data_block_size:
+        self._num_block_samples += 1
+        if self._num_block_samples == self._samples_per_block:
             # No room for more samples before the data must be written.
-            self._data_writer.write_data(self._series_index, self._timestamp_nsec, self._block)
-            self._block = b''
+            self.finish_block()
+
+    def write_many(self, timestamps_nsec, samples):
+        """Add many samples at once, writing each block as it fills.
+
+        Whole blocks are serialized directly from the array, without copying through the
+        block buffer.  The resulting file is the same as calling write() for each sample.
+
+        Args:
+         timestamps_nsec:  sequence of nsec since unix epoch, one per sample
+         samples:          array of shape (num_samples,) + dimensions, or
+                            (num_samples, number of values per sample)
+
+        Raises DataFormatError if the data is invalid for this series, including values which
+        cannot be represented by the POD type of the series.
+        """
+        num_samples = len(timestamps_nsec)
+        samples = np.ascontiguousarray(_checked_cast(samples, self._dtype, self._series_spec))
+        if samples.size != num_samples * self._num_values_per_sample:
+            raise DataFormatError('{} expect {} elements for {} samples but got {})'.format(
+                self._series_spec, num_samples * self._num_values_per_sample, num_samples,
+                samples.size))
+        samples = samples.reshape(num_samples, self._num_values_per_sample)
+
+        index = 0
+        while index < num_samples:
+            if not self._num_block_samples and num_samples - index >= self._samples_per_block:
+                # A whole block can be written straight from the array.
+                end = index + self._samples_per_block
+                self._data_writer.write_data(self._series_index, int(timestamps_nsec[index]),
+                                             samples[index:end].tobytes())
+                index = end
+                continue
+            # Fill the partial block buffer.
+            if not self._num_block_samples:
+                self._timestamp_nsec = int(timestamps_nsec[index])
+            count = min(self._samples_per_block - self._num_block_samples, num_samples - index)
+            offset = self._num_block_samples * self._bytes_per_sample
+            self._block[offset:offset + count * self._bytes_per_sample] = \
+                samples[index:index + count].tobytes()
+            self._num_block_samples += count
+            index += count
+            if self._num_block_samples == self._samples_per_block:
+                self.finish_block()
 
     def finish_block(self):
         """If there are samples which haven't been written to the file, write them now."""
-        if not self._block:
+        if not self._num_block_samples:
             return
-        self._data_writer.write_data(self._series_index, self._timestamp_nsec, self._block)
-        self._block = b''
+        nbytes = self._num_block_samples * self._bytes_per_sample
+        self._data_writer.write_data(self._series_index, self._timestamp_nsec,
+                                     bytes(memoryview(self._block)[:nbytes]))
+        self._num_block_samples = 0
 
     @property
     def series_type(self):
@@ -47,6 +47,26 @@ class ProtobufChannelReader:
                                                                   index_in_series)
         return timestamp, msg
 
+    def find_index(self, timestamp_nsec):
+        """Return the index of the first message in the series at or after timestamp_nsec.
+
+        Returns num_messages if all messages are before timestamp_nsec.
+        """
+        return self._protobuf_reader.data_reader.find_index(self._series_index, timestamp_nsec)
+
+    def read_range(self, start_nsec=None, end_nsec=None):
+        """Generator of messages with start_nsec <= timestamp < end_nsec, in time order.
+
+        Args:
+         start_nsec:  start of the time window (inclusive), or None for the start of the series.
+         end_nsec:    end of the time window (exclusive), or None for the end of the series.
+
+        Yields: timestamp_nsec (int), deserialized protobuf object
+        """
+        for index_in_series in self._protobuf_reader.data_reader.index_range(
+                self._series_index, start_nsec, end_nsec):
+            yield self.get_message(index_in_series)
+
     def __iter__(self):
         return ProtobufChannelReader.Iterator(self)
 
@@ -19,7 +19,7 @@ class ProtobufSeriesWriter:  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, data_writer, protobuf_type, channel_name=None, is_metadata=False,
-            annotations=None, additional_index_names=None):
+            annotations=None, additional_index_names=None, compression=None):
         self._data_writer = data_writer
         self._protobuf_type = protobuf_type
         self._type_name = protobuf_type.DESCRIPTOR.full_name
@@ -28,7 +28,7 @@ class ProtobufSeriesWriter:  # pylint: disable=too-many-instance-attributes
         self._series_index = self._data_writer.add_message_series(
             self.series_type, self.series_spec, content_type=PROTOBUF_CONTENT_TYPE,
             type_name=self._type_name, is_metadata=is_metadata, annotations=annotations,
-            additional_index_names=additional_index_names)
+            additional_index_names=additional_index_names, compression=compression)
 
     def write(self, timestamp_nsec, protobuf, additional_indexs=None):
         """Store protobuf in the file.
@@ -9,6 +9,7 @@ from hashlib import sha1
 
 from .base_data_reader import BaseDataReader
 from .common import ParseError
+from .compression import decompressor
 from .file_indexer import FileIndexer
 
 
@@ -24,6 +25,7 @@ class StreamDataReader(BaseDataReader):
         super(StreamDataReader, self).__init__(outfile)
         self._indexer = FileIndexer()
         self._series_index_to_block_index = {}  # {series_index -> SeriesBlockIndex}
+        self._series_index_to_decompressor = {}
 
     def _read(self, nbytes):
         block = BaseDataReader._read(self, nbytes)
@@ -82,6 +84,9 @@ class StreamDataReader(BaseDataReader):
         if is_data:
             self._indexer.index_data_block(desc.series_index, desc.timestamp.ToNanoseconds(),
                                            len(data), file_offset, desc.additional_indexes)
+            decompress = self._series_index_to_decompressor.get(desc.series_index)
+            if decompress is not None:
+                data = decompress(data)
         else:
             desc_type = desc.WhichOneof("DescriptorType")
             if desc_type == 'file_index':
@@ -91,6 +96,8 @@ class StreamDataReader(BaseDataReader):
             elif desc_type == 'series_descriptor':
                 series_descriptor = desc.series_descriptor
                 self._indexer.add_series_descriptor(series_descriptor, file_offset)
+                self._series_index_to_decompressor[series_descriptor.series_index] = \
+                    decompressor(series_descriptor)
             elif desc_type == 'series_block_index':
                 series_block_index = desc.series_block_index
                 self._series_index_to_block_index[
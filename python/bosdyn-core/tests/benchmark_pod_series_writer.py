@@ -0,0 +1,67 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Microbenchmarks of writing POD samples with a PodSeriesWriter."""
+
+import io
+import sys
+import time
+
+import numpy as np
+
+import bosdyn.api.bddf_pb2 as bddf
+from bosdyn.bddf import DataWriter, PodSeriesWriter
+
+_POD_TYPES = [
+    ('float64', bddf.TYPE_FLOAT64, 0.5),
+    ('float32', bddf.TYPE_FLOAT32, 0.5),
+    ('int32', bddf.TYPE_INT32, 5),
+    ('uint8', bddf.TYPE_UINT8, 5),
+]
+
+
+def _time_writes(pod_type, dimensions, write):
+    """Returns the seconds taken by write(pod_writer) for a new series in an in-memory file."""
+    with DataWriter(io.BytesIO()) as data_writer:
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/benchmark/pod', {'varname': 'value'},
+                                     pod_type, dimensions=dimensions)
+        start = time.perf_counter()
+        write(pod_writer)
+        return time.perf_counter() - start
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=100000, help='Number of samples to write.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of repeats to take the best of.')
+    options = parser.parse_args()
+
+    timestamps = np.arange(options.number, dtype=np.int64)
+    for name, pod_type, value in _POD_TYPES:
+        for dimensions, sample in ((None, value), ([3], [value] * 3)):
+            samples = np.full((options.number, len(dimensions or [1])), value)
+
+            def _write(pod_writer):
+                for timestamp in range(options.number):
+                    pod_writer.write(timestamp, sample)
+
+            def _write_many(pod_writer):
+                pod_writer.write_many(timestamps, samples)
+
+            label = '{}{}'.format(name, dimensions or '')
+            for method, write in (('write', _write), ('write_many', _write_many)):
+                best = min(
+                    _time_writes(pod_type, dimensions, write) for _ in range(options.repeat))
+                print('{:14s} {:10s} {:8.3f} us per sample'.format(
+                    label, method, 1e6 * best / options.number))
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -7,18 +7,24 @@
 """Test code for bosdyn.bddf"""
 from __future__ import print_function
 
+import io
 import os
 import tempfile
+import threading
+import time
 
+import numpy as np
 import pytest
 from google.protobuf.timestamp_pb2 import Timestamp
 
 import bosdyn.api.bddf_pb2 as bddf
 import bosdyn.api.robot_id_pb2 as robot_id
 from bosdyn.api.data_buffer_pb2 import OperatorComment
-from bosdyn.bddf import (DataReader, DataWriter, GrpcReader, GrpcServiceWriter, PodSeriesReader,
+from bosdyn.bddf import (AsyncDataWriter, DataFormatError, DataReader, DataWriter, GrpcReader,
+                         GrpcServiceWriter, IndexCatalog, MergedLogReader, PodSeriesReader,
                          PodSeriesWriter, ProtobufChannelReader, ProtobufReader,
-                         ProtobufSeriesWriter, StreamDataReader)
+                         ProtobufSeriesWriter, StreamDataReader, WriteQueueFullError,
+                         parallel_scan)
 from bosdyn.util import now_nsec, now_timestamp, nsec_to_timestamp, timestamp_to_nsec
 
 
@@ -192,3 +198,546 @@ def test_grpc_read_write():
         nsec, msg = proto_reader.get_message(0)
         assert msg == response
         assert nsec_to_timestamp(nsec) == msg.header.response_timestamp
+
+
+def test_read_mmap():
+    """Test reading a file through a memory-mapped DataReader."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_mmap.bddf')
+    timestamp_nsec = now_nsec()
+    operator_message = OperatorComment(message="mmap test", timestamp=now_timestamp())
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'channel_a'},
+                                                      'text/plain', 'test_type')
+        for idx in range(5):
+            data_writer.write_data(series_index, timestamp_nsec + idx, b'data %d' % idx)
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        proto_writer.write(timestamp_to_nsec(operator_message.timestamp), operator_message)
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'test_var'},
+                                     bddf.TYPE_FLOAT64)
+        for val in range(10):
+            pod_writer.write(timestamp_nsec, val)
+
+    with open(filename, 'rb') as infile, DataReader(infile) as file_reader, \
+         DataReader(filename=filename, use_mmap=True) as mmap_reader:
+        assert not file_reader.is_memory_mapped
+        assert mmap_reader.is_memory_mapped
+        assert mmap_reader.file_index == file_reader.file_index
+        assert mmap_reader.annotations == file_reader.annotations
+        for idx in range(5):
+            desc, timestamp_, data_ = mmap_reader.read(series_index, idx)
+            assert isinstance(data_, memoryview)
+            assert timestamp_ == timestamp_nsec + idx
+            assert data_ == b'data %d' % idx
+            assert desc == file_reader.read(series_index, idx)[0]
+
+        proto_reader = ProtobufReader(mmap_reader)
+        timestamp_, protobuf = ProtobufChannelReader(proto_reader, OperatorComment).get_message(0)
+        assert protobuf == operator_message
+        assert timestamp_ == timestamp_to_nsec(operator_message.timestamp)
+
+        _timestamp, samples = PodSeriesReader(mmap_reader, {'varname': 'test_var'}).read_samples(0)
+        assert samples == [float(val) for val in range(10)]
+
+    # Data read through the mapping stays valid after the reader is closed.
+    assert data_ == b'data 4'
+
+    os.unlink(filename)
+
+
+def test_read_pod_numpy():
+    """Test reading POD data as numpy arrays."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_pod_numpy.bddf')
+    pod_spec = {'varname': 'matrix_var'}
+    timestamp_nsec = now_nsec()
+    blocks = [np.arange(12, dtype='<i2').reshape(2, 2, 3) + 100 * idx for idx in range(3)]
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_pod_series('bosdyn/test/pod', pod_spec, bddf.TYPE_INT16,
+                                                  dimension=[2, 3])
+        for idx, block in enumerate(blocks):
+            data_writer.write_data(series_index, timestamp_nsec + idx, block.tobytes())
+
+    with open(filename, 'rb') as infile, DataReader(infile) as data_reader:
+        pod_reader = PodSeriesReader(data_reader, pod_spec)
+        assert pod_reader.num_data_blocks == 3
+
+        timestamp_, samples = pod_reader.read_samples_numpy(1)
+        assert timestamp_ == timestamp_nsec + 1
+        assert samples.dtype == np.int16
+        assert samples.shape == (2, 2, 3)
+        assert np.array_equal(samples, blocks[1])
+
+        timestamp_, samples = pod_reader.read_samples(1)
+        assert samples == blocks[1].tolist()
+
+        timestamps, samples = pod_reader.read_series_numpy()
+        assert samples.shape == (6, 2, 3)
+        assert np.array_equal(samples, np.concatenate(blocks))
+        assert timestamps.dtype == np.int64
+        assert timestamps.tolist() == [timestamp_nsec + idx for idx in range(3) for _ in range(2)]
+
+        timestamps, samples = pod_reader.read_series_numpy(1, 2)
+        assert np.array_equal(samples, blocks[1])
+        assert timestamps.tolist() == [timestamp_nsec + 1] * 2
+
+        timestamps, samples = pod_reader.read_series_numpy(2, 2)
+        assert timestamps.shape == (0,)
+        assert samples.shape == (0, 2, 3)
+
+    os.unlink(filename)
+
+
+def test_write_pod_many():
+    """Test writing POD data in bulk, compared against writing one sample at a time."""
+    timestamps = [1000 + idx for idx in range(50)]
+    samples = np.arange(150, dtype=np.float64).reshape(50, 3)
+
+    def _write(filename, bulk):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'vec'},
+                                         bddf.TYPE_FLOAT64, dimensions=[3], data_block_size=200)
+            if bulk:
+                pod_writer.write(timestamps[0], samples[0])
+                pod_writer.write_many(timestamps[1:20], samples[1:20])
+                pod_writer.write_many(timestamps[20:], samples[20:].tolist())
+                with pytest.raises(DataFormatError):
+                    pod_writer.write_many(timestamps[:2], samples[:1])
+            else:
+                for timestamp, sample in zip(timestamps, samples.tolist()):
+                    pod_writer.write(timestamp, sample)
+                with pytest.raises(DataFormatError):
+                    pod_writer.write(timestamps[0], [1.0, 2.0])
+        with open(filename, 'rb') as infile:
+            return infile.read()
+
+    filename = os.path.join(tempfile.gettempdir(), 'test_pod_many.bddf')
+    single_contents = _write(filename, bulk=False)
+    bulk_contents = _write(filename, bulk=True)
+    assert single_contents == bulk_contents
+
+    with open(filename, 'rb') as infile, DataReader(infile) as data_reader:
+        pod_reader = PodSeriesReader(data_reader, {'varname': 'vec'})
+        # 200 byte blocks hold 8 samples of 24 bytes.
+        assert pod_reader.num_data_blocks == 7
+        read_timestamps, read_samples = pod_reader.read_series_numpy()
+        assert np.array_equal(read_samples, samples)
+        assert read_timestamps.tolist() == [timestamps[idx - idx % 8] for idx in range(50)]
+
+    os.unlink(filename)
+
+
+def test_write_pod_checked_cast():
+    """Test that POD values which do not fit the series type are rejected."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_pod_cast.bddf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        uint8_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'uint8'},
+                                       bddf.TYPE_UINT8)
+        float32_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'float32'},
+                                         bddf.TYPE_FLOAT32)
+        uint8_writer.write(1000, 255)
+        uint8_writer.write(1001, np.int64(2))
+        uint8_writer.write_many([1002, 1003], np.array([3, 4], dtype=np.int64))
+        for value in (300, -1, 1.5, float('nan')):
+            with pytest.raises(DataFormatError):
+                uint8_writer.write(1004, value)
+        with pytest.raises(DataFormatError):
+            uint8_writer.write_many([1004, 1005], [5, 256])
+        with pytest.raises(DataFormatError):
+            uint8_writer.write_many([1004, 1005], [5, 1.5])
+        with pytest.raises(DataFormatError):
+            uint8_writer.write(1004, 'text')
+
+        float32_writer.write(1000, 0.1)
+        float32_writer.write(1001, float('inf'))
+        with pytest.raises(DataFormatError):
+            float32_writer.write(1002, 1e300)
+
+    with open(filename, 'rb') as infile, DataReader(infile) as data_reader:
+        _timestamps, samples = PodSeriesReader(data_reader,
+                                               {'varname': 'uint8'}).read_series_numpy()
+        assert samples.tolist() == [255, 2, 3, 4]
+        _timestamps, samples = PodSeriesReader(data_reader,
+                                               {'varname': 'float32'}).read_series_numpy()
+        assert samples.tolist() == [np.float32(0.1), float('inf')]
+
+    os.unlink(filename)
+
+
+def test_time_index():
+    """Test searching series by timestamp."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_time_index.bddf')
+    base_nsec = now_nsec()
+    comments = [
+        OperatorComment(message="comment {}".format(idx),
+                        timestamp=nsec_to_timestamp(base_nsec + idx * 10)) for idx in range(10)
+    ]
+    unsorted_offsets = [30, 10, 20, 10, 0]
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        for comment in comments:
+            proto_writer.write(timestamp_to_nsec(comment.timestamp), comment)
+        unsorted_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'unsorted'},
+                                                        'text/plain', 'test_type')
+        for offset in unsorted_offsets:
+            data_writer.write_data(unsorted_index, base_nsec + offset, b'%d' % offset)
+
+    with open(filename, 'rb') as infile, DataReader(infile) as data_reader:
+        channel_reader = ProtobufChannelReader(ProtobufReader(data_reader), OperatorComment)
+        series_index = data_reader.series_spec_to_index(
+            {'bosdyn:channel': OperatorComment.DESCRIPTOR.full_name})
+        timestamps = data_reader.series_timestamps(series_index)
+        assert timestamps.dtype == np.int64
+        assert timestamps.tolist() == [base_nsec + idx * 10 for idx in range(10)]
+
+        assert channel_reader.find_index(base_nsec - 1) == 0
+        assert channel_reader.find_index(base_nsec + 30) == 3
+        assert channel_reader.find_index(base_nsec + 31) == 4
+        assert channel_reader.find_index(base_nsec + 91) == 10
+
+        messages = list(channel_reader.read_range(base_nsec + 25, base_nsec + 60))
+        assert [msg for _timestamp, msg in messages] == comments[3:6]
+        assert [timestamp for timestamp, _msg in messages] == list(timestamps[3:6])
+        assert [msg for _timestamp, msg in channel_reader.read_range()] == comments
+        assert not list(channel_reader.read_range(base_nsec + 60, base_nsec + 30))
+        assert [msg for _ts, msg in channel_reader.read_range(end_nsec=base_nsec + 20)
+               ] == comments[:2]
+
+        # Timestamps which are out of order are searched in time order.
+        assert data_reader.find_index(unsorted_index, base_nsec + 5) == 1
+        assert data_reader.find_index(unsorted_index, base_nsec + 25) == 0
+        assert [data for _desc, _ts, data in data_reader.read_range(unsorted_index)
+               ] == [b'0', b'10', b'10', b'20', b'30']
+        assert list(data_reader.index_range(unsorted_index, base_nsec + 10,
+                                            base_nsec + 30)) == [1, 3, 2]
+
+    os.unlink(filename)
+
+
+def test_merged_log_reader():
+    """Test reading several files merged in time order."""
+    base_nsec = now_nsec()
+    filenames = [
+        os.path.join(tempfile.gettempdir(), 'test_merged_{}.bddf'.format(idx)) for idx in range(3)
+    ]
+    expected = []
+    for file_idx, filename in enumerate(filenames):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+            text_index = data_writer.add_message_series(
+                'bosdyn/test/1', {'bosdyn:channel': 'text'}, 'text/plain', 'text')
+            for idx in range(4):
+                timestamp = base_nsec + idx * 30 + file_idx * 10
+                comment = OperatorComment(message='{}-{}'.format(file_idx, idx),
+                                          timestamp=nsec_to_timestamp(timestamp))
+                comment_writer.write(timestamp, comment)
+                expected.append((timestamp, OperatorComment.DESCRIPTOR.full_name, comment))
+                data_writer.write_data(text_index, timestamp + 5, b'text')
+                expected.append((timestamp + 5, 'text', b'text'))
+    expected.sort(key=lambda entry: entry[0])
+
+    with MergedLogReader(filenames, protobuf_classes=[OperatorComment]) as merged_reader:
+        assert merged_reader.num_messages == len(expected)
+        assert list(merged_reader) == expected
+
+    with MergedLogReader(reversed(filenames), channels=['text'], start_nsec=base_nsec + 20,
+                         end_nsec=base_nsec + 60) as merged_reader:
+        messages = list(merged_reader)
+        assert [timestamp for timestamp, _channel, _msg in messages] == [
+            base_nsec + offset for offset in (25, 35, 45, 55)
+        ]
+        assert all(channel == 'text' and msg == b'text' for _ts, channel, msg in messages)
+
+    # Without a protobuf class, messages are returned as binary data.
+    with MergedLogReader(filenames[:1], channels=[OperatorComment.DESCRIPTOR.full_name],
+                         use_mmap=True) as merged_reader:
+        _timestamp, _channel, msg = next(iter(merged_reader))
+        assert msg == expected[0][2].SerializeToString()
+
+    for filename in filenames:
+        os.unlink(filename)
+
+
+def _comment_length(_timestamp, _channel, msg):
+    return len(msg.message)
+
+
+def _is_even_comment(_timestamp, _channel, msg):
+    return int(msg.message.split('-')[1]) % 2 == 0
+
+
+def _add(total, value):
+    return total + value
+
+
+def test_parallel_scan():
+    """Test decoding data files in worker processes."""
+    base_nsec = now_nsec()
+    filenames = [
+        os.path.join(tempfile.gettempdir(), 'test_scan_{}.bddf'.format(idx)) for idx in range(2)
+    ]
+    comments = []
+    for file_idx, filename in enumerate(filenames):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+            for idx in range(25):
+                timestamp = base_nsec + idx * 2 + file_idx
+                comment = OperatorComment(message='{}{}-{}'.format('x' * file_idx, file_idx, idx),
+                                          timestamp=nsec_to_timestamp(timestamp))
+                comment_writer.write(timestamp, comment)
+                comments.append((timestamp, comment))
+    comments.sort(key=lambda entry: entry[0])
+
+    results = parallel_scan(filenames, _comment_length, protobuf_classes=[OperatorComment],
+                            max_workers=2, blocks_per_task=4)
+    assert results == [(timestamp, len(comment.message)) for timestamp, comment in comments]
+
+    total = parallel_scan(filenames, _comment_length, filter_function=_is_even_comment,
+                          reduce_function=_add, initial=0, protobuf_classes=[OperatorComment],
+                          start_nsec=base_nsec + 10, max_workers=2, blocks_per_task=3)
+    assert total == sum(
+        len(comment.message) for timestamp, comment in comments
+        if timestamp >= base_nsec + 10 and _is_even_comment(timestamp, None, comment))
+
+    assert parallel_scan(filenames, _comment_length, channels=['none'], max_workers=1) == []
+    # Reducing no messages gives the initial value.
+    assert parallel_scan(filenames, _comment_length, reduce_function=_add, channels=['none'],
+                         max_workers=1) is None
+    assert parallel_scan(filenames, _comment_length, reduce_function=_add, initial=0,
+                         channels=['none'], max_workers=1) == 0
+
+    for filename in filenames:
+        os.unlink(filename)
+
+
+def test_index_catalog():
+    """Test answering time-window queries from the index catalog."""
+    base_nsec = now_nsec()
+    directory = tempfile.mkdtemp()
+    filenames = [os.path.join(directory, 'log_{}.bddf'.format(idx)) for idx in range(3)]
+    for file_idx, filename in enumerate(filenames):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+            for idx in range(5):
+                timestamp = base_nsec + file_idx * 1000 + idx * 100
+                comment_writer.write(timestamp, OperatorComment(message=str(idx)))
+            if file_idx == 1:
+                pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod',
+                                             {'bosdyn:channel': 'pod'}, bddf.TYPE_FLOAT32)
+                pod_writer.write(base_nsec, 1.0)
+    channel = OperatorComment.DESCRIPTOR.full_name
+    catalog_filename = os.path.join(directory, 'catalog.sqlite')
+
+    with IndexCatalog(catalog_filename) as catalog:
+        assert catalog.index_directory(directory) == filenames
+        assert catalog.find_files(channel) == filenames
+        assert catalog.find_files('pod') == [filenames[1]]
+        assert catalog.find_files(channel, start_nsec=base_nsec + 1100,
+                                  end_nsec=base_nsec + 2001) == filenames[1:]
+        # The window is within the span of the first file, but between its blocks.
+        assert catalog.find_files(channel, start_nsec=base_nsec + 150,
+                                  end_nsec=base_nsec + 200) == []
+        assert catalog.find_series(channel, end_nsec=base_nsec + 1) == [
+            (filenames[0], 0, {'bosdyn:channel': channel})
+        ]
+
+        with open(filenames[2], 'rb') as infile, DataReader(infile) as data_reader:
+            assert np.array_equal(catalog.series_timestamps(filenames[2], 0),
+                                  data_reader.series_timestamps(0))
+            assert catalog.block_file_offsets(filenames[2], 0).tolist() == [
+                entry.file_offset for entry in data_reader.series_block_index(0).block_entries
+            ]
+
+    with IndexCatalog(catalog_filename) as catalog:
+        # Entries persist, and are only re-indexed when the file changes.
+        assert catalog.is_current(filenames[0])
+        assert not catalog.index_file(filenames[0])
+        os.utime(filenames[0], ns=(0, 0))
+        assert not catalog.index_file(filenames[0])
+        with open(filenames[0], 'wb') as outfile, DataWriter(outfile) as data_writer:
+            ProtobufSeriesWriter(data_writer, OperatorComment)
+        assert not catalog.is_current(filenames[0])
+        assert catalog.index_file(filenames[0])
+        assert catalog.find_files(channel) == filenames[1:]
+
+        # Re-indexing a deleted file removes its entry.
+        os.unlink(filenames[2])
+        assert not catalog.is_current(filenames[2])
+        with pytest.raises(FileNotFoundError):
+            catalog.index_file(filenames[2])
+        assert catalog.find_files(channel) == [filenames[1]]
+
+        os.unlink(filenames[0])
+        assert catalog.prune() == [filenames[0]]
+        assert catalog.find_files(channel) == [filenames[1]]
+
+    for filename in [filenames[1], catalog_filename]:
+        os.unlink(filename)
+    os.rmdir(directory)
+
+
+class _GatedFile(io.BytesIO):
+    """In-memory file whose writes wait until the gate is opened."""
+
+    def __init__(self):
+        super(_GatedFile, self).__init__()
+        self.gate = threading.Event()
+        self.contents = None
+
+    def write(self, data):
+        self.gate.wait()
+        return super(_GatedFile, self).write(data)
+
+    def close(self):
+        self.contents = self.getvalue()
+        super(_GatedFile, self).close()
+
+
+def _write_test_log(data_writer, timestamp_nsec):
+    comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+    pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'test_var'},
+                                 bddf.TYPE_FLOAT32, data_block_size=64)
+    for idx in range(100):
+        comment_writer.write(timestamp_nsec + idx, OperatorComment(message=str(idx)))
+        pod_writer.write(timestamp_nsec + idx, float(idx))
+        if idx == 50:
+            data_writer.add_message_series('bosdyn/test/1', {'channel': 'late'}, 'text/plain',
+                                           'text')
+
+
+def test_async_data_writer():
+    """Test that the asynchronous writer writes the same file as DataWriter."""
+    timestamp_nsec = now_nsec()
+    annotations = {'robot': 'spot'}
+
+    sync_file = _GatedFile()
+    sync_file.gate.set()
+    with DataWriter(sync_file, annotations=annotations) as data_writer:
+        _write_test_log(data_writer, timestamp_nsec)
+
+    async_file = _GatedFile()
+    async_file.gate.set()
+    with AsyncDataWriter(async_file, annotations=annotations, coalesce_bytes=300) as data_writer:
+        _write_test_log(data_writer, timestamp_nsec)
+        data_writer.flush()
+        assert data_writer.queue_bytes == 0
+        with pytest.raises(DataFormatError):
+            data_writer.write_data(0, timestamp_nsec, b'', [1])
+    assert async_file.contents == sync_file.contents
+    assert data_writer.num_dropped == 0
+
+    with DataReader(io.BytesIO(async_file.contents)) as data_reader:
+        assert data_reader.annotations == annotations
+        assert data_reader.num_data_blocks(0) == 100
+
+
+def _wait_for_empty_queue(data_writer):
+    while data_writer.queue_bytes:
+        time.sleep(0.001)
+
+
+def test_async_data_writer_overflow():
+    """Test the overflow policies of the asynchronous writer."""
+    with pytest.raises(ValueError):
+        AsyncDataWriter(io.BytesIO(), overflow_policy='bogus')
+
+    # While the file is blocked, data accumulates in the queue.
+    outfile = _GatedFile()
+    data_writer = AsyncDataWriter(outfile, max_queue_bytes=10, overflow_policy=AsyncDataWriter.ERROR)
+    series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'},
+                                                  'text/plain', 'text')
+    data_writer.write_data(series_index, 1, b'12345')  # The writer thread blocks on this.
+    _wait_for_empty_queue(data_writer)
+    # The block being written still counts against the limit.
+    data_writer.write_data(series_index, 2, b'12345')
+    with pytest.raises(WriteQueueFullError):
+        data_writer.write_data(series_index, 3, b'12345')
+    outfile.gate.set()
+    data_writer.flush()
+    data_writer.write_data(series_index, 3, b'12345')
+    data_writer.write_data(series_index, 4, b'12345')
+    data_writer._close()  # pylint: disable=protected-access
+    with DataReader(io.BytesIO(outfile.contents)) as data_reader:
+        assert data_reader.series_timestamps(series_index).tolist() == [1, 2, 3, 4]
+
+    outfile = _GatedFile()
+    data_writer = AsyncDataWriter(outfile, max_queue_bytes=10,
+                                  overflow_policy=AsyncDataWriter.DROP_OLDEST)
+    series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'},
+                                                  'text/plain', 'text')
+    data_writer.write_data(series_index, 1, b'12345')
+    _wait_for_empty_queue(data_writer)
+    data_writer.write_data(series_index, 2, b'12345')
+    data_writer.write_data(series_index, 3, b'12345')
+    data_writer.write_data(series_index, 4, b'12345')
+    data_writer.write_data(series_index, 5, b'1234567890')
+    outfile.gate.set()
+    data_writer._close()  # pylint: disable=protected-access
+    assert data_writer.num_dropped == 3
+    with DataReader(io.BytesIO(outfile.contents)) as data_reader:
+        assert data_reader.series_timestamps(series_index).tolist() == [1, 5]
+
+    outfile = _GatedFile()
+    data_writer = AsyncDataWriter(outfile, max_queue_bytes=10)
+    series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'},
+                                                  'text/plain', 'text')
+    data_writer.write_data(series_index, 1, b'12345')
+    _wait_for_empty_queue(data_writer)
+    data_writer.write_data(series_index, 2, b'12345')
+    writer_thread = threading.Thread(target=data_writer.write_data,
+                                     args=(series_index, 3, b'12345'))
+    writer_thread.start()
+    writer_thread.join(0.1)
+    # Blocked waiting for room, while the first block is still being written.
+    assert writer_thread.is_alive()
+    assert data_writer.queue_bytes == 5
+    outfile.gate.set()
+    writer_thread.join()
+    data_writer.write_data(series_index, 4, b'12345')
+    data_writer._close()  # pylint: disable=protected-access
+    with DataReader(io.BytesIO(outfile.contents)) as data_reader:
+        assert data_reader.series_timestamps(series_index).tolist() == [1, 2, 3, 4]
+
+
+def test_compression():
+    """Test writing and reading series with compressed data blocks."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_compression.bddf')
+    timestamp_nsec = now_nsec()
+    comment = OperatorComment(message='compress me ' * 100, timestamp=now_timestamp())
+    text = b'text ' * 1000
+
+    for writer_class in (DataWriter, AsyncDataWriter):
+        with open(filename, 'wb') as outfile, writer_class(outfile) as data_writer:
+            with pytest.raises(DataFormatError):
+                data_writer.add_message_series('bosdyn/test/1', {'channel': 'bad'}, 'text/plain',
+                                               'text', compression='bogus')
+            text_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'text'},
+                                                        'text/plain', 'text', compression='zlib')
+            data_writer.write_data(text_index, timestamp_nsec, text)
+            proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment, compression='zlib')
+            proto_writer.write(timestamp_nsec, comment)
+            pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'test_var'},
+                                         bddf.TYPE_FLOAT64, compression='zlib')
+            pod_writer.write_many(range(100), np.zeros(100))
+
+        for use_mmap in (False, True):
+            with DataReader(filename=filename, use_mmap=use_mmap) as data_reader:
+                assert data_reader.series_descriptor(
+                    text_index).annotations['bosdyn:compression'] == 'zlib'
+                assert data_reader.total_bytes(text_index) < len(text)
+                assert data_reader.read(text_index, 0)[2] == text
+                channel_reader = ProtobufChannelReader(ProtobufReader(data_reader),
+                                                       OperatorComment)
+                assert channel_reader.get_message(0) == (timestamp_nsec, comment)
+                pod_reader = PodSeriesReader(data_reader, {'varname': 'test_var'})
+                assert np.array_equal(pod_reader.read_series_numpy()[1], np.zeros(100))
+
+        with open(filename, 'rb') as infile, StreamDataReader(infile) as data_reader:
+            assert data_reader.read_data_block()[2] == text
+            dec_msg = OperatorComment()
+            dec_msg.ParseFromString(data_reader.read_data_block()[2])
+            assert dec_msg == comment
+            assert data_reader.read_data_block()[2] == np.zeros(100).tobytes()
+
+    os.unlink(filename)